@@ -0,0 +1,132 @@
+
+"""Memory benchmark of the launcher hierarchy representation.
+
+Builds a synthetic studio of 100k shots and measures with tracemalloc
+the memory held by the legacy representation (raw nested assignment
+JSON plus the ad-hoc dict lists of the "All" view) against the shared
+EntityTree of slotted, interned records.
+
+Usage:
+    python benchmarks/bench_entity_memory.py [--projects 20] [--sequences 50] [--shots 100]
+"""
+
+import os
+import sys
+import gc
+import json
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import entities
+
+TASKS = ['fx', 'fx_sim', 'fx_render']
+
+
+def synthetic_payloads(project_count: int,
+                       sequence_count: int,
+                       shot_count: int) -> tuple:
+
+    """JSON encoded payloads the way thadam return them. Every payload
+    decoded separately later, so the names are not shared between them
+    like in the real launcher"""
+
+    assignments = {}
+    projects = []
+    sequences = {}
+    shots = {}
+    tasks = {}
+    for project_index in range(project_count):
+        project_name = f"PRJ{project_index:03d}"
+        projects.append({'proj_code': project_name, 'proj_id': project_index})
+        assignments[project_name] = []
+        sequences[project_name] = []
+        for seq_index in range(sequence_count):
+            seq_name = f"sq{seq_index:03d}0"
+            sequences[project_name].append({'seq_name': seq_name})
+            seq_key = f"{project_name}/{seq_name}"
+            shots[seq_key] = []
+            assigned_shots = {}
+            for shot_index in range(shot_count):
+                shot_name = f"sh{shot_index:04d}0"
+                shots[seq_key].append({'shot_name': shot_name,
+                                       'scope_id': len(tasks),
+                                       'frame_range': '1001-1100'})
+                tasks[f"{seq_key}/{shot_name}"] = [{'type_name': task} for task in TASKS]
+                assigned_shots[shot_name] = list(TASKS)
+            assignments[project_name].append({seq_name: assigned_shots})
+
+    return (json.dumps(assignments),
+            json.dumps(projects),
+            json.dumps(sequences),
+            json.dumps(shots),
+            json.dumps(tasks))
+
+
+def build_legacy(payloads: tuple) -> tuple:
+
+    """Raw assignment JSON kept as is plus the dict lists of the "All" view"""
+
+    assignments, projects, sequences, shots, tasks = payloads
+    return (json.loads(assignments),
+            json.loads(projects),
+            json.loads(sequences),
+            json.loads(shots),
+            json.loads(tasks))
+
+
+def build_entity_tree(payloads: tuple) -> entities.EntityTree:
+
+    """Same data merged into the shared entity tree. Decoded payloads
+    dropped once merged, like the launcher does"""
+
+    assignments, projects, sequences, shots, tasks = payloads
+    tree = entities.EntityTree()
+    tree.load_user_assignments(json.loads(assignments))
+    tree.merge_projects(json.loads(projects))
+    for project_name, project_sequences in json.loads(sequences).items():
+        tree.merge_sequences(project_name, project_sequences)
+    for seq_key, seq_shots in json.loads(shots).items():
+        tree.merge_shots(*seq_key.split('/'), seq_shots)
+    for shot_key, shot_tasks in json.loads(tasks).items():
+        tree.merge_tasks(*shot_key.split('/'), shot_tasks)
+    return tree
+
+
+def measure(builder, payloads: tuple) -> tuple:
+
+    """Retained and peak memory in bytes of the structure the builder returns"""
+
+    gc.collect()
+    tracemalloc.start()
+    result = builder(payloads)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained, peak
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--projects', type=int, default=20)
+    parser.add_argument('--sequences', type=int, default=50)
+    parser.add_argument('--shots', type=int, default=100)
+    args = parser.parse_args()
+
+    payloads = synthetic_payloads(args.projects, args.sequences, args.shots)
+    shot_total = args.projects * args.sequences * args.shots
+    print(f"Synthetic studio: {shot_total} shots, {shot_total * len(TASKS)} tasks")
+
+    legacy_retained, legacy_peak = measure(build_legacy, payloads)
+    tree_retained, tree_peak = measure(build_entity_tree, payloads)
+
+    megabyte = 1024 * 1024
+    print(f"legacy dicts : retained {legacy_retained / megabyte:8.1f} MB  peak {legacy_peak / megabyte:8.1f} MB")
+    print(f"entity tree  : retained {tree_retained / megabyte:8.1f} MB  peak {tree_peak / megabyte:8.1f} MB")
+    print(f"reduction    : {100 * (1 - tree_retained / legacy_retained):.1f}% retained")
+
+
+if __name__ == "__main__":
+    main()
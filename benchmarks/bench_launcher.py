@@ -0,0 +1,154 @@
+
+"""Launch latency benchmarks of the PFX Houdini launcher.
+
+Drives PfxHoudiniLauncher headless on Qt's offscreen platform against the
+synthetic thadam stand-in and times startup, every cascade step, preset
+apply, environment generation and create_folders. Each round builds a
+fresh launcher inside a fresh temporary tree, so the cascade steps are
+measured cold like an artist opening the launcher.
+
+Usage:
+    python benchmarks/bench_launcher.py --output results.json
+    python benchmarks/compare.py baseline.json results.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import thadam_stand_in
+
+
+class Timings:
+
+    """Collected durations per benchmark name"""
+
+    def __init__(self) -> None:
+        self.samples = {}
+
+    def measure(self,
+                name: str,
+                function,
+                *args):
+
+        start = time.perf_counter()
+        result = function(*args)
+        self.samples.setdefault(name, []).append(time.perf_counter() - start)
+        return result
+
+    def summary(self) -> dict:
+
+        return {
+            name: {
+                'runs': len(samples),
+                'min': min(samples),
+                'median': statistics.median(samples),
+                'mean': statistics.mean(samples),
+            }
+            for name, samples in sorted(self.samples.items())
+        }
+
+
+def select(combo_box, text: str) -> None:
+    combo_box.setCurrentIndex(combo_box.findText(text))
+
+
+def run_round(timings: Timings,
+              studio: thadam_stand_in.SyntheticStudio,
+              all_mode: bool) -> None:
+
+    """One cold launcher session. Startup, cascade down to the sub
+    task, preset apply, environment generation and folder creation"""
+
+    import pfx_launcher
+
+    show, seq_name, shot_name, task = studio.context
+    launcher = timings.measure('startup', pfx_launcher.PfxHoudiniLauncher)
+    if all_mode:
+        timings.measure('set_projects_all', launcher.all_radio_btn.setChecked, True)
+
+    select(launcher.show_combo_box, show)
+    timings.measure('set_sequence', launcher.set_sequence, show)
+    timings.measure('set_project_info', launcher.set_project_info, show)
+    select(launcher.sequence_combo_box, seq_name)
+    timings.measure('set_shot', launcher.set_shot, show, seq_name)
+    select(launcher.shot_combo_box, shot_name)
+    timings.measure('set_task', launcher.set_task)
+    select(launcher.task_combo_box, task)
+    timings.measure('sub_task', launcher.sub_task)
+
+    preset_file = os.path.join(os.environ['SCOPE_PRESET_PATH'], "bench_preset")
+    timings.measure('preset_apply', launcher.apply_values_to_launcher_fields, preset_file)
+    timings.measure('generate_environment', launcher.generate_houdini_environment_variables)
+    timings.measure('create_folders', launcher.create_folders)
+
+    launcher.launcher_window.close()
+    launcher.deleteLater()
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="PFX launcher launch latency benchmarks")
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.005,
+                        help="seconds every stand-in thadam query takes")
+    parser.add_argument('--projects', type=int, default=5)
+    parser.add_argument('--sequences', type=int, default=20)
+    parser.add_argument('--shots', type=int, default=50)
+    parser.add_argument('--all-mode', action='store_true',
+                        help="browse in the \"All\" view instead of the user view")
+    parser.add_argument('--output', help="write the results to this json file")
+    args = parser.parse_args()
+
+    studio = thadam_stand_in.SyntheticStudio(args.projects, args.sequences, args.shots)
+    calls = thadam_stand_in.install_thadam_stand_in(studio, latency=args.latency)
+    os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+
+    from PySide2 import QtWidgets
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+    timings = Timings()
+    saved_environment = dict(os.environ)
+    for _ in range(args.rounds):
+        root_dir = tempfile.mkdtemp(prefix="pfx_launcher_bench_")
+        try:
+            thadam_stand_in.prepare_environment(studio, root_dir)
+            run_round(timings, studio, args.all_mode)
+            app.processEvents()
+        finally:
+            os.environ.clear()
+            os.environ.update(saved_environment)
+            shutil.rmtree(root_dir, ignore_errors=True)
+
+    results = {
+        'meta': {
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'args': vars(args),
+            'thadam_calls': calls,
+        },
+        'results': timings.summary(),
+    }
+
+    for name, result in results['results'].items():
+        print(f"{name:24} median {result['median'] * 1000:9.2f} ms   "
+              f"min {result['min'] * 1000:9.2f} ms")
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=4)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+
+"""Compare benchmark results against a saved baseline.
+
+Flags every benchmark whose median got slower than the baseline by more
+than the threshold. Exits with status 1 if any regression found, so it
+can gate a change.
+
+Usage:
+    python benchmarks/compare.py baseline.json results.json [--threshold 0.2]
+"""
+
+import sys
+import json
+import argparse
+
+
+def load_results(results_path: str) -> dict:
+
+    with open(results_path, "r") as results_file:
+        return json.load(results_file)['results']
+
+
+def compare(baseline: dict,
+            current: dict,
+            threshold: float,
+            min_delta: float) -> list:
+
+    """Rows of name, baseline median, current median, ratio and status
+
+    Args:
+        baseline (dict): baseline results per benchmark name
+        current (dict): current results per benchmark name
+        threshold (float): allowed relative slow down, 0.2 is 20%
+        min_delta (float): slow downs below these seconds never flagged,
+                           keeps the timer noise of tiny steps out
+    """
+
+    rows = []
+    for name in sorted(set(baseline) | set(current)):
+        if name not in current:
+            rows.append((name, baseline[name]['median'], None, None, 'missing'))
+            continue
+        if name not in baseline:
+            rows.append((name, None, current[name]['median'], None, 'new'))
+            continue
+
+        base_median = baseline[name]['median']
+        current_median = current[name]['median']
+        ratio = current_median / base_median if base_median else float('inf')
+        status = 'ok'
+        if ratio > 1 + threshold and current_median - base_median > min_delta:
+            status = 'REGRESSION'
+        elif ratio < 1 - threshold:
+            status = 'faster'
+        rows.append((name, base_median, current_median, ratio, status))
+    return rows
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Compare launcher benchmark results")
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="allowed relative slow down of the median (default 0.2)")
+    parser.add_argument('--min-delta', type=float, default=0.001,
+                        help="ignore slow downs smaller than these seconds (default 0.001)")
+    args = parser.parse_args()
+
+    rows = compare(load_results(args.baseline),
+                   load_results(args.current),
+                   args.threshold,
+                   args.min_delta)
+
+    def milliseconds(value):
+        return f"{value * 1000:10.2f}" if value is not None else f"{'-':>10}"
+
+    print(f"{'benchmark':24} {'baseline ms':>11} {'current ms':>11} {'ratio':>7}  status")
+    for name, base_median, current_median, ratio, status in rows:
+        ratio_text = f"{ratio:7.2f}" if ratio is not None else f"{'-':>7}"
+        print(f"{name:24} {milliseconds(base_median)} {milliseconds(current_median)} "
+              f"{ratio_text}  {status}")
+
+    regressions = [row[0] for row in rows if row[4] == 'REGRESSION']
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}: "
+              f"{', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
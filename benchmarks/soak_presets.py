@@ -0,0 +1,164 @@
+
+"""Memory soak of the scope preset window lifecycle.
+
+Runs open, apply and close cycles of the preset window on a headless
+launcher against the synthetic thadam stand-in. The traced memory and
+the signal receivers of the reused widgets are measured after a warm up
+and again at the end. Exits with status 1 if memory grew beyond the
+allowed budget or any handler got connected again, so a long running
+launcher stays flat.
+
+Usage:
+    python benchmarks/soak_presets.py [--cycles 10000] [--max-growth-kb 256]
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import thadam_stand_in
+
+
+def receiver_counts(launcher) -> dict:
+
+    """Connected handlers of the signals the launcher used to stack"""
+
+    from PySide2.QtCore import SIGNAL
+
+    counts = {'scope_list.clicked': launcher.sp.scope_list.receivers(
+                                        SIGNAL("clicked(QModelIndex)"))}
+    for name in ('show', 'sequence', 'shot', 'task'):
+        combo_box = getattr(launcher, f"{name}_combo_box")
+        counts[f"{name}.editingFinished"] = combo_box.lineEdit().receivers(
+                                        SIGNAL("editingFinished()"))
+        counts[f"{name}.activated"] = combo_box.receivers(
+                                        SIGNAL("activated(QString)"))
+    return counts
+
+
+def write_presets(studio: thadam_stand_in.SyntheticStudio,
+                  preset_count: int) -> None:
+
+    show, seq_name, shot_name, task = studio.context
+    for index in range(preset_count):
+        preset_file_path = os.path.join(os.environ['SCOPE_PRESET_PATH'],
+                                        f"soak_preset_{index}")
+        with open(preset_file_path, "w") as preset_file:
+            json.dump({'show': show,
+                       'sequence': seq_name,
+                       'shot': shot_name,
+                       'task': task,
+                       'all_radio_btn': False,
+                       'user_radio_btn': True}, preset_file, indent=4)
+
+
+def cycle(app, launcher, row: int) -> None:
+
+    """Open the preset window, apply a preset by clicking it, close it"""
+
+    from PySide2.QtCore import QItemSelectionModel
+
+    launcher.launch_preset_gui()
+    index = launcher.sp.scope_list.model().index(row, 0)
+    launcher.sp.scope_list.selectionModel().select(
+                                index, QItemSelectionModel.ClearAndSelect)
+    launcher.sp.scope_list.clicked.emit(index)
+    launcher.sp.scope_preset_window.close()
+    app.processEvents()
+
+
+def run_soak(cycles: int,
+             warm_up: int,
+             presets: int) -> dict:
+
+    """Run the soak on a headless launcher. Returns the traced memory and
+    the receiver counts after the warm up and at the end
+
+    Args:
+        cycles (int): measured open, apply and close cycles
+        warm_up (int): cycles run before the baseline is taken
+        presets (int): presets written and applied in turn
+    """
+
+    studio = thadam_stand_in.SyntheticStudio()
+    thadam_stand_in.install_thadam_stand_in(studio)
+    root_dir = tempfile.mkdtemp(prefix="pfx_launcher_soak_")
+    thadam_stand_in.prepare_environment(studio, root_dir)
+    os.remove(os.path.join(os.environ['SCOPE_PRESET_PATH'], "bench_preset"))
+    write_presets(studio, presets)
+
+    from PySide2 import QtWidgets
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+    import pfx_launcher
+    try:
+        launcher = pfx_launcher.PfxHoudiniLauncher()
+
+        tracemalloc.start()
+        for index in range(warm_up):
+            cycle(app, launcher, index % presets)
+        baseline_receivers = receiver_counts(launcher)
+        baseline_memory = tracemalloc.get_traced_memory()[0]
+
+        for index in range(cycles):
+            cycle(app, launcher, index % presets)
+        final_receivers = receiver_counts(launcher)
+        final_memory, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        shutil.rmtree(root_dir, ignore_errors=True)
+
+    return {
+        'baseline_memory': baseline_memory,
+        'final_memory': final_memory,
+        'peak_memory': peak_memory,
+        'growth_kb': (final_memory - baseline_memory) / 1024,
+        'baseline_receivers': baseline_receivers,
+        'final_receivers': final_receivers,
+    }
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Scope preset window memory soak")
+    parser.add_argument('--cycles', type=int, default=10000)
+    parser.add_argument('--warm-up', type=int, default=500,
+                        help="cycles run before the baseline is taken")
+    parser.add_argument('--presets', type=int, default=5)
+    parser.add_argument('--max-growth-kb', type=float, default=256,
+                        help="allowed traced memory growth after the warm up")
+    args = parser.parse_args()
+
+    result = run_soak(args.cycles, args.warm_up, args.presets)
+    growth_kb = result['growth_kb']
+    baseline_receivers = result['baseline_receivers']
+    final_receivers = result['final_receivers']
+
+    print(f"cycles            {args.cycles} after {args.warm_up} warm up")
+    print(f"traced memory     {result['baseline_memory'] / 1024:10.1f} KB -> "
+          f"{result['final_memory'] / 1024:10.1f} KB"
+          f"   (peak {result['peak_memory'] / 1024:.1f} KB)")
+    print(f"growth            {growth_kb:10.1f} KB   (budget {args.max_growth_kb} KB)")
+    for name, count in final_receivers.items():
+        print(f"{name:28} {baseline_receivers[name]} -> {count} receivers")
+
+    failures = []
+    if growth_kb > args.max_growth_kb:
+        failures.append(f"memory grew {growth_kb:.1f} KB")
+    failures.extend(f"{name} gained receivers" for name, count in final_receivers.items()
+                    if count != baseline_receivers[name])
+    if failures:
+        print(f"\nSOAK FAILED: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+
+"""Synthetic thadam stand-in for driving the launcher headless.
+
+Installs fake thadam_base.thadam_api and thadam_base.logger modules
+serving a generated studio with a configurable per call latency, and
+prepares the environment variables, settings.yml, subtasks and project
+folders the launcher expects inside a temporary directory.
+"""
+
+import os
+import sys
+import json
+import time
+import types
+
+
+class SyntheticStudio:
+
+    """Generated show -> sequence -> shot -> task hierarchy"""
+
+    TASKS = ['fx', 'fx_sim', 'fx_render']
+
+    def __init__(self,
+                 project_count: int=5,
+                 sequence_count: int=20,
+                 shot_count: int=50) -> None:
+
+        self.projects = [{'proj_code': f"PRJ{index:03d}", 'proj_id': index}
+                         for index in range(project_count)]
+        self.sequences = [f"sq{index:03d}0" for index in range(sequence_count)]
+        self.shots = [f"sh{index:04d}0" for index in range(shot_count)]
+
+    @property
+    def context(self) -> tuple:
+
+        """Show, sequence, shot and task the benchmarks launch"""
+
+        return (self.projects[-1]['proj_code'],
+                self.sequences[-1],
+                self.shots[-1],
+                self.TASKS[0])
+
+    def scope_id(self,
+                 seq_name: str,
+                 shot_name: str) -> int:
+        return self.sequences.index(seq_name) * len(self.shots) + self.shots.index(shot_name)
+
+    def user_assignments(self) -> dict:
+
+        """Every shot of the first two sequences of each project"""
+
+        return {
+            project['proj_code']: [
+                {seq_name: {shot_name: list(self.TASKS) for shot_name in self.shots}}
+                for seq_name in self.sequences[:2] + self.sequences[-1:]
+            ]
+            for project in self.projects
+        }
+
+
+def install_thadam_stand_in(studio: SyntheticStudio,
+                            latency: float=0.0) -> dict:
+
+    """Register the fake thadam_base modules in sys.modules.
+
+    Returns the dict counting the calls made per query method.
+
+    Args:
+        studio (SyntheticStudio): studio the stand-in serves
+        latency (float, optional): seconds every query sleeps, the network
+                                   round trip of the real server. Defaults to 0.
+    """
+
+    calls = {}
+
+    def query(method):
+        def wrapper(self, *args, **kwargs):
+            calls[method.__name__] = calls.get(method.__name__, 0) + 1
+            if latency:
+                time.sleep(latency)
+            return method(self, *args, **kwargs)
+        wrapper.__name__ = method.__name__
+        return wrapper
+
+    class ThadamRestServer:
+        api = "thadam-stand-in"
+
+    class ThadamParser:
+
+        @query
+        def get_projects(self):
+            return [dict(project) for project in studio.projects]
+
+        @query
+        def get_project_infos(self, project_name):
+            return [{'client': 'stand-in', 'fps': 24}]
+
+        @query
+        def get_sequences(self, project_name):
+            return [{'seq_name': seq_name} for seq_name in studio.sequences]
+
+        @query
+        def get_shots(self, project_name, seq_name):
+            return [{'shot_name': shot_name,
+                     'scope_id': studio.scope_id(seq_name, shot_name),
+                     'frame_range': '1001-1100'}
+                    for shot_name in studio.shots]
+
+        @query
+        def get_tasks(self, project_name, project_id, shot_id):
+            return [{'type_name': task} for task in studio.TASKS]
+
+    class ThadamUserParser:
+
+        @query
+        def get_artist_details(self, artist_name):
+            return {'id': 1, 'name': artist_name}
+
+        @query
+        def get_artist_assigned_item_details(self, artist_id):
+            return studio.user_assignments()
+
+    class PFXLogger:
+
+        def __init__(self, log_name):
+            self.log_name = log_name
+
+        def info_logger(self, message):
+            pass
+
+        def error_logger(self, message):
+            pass
+
+    thadam_api = types.ModuleType("thadam_base.thadam_api")
+    thadam_api.ThadamRestServer = ThadamRestServer
+    thadam_api.ThadamParser = ThadamParser
+    thadam_api.ThadamUserParser = ThadamUserParser
+
+    logger = types.ModuleType("thadam_base.logger")
+    logger.PFXLogger = PFXLogger
+
+    thadam_base = types.ModuleType("thadam_base")
+    thadam_base.thadam_api = thadam_api
+    thadam_base.logger = logger
+
+    sys.modules['thadam_base'] = thadam_base
+    sys.modules['thadam_base.thadam_api'] = thadam_api
+    sys.modules['thadam_base.logger'] = logger
+    return calls
+
+
+def prepare_environment(studio: SyntheticStudio,
+                        root_dir: str) -> None:
+
+    """Environment variables and files the launcher reads, all
+    pointing inside root_dir
+
+    Args:
+        studio (SyntheticStudio): studio the stand-in serves
+        root_dir (str): temporary folder of the benchmark run
+    """
+
+    folders = {name: os.path.join(root_dir, name)
+               for name in ('temp', 'subtasks', 'settings', 'projects',
+                            'presets', 'packages', 'publish', 'cache')}
+    for folder in folders.values():
+        os.makedirs(folder, exist_ok=True)
+
+    os.environ.update({
+        'QT_QPA_PLATFORM': 'offscreen',
+        'USERNAME': 'bench',
+        'TEMP': folders['temp'],
+        'SUB_TASK_DIR': folders['subtasks'],
+        'HOUDINI_SHOW_SETTINGS': folders['settings'],
+        'SCOPE_PRESET_PATH': folders['presets'],
+        'SCOPE_PRESET_COUNT': '10',
+        'FX_PUBLISH_DB_DIR': folders['publish'],
+        'HOUDINI_INTERNAL_PACKAGE_DIR': folders['packages'],
+        'HOUDINI_PACKAGE_DIR': folders['packages'],
+        'PFX_LAUNCHER_CACHE_DIR': folders['cache'],
+        'PFX_HOUDINI_SPAWNER': '0',
+    })
+    os.environ.pop('PFX_SHARED_CACHE_DIR', None)
+    os.environ.pop('PFX_HOUDINI_PREWARM', None)
+    os.environ.pop('PFX_ENTITY_BACKEND', None)
+
+    show, seq_name, shot_name, task = studio.context
+    for project in studio.projects:
+        settings_dir = os.path.join(folders['settings'], project['proj_code'])
+        os.makedirs(settings_dir, exist_ok=True)
+        with open(os.path.join(settings_dir, "settings.yml"), "w") as settings_file:
+            settings_file.write(f"project_path: {folders['projects']}\n"
+                                f"houdini_version: '19.5.493'\n")
+
+    subtask_dir = os.path.join(folders['subtasks'], show, seq_name, shot_name, task)
+    os.makedirs(subtask_dir, exist_ok=True)
+    with open(os.path.join(subtask_dir, "subtasks.json"), "w") as subtask_file:
+        json.dump(['pyro', 'destruction', 'whitewater'], subtask_file)
+
+    with open(os.path.join(folders['presets'], "bench_preset"), "w") as preset_file:
+        json.dump({'show': show,
+                   'sequence': seq_name,
+                   'shot': shot_name,
+                   'task': task,
+                   'all_radio_btn': False,
+                   'user_radio_btn': True}, preset_file, indent=4)
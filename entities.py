@@ -0,0 +1,265 @@
+
+from sys import intern
+
+
+class EntityRecord:
+
+    """Compact record of a single thadam entity.
+
+    Records were slotted and their names interned, so the same show, sequence,
+    shot or task name coming from the user assignments and from the "All"
+    thadam queries is stored only once. Children kept in a dict keyed by the
+    interned name and created lazily. Leaf records never allocate one.
+    """
+
+    __slots__ = ('name', 'entity_id', 'frame_range', 'children', 'assigned')
+
+    def __init__(self,
+                 name: str,
+                 entity_id=None,
+                 frame_range: str=None) -> None:
+
+        self.name = intern(name)
+        self.entity_id = entity_id
+        self.frame_range = frame_range
+        self.children = None
+        self.assigned = False
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r})"
+
+    def child(self,
+              record_type: type,
+              name: str):
+
+        """Return the child record of the given name. Created if
+        not exist already
+
+        Args:
+            record_type (type): Record class of the child level
+            name (str): Name of the child entity
+        """
+
+        if self.children is None:
+            self.children = {}
+        name = intern(name)
+        record = self.children.get(name)
+        if record is None:
+            record = self.children[name] = record_type(name)
+        return record
+
+    def child_records(self,
+                      assigned_only: bool=False) -> list:
+
+        """Child records of this entity in insertion order
+
+        Args:
+            assigned_only (bool, optional): Only the user assigned children.
+                                            Defaults to False.
+        """
+
+        if not self.children:
+            return []
+        if assigned_only:
+            return [record for record in self.children.values() if record.assigned]
+        return list(self.children.values())
+
+
+class ProjectRecord(EntityRecord):
+
+    __slots__ = ()
+
+    @property
+    def proj_code(self) -> str:
+        return self.name
+
+    @property
+    def proj_id(self):
+        return self.entity_id
+
+
+class SequenceRecord(EntityRecord):
+
+    __slots__ = ()
+
+    @property
+    def seq_name(self) -> str:
+        return self.name
+
+
+class ShotRecord(EntityRecord):
+
+    __slots__ = ()
+
+    @property
+    def shot_name(self) -> str:
+        return self.name
+
+    @property
+    def scope_id(self):
+        return self.entity_id
+
+
+class TaskRecord(EntityRecord):
+
+    __slots__ = ()
+
+    @property
+    def type_name(self) -> str:
+        return self.name
+
+
+class EntityTree:
+
+    """Show -> sequence -> shot -> task hierarchy shared by the user
+    assigned view and the "All" view of the launcher.
+
+    User assignments mark the records as assigned. Thadam query results
+    merged into the same records, only the extra attributes (ids and frame
+    ranges) are added.
+    """
+
+    def __init__(self) -> None:
+        self.root = EntityRecord('')
+
+    def project(self, project_name: str) -> ProjectRecord:
+        return self.root.child(ProjectRecord, project_name)
+
+    def sequence(self,
+                 project_name: str,
+                 seq_name: str) -> SequenceRecord:
+        return self.project(project_name).child(SequenceRecord, seq_name)
+
+    def shot(self,
+             project_name: str,
+             seq_name: str,
+             shot_name: str) -> ShotRecord:
+        return self.sequence(project_name, seq_name).child(ShotRecord, shot_name)
+
+    def find(self, *names: str):
+
+        """Walk down the tree through the given names without
+        creating records. None returned if any level not exist
+
+        Example:
+            tree.find('PRJ', 'sq010', 'sh0010')
+        """
+
+        record = self.root
+        for name in names:
+            if not record.children or name not in record.children:
+                return None
+            record = record.children[name]
+        return record
+
+    def load_user_assignments(self, user_assigned_entities: dict) -> None:
+
+        """Mark the user assigned entities in the tree.
+
+        Args:
+            user_assigned_entities (dict): raw thadam assignment payload of the
+                                           form {project: [{seq: {shot: [task]}}]}
+        """
+
+        for project_name, sequences in user_assigned_entities.items():
+            project = self.project(project_name)
+            project.assigned = True
+            for sequence_entry in sequences:
+                for seq_name, shots in sequence_entry.items():
+                    sequence = project.child(SequenceRecord, seq_name)
+                    sequence.assigned = True
+                    for shot_name in shots:
+                        shot = sequence.child(ShotRecord, shot_name)
+                        shot.assigned = True
+                        tasks = shots[shot_name] if isinstance(shots, dict) else []
+                        for task_name in tasks or []:
+                            shot.child(TaskRecord, task_name).assigned = True
+
+    def replace_user_assignments(self, user_assigned_entities: dict) -> None:
+
+        """Rebuild the assigned marks from a fresh assignment payload.
+        Entities no longer assigned lose their mark
+
+        Args:
+            user_assigned_entities (dict): raw thadam assignment payload
+        """
+
+        pending = [self.root]
+        while pending:
+            record = pending.pop()
+            record.assigned = False
+            if record.children:
+                pending.extend(record.children.values())
+        self.load_user_assignments(user_assigned_entities)
+
+    def merge_projects(self, projects: list) -> list:
+
+        """Merge the thadam get_projects response into the tree
+
+        Args:
+            projects (list): list of project dicts with proj_code and proj_id
+        """
+
+        records = []
+        for project in projects:
+            record = self.project(project['proj_code'])
+            record.entity_id = project.get('proj_id', record.entity_id)
+            records.append(record)
+        return records
+
+    def merge_sequences(self,
+                        project_name: str,
+                        sequences: list) -> list:
+
+        """Merge the thadam get_sequences response into the tree
+
+        Args:
+            project_name (str): project of the sequences
+            sequences (list): list of sequence dicts with seq_name
+        """
+
+        project = self.project(project_name)
+        return [project.child(SequenceRecord, sequence['seq_name'])
+                for sequence in sequences]
+
+    def merge_shots(self,
+                    project_name: str,
+                    seq_name: str,
+                    shots: list) -> list:
+
+        """Merge the thadam get_shots response into the tree
+
+        Args:
+            project_name (str): project of the shots
+            seq_name (str): sequence of the shots
+            shots (list): list of shot dicts with shot_name, scope_id and frame_range
+        """
+
+        sequence = self.sequence(project_name, seq_name)
+        records = []
+        for shot in shots:
+            record = sequence.child(ShotRecord, shot['shot_name'])
+            record.entity_id = shot.get('scope_id', record.entity_id)
+            if shot.get('frame_range'):
+                record.frame_range = intern(shot['frame_range'])
+            records.append(record)
+        return records
+
+    def merge_tasks(self,
+                    project_name: str,
+                    seq_name: str,
+                    shot_name: str,
+                    tasks: list) -> list:
+
+        """Merge the thadam get_tasks response into the tree
+
+        Args:
+            project_name (str): project of the tasks
+            seq_name (str): sequence of the tasks
+            shot_name (str): shot of the tasks
+            tasks (list): list of task dicts with type_name
+        """
+
+        shot = self.shot(project_name, seq_name, shot_name)
+        return [shot.child(TaskRecord, task['type_name'] or '')
+                for task in tasks]
@@ -0,0 +1,392 @@
+
+"""Entity backends of the launcher.
+
+Everything the launcher knows about artists, assignments, projects,
+sequences, shots, tasks and project infos comes from an entity backend.
+PFX_ENTITY_BACKEND selects it:
+
+    thadam   the studio thadam server (default)
+    sqlite   a local SQLite export of the hierarchy, PFX_ENTITY_EXPORT
+             points to the file
+
+Both hand out parsers with the method interface of thadam's ThadamParser
+and ThadamUserParser, so the rest of the launcher does not know which
+one answers. The export is written by crawling thadam once, e.g. as a
+nightly job for offsite studios.
+
+Every export is written as a new version next to the export file, the
+export file itself is a small pointer to the current version. Launchers
+keep their version open while the next one is published, nothing is
+replaced under an open connection:
+
+    <EXPORT_FILE>           {"version": 12, "file": "<EXPORT_FILE name>.v000012"}
+    <EXPORT_FILE>.v000012   SQLite export
+
+Usage:
+    python entity_backends.py export EXPORT_FILE [--artist NAME ...] [--keep 3]
+"""
+
+import os
+import sys
+import abc
+import json
+import pathlib
+import sqlite3
+import argparse
+import threading
+
+import shared_cache
+
+EXPORT_FORMAT_VERSION = 1
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+EXPORT_SCHEMA = """
+CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE projects (position INTEGER, proj_code TEXT PRIMARY KEY, data TEXT);
+CREATE TABLE project_infos (proj_code TEXT PRIMARY KEY, data TEXT);
+CREATE TABLE sequences (proj_code TEXT, position INTEGER, data TEXT,
+                        PRIMARY KEY (proj_code, position));
+CREATE TABLE shots (proj_code TEXT, seq_name TEXT, position INTEGER, data TEXT,
+                    PRIMARY KEY (proj_code, seq_name, position));
+CREATE TABLE tasks (proj_code TEXT, scope_id TEXT, position INTEGER, data TEXT,
+                    PRIMARY KEY (proj_code, scope_id, position));
+CREATE TABLE artists (artist_name TEXT PRIMARY KEY, data TEXT);
+CREATE TABLE assignments (artist_id TEXT PRIMARY KEY, data TEXT);
+"""
+
+
+class EntityBackend(abc.ABC):
+
+    """Source of the entity parsers. The parsers of a remote backend are
+    handed to ThadamConnection.client as factories, the ones of a local
+    backend are queried directly"""
+
+    name = None
+    # Queries go over the network. Wrapped with the call timeout, the
+    # circuit breaker and the offline cache
+    remote = False
+    # Answer the entity queries from the studio wide snapshot first
+    shared_cache = False
+
+    @abc.abstractmethod
+    def entity_parser(self):
+
+        """Parser with get_projects, get_project_infos, get_sequences,
+        get_shots and get_tasks"""
+
+    @abc.abstractmethod
+    def user_parser(self):
+
+        """Parser with get_artist_details and get_artist_assigned_item_details"""
+
+    def description(self) -> str:
+        return self.name
+
+
+class ThadamBackend(EntityBackend):
+
+    """The studio thadam server"""
+
+    name = 'thadam'
+    remote = True
+    shared_cache = True
+
+    def entity_parser(self):
+        from thadam_base import thadam_api
+        return thadam_api.ThadamParser()
+
+    def user_parser(self):
+        from thadam_base import thadam_api
+        return thadam_api.ThadamUserParser()
+
+    def description(self) -> str:
+        from thadam_base import thadam_api
+        return f"API {thadam_api.ThadamRestServer().api}"
+
+
+def export_versions(export_path: str) -> list:
+
+    """Sorted version numbers of the exports published next to the
+    export file"""
+
+    folder, name = os.path.split(os.path.abspath(export_path))
+    if not os.path.isdir(folder):
+        return []
+    prefix = name + ".v"
+    return sorted(int(file_name[len(prefix):]) for file_name in os.listdir(folder)
+                  if file_name.startswith(prefix) and file_name[len(prefix):].isdigit())
+
+
+def resolve_export(export_path: str) -> str:
+
+    """SQLite file the export file points to. An export file which is a
+    SQLite database itself is used as it is"""
+
+    try:
+        with open(export_path, "rb") as export_file:
+            header = export_file.read(len(SQLITE_HEADER))
+            if header == SQLITE_HEADER:
+                return export_path
+            export_file.seek(0)
+            pointer = json.load(export_file)
+        return os.path.join(os.path.dirname(os.path.abspath(export_path)), pointer['file'])
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        raise ValueError(f"{export_path} is not a readable entity export ({error})")
+
+
+class SQLiteExport:
+
+    """Thadam like parser over a SQLite export of the hierarchy.
+
+    Records are stored as the very dicts thadam answered, keyed by the
+    columns the queries look them up with. The version the export file
+    points to is opened read only and memory mapped, lookups are a primary
+    key range read. One connection is shared by the query threads of the
+    launcher and stays on its version until closed.
+    """
+
+    def __init__(self, export_path: str) -> None:
+
+        """
+        Args:
+            export_path (str): export file, the pointer or a SQLite export
+        """
+
+        self.export_path = export_path
+        self.database_path = resolve_export(export_path)
+        self.lock = threading.Lock()
+        try:
+            self.connection = sqlite3.connect(
+                pathlib.Path(self.database_path).resolve().as_uri() + "?mode=ro",
+                uri=True,
+                check_same_thread=False
+            )
+            self.connection.execute("PRAGMA mmap_size = 268435456")
+            version = self.connection.execute(
+                "SELECT value FROM meta WHERE name = 'format_version'"
+            ).fetchone()
+        except sqlite3.Error as error:
+            raise ValueError(f"{self.database_path} is not a readable entity export ({error})")
+        if not version or int(version[0]) != EXPORT_FORMAT_VERSION:
+            raise ValueError(f"{self.database_path} is not a version "
+                             f"{EXPORT_FORMAT_VERSION} entity export")
+
+    def _records(self,
+                 query: str,
+                 *args) -> list:
+
+        with self.lock:
+            rows = self.connection.execute(query, args).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def _record(self,
+                query: str,
+                *args):
+
+        records = self._records(query, *args)
+        return records[0] if records else None
+
+    def get_projects(self) -> list:
+        return self._records("SELECT data FROM projects ORDER BY position")
+
+    def get_project_infos(self, project_name: str) -> list:
+        return self._record("SELECT data FROM project_infos WHERE proj_code = ?", project_name) or []
+
+    def get_sequences(self, project_name: str) -> list:
+        return self._records(
+            "SELECT data FROM sequences WHERE proj_code = ? ORDER BY position", project_name
+        )
+
+    def get_shots(self,
+                  project_name: str,
+                  seq_name: str) -> list:
+        return self._records(
+            "SELECT data FROM shots WHERE proj_code = ? AND seq_name = ? ORDER BY position",
+            project_name, seq_name
+        )
+
+    def get_tasks(self,
+                  project_name: str,
+                  project_id,
+                  shot_id) -> list:
+        return self._records(
+            "SELECT data FROM tasks WHERE proj_code = ? AND scope_id = ? ORDER BY position",
+            project_name, str(shot_id)
+        )
+
+    def get_artist_details(self, artist_name: str):
+        return self._record("SELECT data FROM artists WHERE artist_name = ?", artist_name)
+
+    def get_artist_assigned_item_details(self, artist_id):
+        return self._record("SELECT data FROM assignments WHERE artist_id = ?", str(artist_id)) or {}
+
+
+class SQLiteExportBackend(EntityBackend):
+
+    """Local SQLite export of the hierarchy, see export_entities"""
+
+    name = 'sqlite'
+
+    def __init__(self, export_path: str=None) -> None:
+
+        """
+        Args:
+            export_path (str, optional): export file. Defaults to PFX_ENTITY_EXPORT.
+        """
+
+        self.export_path = export_path or os.environ['PFX_ENTITY_EXPORT']
+        self.export = None
+
+    def _open(self) -> SQLiteExport:
+        if self.export is None:
+            self.export = SQLiteExport(self.export_path)
+        return self.export
+
+    def entity_parser(self):
+        return self._open()
+
+    def user_parser(self):
+        return self._open()
+
+    def description(self) -> str:
+        return f"SQLite export {self.export_path}"
+
+
+BACKENDS = {
+    ThadamBackend.name: ThadamBackend,
+    SQLiteExportBackend.name: SQLiteExportBackend,
+}
+
+
+def backend_from_environment() -> EntityBackend:
+
+    """Backend named by PFX_ENTITY_BACKEND, thadam if not set"""
+
+    name = os.environ.get('PFX_ENTITY_BACKEND', ThadamBackend.name).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown PFX_ENTITY_BACKEND \"{name}\". "
+                         f"Available: {', '.join(sorted(BACKENDS))}")
+    return BACKENDS[name]()
+
+
+def export_entities(entity_parser,
+                    user_parser,
+                    export_path: str,
+                    artists=(),
+                    keep: int=3) -> dict:
+
+    """Crawl the whole hierarchy and the assignments of the given artists
+    into the next version of the SQLite export. The version is written to
+    a temporary file first, the export file pointed to it last. Versions
+    beyond the latest keep are removed, the ones still open by a launcher
+    are left for a later export.
+
+    Returns the number of records exported per table.
+
+    Raises ValueError, before anything is written, if one of the artists
+    is not known.
+
+    Args:
+        entity_parser: thadam parser (or any thadam like source) to crawl
+        user_parser: thadam user parser of the artist queries
+        export_path (str): export file
+        artists (iterable, optional): artist names whose details and
+                                      assignments are exported. Defaults to ().
+        keep (int, optional): export versions to keep. Defaults to 3.
+    """
+
+    artist_details = {}
+    for artist_name in artists:
+        details = user_parser.get_artist_details(artist_name=artist_name)
+        if not details or 'id' not in details:
+            raise ValueError(f"Unknown artist \"{artist_name}\", nothing exported")
+        artist_details[artist_name] = details
+
+    os.makedirs(os.path.dirname(os.path.abspath(export_path)), exist_ok=True)
+    versions = export_versions(export_path)
+    version = versions[-1] + 1 if versions else 1
+    version_path = f"{export_path}.v{version:06d}"
+    temp_path = f"{version_path}.{os.getpid()}.tmp"
+
+    counts = {}
+    try:
+        connection = sqlite3.connect(temp_path)
+        try:
+            connection.executescript(EXPORT_SCHEMA)
+
+            def insert(table: str, rows: list) -> None:
+                if rows:
+                    marks = ", ".join("?" * len(rows[0]))
+                    connection.executemany(f"INSERT INTO {table} VALUES ({marks})", rows)
+                counts[table] = counts.get(table, 0) + len(rows)
+
+            for method_name, args, value in shared_cache.crawl_entities(entity_parser):
+                if method_name == 'get_projects':
+                    insert('projects', [(position, project['proj_code'], json.dumps(project))
+                                        for position, project in enumerate(value)])
+                elif method_name == 'get_project_infos':
+                    insert('project_infos', [(args[0], json.dumps(value))])
+                elif method_name == 'get_sequences':
+                    insert('sequences', [(args[0], position, json.dumps(sequence))
+                                         for position, sequence in enumerate(value)])
+                elif method_name == 'get_shots':
+                    insert('shots', [(args[0], args[1], position, json.dumps(shot))
+                                     for position, shot in enumerate(value)])
+                elif method_name == 'get_tasks':
+                    insert('tasks', [(args[0], str(args[2]), position, json.dumps(task))
+                                     for position, task in enumerate(value)])
+
+            for artist_name, details in artist_details.items():
+                insert('artists', [(artist_name, json.dumps(details))])
+                assignments = user_parser.get_artist_assigned_item_details(
+                                                    artist_id=details['id']
+                )
+                insert('assignments', [(str(details['id']), json.dumps(assignments))])
+
+            insert('meta', [('format_version', str(EXPORT_FORMAT_VERSION))])
+            connection.commit()
+        finally:
+            connection.close()
+        os.replace(temp_path, version_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    # Pointer written last, launchers never open a half written version
+    shared_cache._write_json(export_path, {'version': version,
+                                           'file': os.path.basename(version_path)})
+
+    for old_version in versions[:max(0, len(versions) + 1 - keep)]:
+        try:
+            os.remove(f"{export_path}.v{old_version:06d}")
+        except OSError:
+            pass
+    return counts
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="PFX launcher entity backends")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="crawl thadam into a SQLite export")
+    export_parser.add_argument("export_file")
+    export_parser.add_argument("--artist", action="append", default=[],
+                               help="export the details and assignments of this artist")
+    export_parser.add_argument("--keep", type=int, default=3)
+    args = parser.parse_args()
+
+    backend = ThadamBackend()
+    try:
+        counts = export_entities(backend.entity_parser(),
+                                 backend.user_parser(),
+                                 args.export_file,
+                                 artists=args.artist,
+                                 keep=args.keep)
+    except ValueError as error:
+        sys.exit(str(error))
+    print(f"Exported to {args.export_file}: " +
+          ", ".join(f"{count} {table}" for table, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+
+import os
+import json
+import threading
+from sys import intern
+from array import array
+
+
+def trigrams(text: str) -> set:
+
+    """All the three letter substrings of the text"""
+
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+def bigrams(text: str) -> set:
+
+    """All the two letter substrings of the text"""
+
+    return {text[index:index + 2] for index in range(len(text) - 1)}
+
+
+# Words matching at most this many names and nodes are resolved to the
+# nodes carrying them up front, the walk only enters their branches
+SELECTIVE_NAMES = 2000
+SELECTIVE_NODES = 5000
+MAX_DEPTH = 4
+
+
+class HierarchySearchIndex:
+
+    """In memory index over the show/sequence/shot/task paths for the
+    "jump to" search of the launcher.
+
+    Paths are held as a tree of nodes. Every node keeps its parent, the id
+    of its name and the interned name itself, so the names the EntityTree
+    already holds are shared and a path costs a few array slots. Trigram and
+    bigram postings are kept over the distinct lowercase names only, with
+    the depths each name occurs at.
+
+    A query walks the tree depth by depth, shallow paths first and each
+    level in name order, and stops once enough paths matched every word at
+    a name start, nothing later can rank above them. Branches that can not
+    hold a match are skipped: words matching a few names only restrict the
+    walk to the branches of the nodes carrying them, the other words to the
+    depths their names occur at, and the assigned only search to the
+    assigned nodes, their parents are assigned as well. Queries of single
+    letters only match nearly everything and return nothing.
+
+    New paths touch their own parent only, the children of a node are
+    sorted again on the next walk through it. Paths of a level the source
+    no longer lists are dropped with their children when the level is
+    replaced. The index is filled from a background thread as well, every
+    access holds its lock.
+    """
+
+    def __init__(self) -> None:
+
+        # Node 0 is the root, never a result
+        self.parents = array('i', [-1])
+        self.name_ids = array('I', [0])
+        self.depths = bytearray(1)
+        self.alive = bytearray(1)
+        self.assigned = bytearray(1)
+        self.labels = ['']
+        self.children = [None]
+        self.sorted_children = [None]
+        # Nodes sharing a name chained through same_name
+        self.same_name = array('i', [-1])
+
+        self.name_lookup = {'': 0}
+        self.names = ['']
+        self.first_node = array('i', [0])
+        self.name_counts = array('I', [0])
+        self.name_depths = bytearray(1)
+        self.postings = {}
+        self.gram_depths = {}
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return sum(self.alive)
+
+    def _name_id(self,
+                 name: str,
+                 depth: int) -> int:
+
+        lower_name = name.lower()
+        name_id = self.name_lookup.get(lower_name)
+        if name_id is None:
+            name_id = self.name_lookup[lower_name] = len(self.names)
+            self.names.append(intern(lower_name))
+            self.first_node.append(-1)
+            self.name_counts.append(0)
+            self.name_depths.append(0)
+            indexed_name = '/' + lower_name
+            for gram in trigrams(indexed_name) | bigrams(indexed_name):
+                posting = self.postings.get(gram)
+                if posting is None:
+                    posting = self.postings[gram] = array('I')
+                posting.append(name_id)
+
+        depth_bit = 1 << depth
+        if not self.name_depths[name_id] & depth_bit:
+            self.name_depths[name_id] |= depth_bit
+            indexed_name = '/' + self.names[name_id]
+            for gram in trigrams(indexed_name) | bigrams(indexed_name):
+                self.gram_depths[gram] = self.gram_depths.get(gram, 0) | depth_bit
+        return name_id
+
+    def _node(self,
+              path: tuple,
+              create: bool=True):
+
+        """Node of the path, None if it is not indexed. Missing parents
+        created as dropped nodes with create"""
+
+        node = 0
+        for depth, name in enumerate(path, 1):
+            children = self.children[node]
+            child = children.get(name) if children else None
+            if child is None:
+                if not create:
+                    return None
+                child = self._add_node(node, name, depth)
+            node = child
+        return node
+
+    def _add_node(self,
+                  parent: int,
+                  name: str,
+                  depth: int) -> int:
+
+        name = intern(name)
+        name_id = self._name_id(name, depth)
+        node = len(self.parents)
+        self.parents.append(parent)
+        self.name_ids.append(name_id)
+        self.depths.append(depth)
+        self.alive.append(0)
+        self.assigned.append(0)
+        self.labels.append(name)
+        self.children.append(None)
+        self.sorted_children.append(None)
+        self.same_name.append(self.first_node[name_id])
+        self.first_node[name_id] = node
+        self.name_counts[name_id] += 1
+
+        if self.children[parent] is None:
+            self.children[parent] = {}
+        self.children[parent][name] = node
+        self.sorted_children[parent] = None
+        return node
+
+    def path(self, node: int) -> tuple:
+
+        """Names of the node and its parents"""
+
+        names = []
+        while node > 0:
+            names.append(self.labels[node])
+            node = self.parents[node]
+        return tuple(reversed(names))
+
+    def add(self,
+            path: tuple,
+            assigned: bool=False) -> None:
+
+        """Add a path to the index. Already indexed paths only get their
+        assigned status updated
+
+        Args:
+            path (tuple): show, sequence, shot and task names (one to four)
+            assigned (bool, optional): path assigned to the user. Defaults to False.
+        """
+
+        with self.lock:
+            node = self._node(tuple(path))
+            self.alive[node] = 1
+            if assigned:
+                self.assigned[node] = 1
+
+    def add_records(self,
+                    parent_path: tuple,
+                    records: list) -> None:
+
+        """Index the child entity records of the given parent path
+
+        Args:
+            parent_path (tuple): names of the parent levels
+            records (list): entity records of the level
+        """
+
+        with self.lock:
+            for record in records:
+                if record.name:
+                    self.add(parent_path + (record.name,), record.assigned)
+
+    def remove(self, path: tuple) -> None:
+
+        """Drop a path and everything below it from the results"""
+
+        with self.lock:
+            node = self._node(tuple(path), create=False)
+            pending = [node] if node is not None else []
+            while pending:
+                node = pending.pop()
+                self.alive[node] = 0
+                if self.children[node]:
+                    pending.extend(self.children[node].values())
+
+    def replace_children(self,
+                         parent_path: tuple,
+                         names) -> None:
+
+        """Make the given names the children of the parent path. Indexed
+        children missing from them are dropped, the user assigned ones
+        excepted, their status comes from the live assignments
+
+        Args:
+            parent_path (tuple): names of the parent levels
+            names (iterable): every child name the source lists
+        """
+
+        parent_path = tuple(parent_path)
+        names = {name for name in names if name}
+        with self.lock:
+            parent = self._node(parent_path)
+            for name, node in list((self.children[parent] or {}).items()):
+                if name not in names and self.alive[node] and not self.assigned[node]:
+                    self.remove(parent_path + (name,))
+            for name in names:
+                self.add(parent_path + (name,))
+
+    def replace_records(self,
+                        parent_path: tuple,
+                        records: list) -> None:
+
+        """Replace the children of the parent path with the complete
+        level of entity records the source answered"""
+
+        with self.lock:
+            self.replace_children(parent_path, [record.name for record in records])
+            self.add_records(parent_path, records)
+
+    def clear_assigned(self) -> None:
+
+        """Forget the assigned status of every path, before the user
+        assignments are indexed again"""
+
+        with self.lock:
+            self.assigned = bytearray(len(self.parents))
+
+    def add_tree(self,
+                 tree,
+                 assigned_only: bool=False) -> None:
+
+        """Index every record of an EntityTree
+
+        Args:
+            tree (EntityTree): tree to index
+            assigned_only (bool, optional): Only the user assigned records.
+                                            Defaults to False.
+        """
+
+        pending = [((), tree.root)]
+        while pending:
+            path, record = pending.pop()
+            records = record.child_records(assigned_only=assigned_only)
+            self.add_records(path, records)
+            pending.extend((path + (child.name,), child) for child in records)
+
+    def _child_order(self, node: int) -> tuple:
+        return self.names[self.name_ids[node]], self.labels[node]
+
+    def _sorted_children(self, node: int):
+
+        ordered = self.sorted_children[node]
+        if ordered is None:
+            ordered = self.sorted_children[node] = array(
+                'I', sorted(self.children[node].values(), key=self._child_order)
+            )
+        return ordered
+
+    def _walk_children(self,
+                       node: int,
+                       reaches: list):
+
+        """Children of the node in name order, only the ones leading to
+        the nodes of the given reaches"""
+
+        if not reaches:
+            return self._sorted_children(node)
+        allowed = [reach.get(node, ()) for reach in reaches]
+        narrowest = min(allowed, key=len)
+        if len(narrowest) * 8 < len(self.children[node]):
+            ordered = sorted(narrowest, key=self._child_order)
+        else:
+            ordered = self._sorted_children(node)
+        return [child for child in ordered
+                if all(child in children for children in allowed)]
+
+    def _word_filter(self, word: str):
+
+        """Depths the names matching the word occur at, and when the word
+        matches a few names only the children leading to the nodes carrying
+        them per parent node (None otherwise). None returned if no name
+        matches the word"""
+
+        if len(word) < 2:
+            return (1 << (MAX_DEPTH + 1)) - 2, None
+
+        grams = trigrams(word) if len(word) > 2 else {word}
+        shortest = None
+        depth_mask = -1
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                return None
+            depth_mask &= self.gram_depths.get(gram, 0)
+            if shortest is None or len(posting) < len(shortest):
+                shortest = posting
+        if len(shortest) > SELECTIVE_NAMES:
+            return depth_mask, None
+
+        names = self.names
+        matching = [name_id for name_id in shortest if word in names[name_id]]
+        if not matching:
+            return None
+        depth_mask = 0
+        for name_id in matching:
+            depth_mask |= self.name_depths[name_id]
+        if sum(self.name_counts[name_id] for name_id in matching) > SELECTIVE_NODES:
+            return depth_mask, None
+
+        parents = self.parents
+        same_name = self.same_name
+        reach = {}
+        for name_id in matching:
+            node = self.first_node[name_id]
+            while node > 0:
+                child = node
+                while child > 0:
+                    parent = parents[child]
+                    children = reach.get(parent)
+                    if children is None:
+                        children = reach[parent] = set()
+                    elif child in children:
+                        break
+                    children.add(child)
+                    child = parent
+                node = same_name[node]
+        return depth_mask, reach
+
+    def search(self,
+               query: str,
+               assigned_only: bool=False,
+               limit: int=50) -> list:
+
+        """Paths matching every word of the query.
+
+        Paths where the words match at the start of a name come first,
+        then the shorter ones, then by name.
+
+        Args:
+            query (str): user typed text. Words split on spaces and slashes
+            assigned_only (bool, optional): Only the user assigned paths.
+                                            Defaults to False.
+            limit (int, optional): Max number of results. Defaults to 50.
+        """
+
+        words = [word for word in query.lower().replace('/', ' ').split() if word]
+        if all(len(word) < 2 for word in words):
+            return []
+
+        with self.lock:
+            depth_masks = []
+            reaches = []
+            for word in words:
+                word_filter = self._word_filter(word)
+                if word_filter is None:
+                    return []
+                depth_masks.append(word_filter[0])
+                reaches.append(word_filter[1])
+            # Words some name starts with, the best rank a path can reach
+            possible_hits = sum(1 for word in words if ('/' + word)[:3] in self.postings)
+
+            all_words = (1 << len(words)) - 1
+            word_bits = [(word, 1 << index) for index, word in enumerate(words)]
+            names = self.names
+            name_ids = self.name_ids
+            alive = self.alive
+            assigned = self.assigned
+            children = self.children
+            matches = []
+            full_hits = 0
+            visited = 0
+            for target_depth in range(1, MAX_DEPTH + 1):
+                target_bit = 1 << target_depth
+                if any(not mask & ((target_bit << 1) - 2) for mask in depth_masks):
+                    continue
+                # Depths still left below each depth of the walk
+                below = [((target_bit << 1) - 1) & ~((2 << depth) - 1)
+                         for depth in range(target_depth + 1)]
+
+                pending = [(0, 0, 0, 0)]
+                while pending:
+                    node, depth, matched, prefixed = pending.pop()
+                    if depth:
+                        name = names[name_ids[node]]
+                        for word, bit in word_bits:
+                            if word in name:
+                                matched |= bit
+                                if name.startswith(word):
+                                    prefixed |= bit
+
+                    if depth == target_depth:
+                        visited += 1
+                        if matched == all_words and alive[node]:
+                            prefix_hits = bin(prefixed).count('1')
+                            matches.append((-prefix_hits, visited, node))
+                            if prefix_hits == possible_hits:
+                                full_hits += 1
+                                if full_hits >= limit:
+                                    break
+                        continue
+
+                    # Branch pruned if a word left can not match below it
+                    if any(not matched & bit and not mask & below[depth]
+                           for (_, bit), mask in zip(word_bits, depth_masks)):
+                        continue
+                    if not children[node]:
+                        continue
+                    unmatched_reaches = [reach for (_, bit), reach in zip(word_bits, reaches)
+                                         if reach is not None and not matched & bit]
+                    for child in reversed(self._walk_children(node, unmatched_reaches)):
+                        if assigned_only and not assigned[child]:
+                            continue
+                        pending.append((child, depth + 1, matched, prefixed))
+                if full_hits >= limit:
+                    break
+
+            matches.sort()
+            return [self.path(node) for _, _, node in matches[:limit]]
+
+    def save(self, cache_path: str) -> None:
+
+        """Write the indexed paths to the local cache file"""
+
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        with self.lock:
+            entries = [[list(self.path(node)), self.assigned[node]]
+                       for node in range(1, len(self.parents)) if self.alive[node]]
+        with open(cache_path, "w") as cache_file:
+            json.dump(entries, cache_file)
+
+    def load(self, cache_path: str) -> None:
+
+        """Index the paths of the local cache file, if it exist. The
+        assigned status of the file is not trusted, it comes from the
+        live assignments only. Paths a level reload no longer lists are
+        dropped again"""
+
+        if not os.path.exists(cache_path):
+            return
+        try:
+            with open(cache_path, "r") as cache_file:
+                entries = json.load(cache_file)
+        except ValueError:
+            return
+        with self.lock:
+            for path, _ in entries:
+                self.add(tuple(path))
@@ -0,0 +1,119 @@
+
+import bisect
+import threading
+import difflib
+from collections import Counter
+
+from entity_search import trigrams
+
+
+class NameIndex:
+
+    """Names of one hierarchy level, prepared for validating typed entries.
+
+    Exact lookups are a set membership test, case-insensitive ones a dict
+    lookup. "Did you mean" suggestions come from the sorted folded names
+    (prefix matches) and a trigram index that picks a few candidates for
+    difflib to rank, so suggestions stay fast with tens of thousands of
+    names. The trigram index of a large level is built in a background
+    thread, fuzzy suggestions are left out till it is ready.
+    """
+
+    # Posting entries counted per fuzzy lookup. The rarest trigrams of the
+    # typed text are counted first, they tell the names apart best
+    POSTINGS_BUDGET = 8000
+    FUZZY_CANDIDATES = 30
+    # Levels up to this size build their trigram index right away
+    EAGER_POSTINGS_LIMIT = 2000
+
+    def __init__(self, names=()) -> None:
+
+        self.names = set(names)
+        self.folded = {}
+        for name in sorted(self.names):
+            self.folded.setdefault(name.casefold(), name)
+        self.sorted_folded = sorted(self.folded)
+        self.postings = None
+        if len(self.sorted_folded) > self.EAGER_POSTINGS_LIMIT:
+            threading.Thread(target=self._build_postings, daemon=True).start()
+        else:
+            self._build_postings()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _build_postings(self) -> None:
+
+        postings = {}
+        for number, folded_name in enumerate(self.sorted_folded):
+            for trigram in trigrams(folded_name):
+                postings.setdefault(trigram, []).append(number)
+        self.postings = postings
+
+    def prefix_matches(self,
+                       folded_text: str,
+                       limit: int) -> list:
+
+        start = bisect.bisect_left(self.sorted_folded, folded_text)
+        matches = []
+        for folded_name in self.sorted_folded[start:start + limit]:
+            if not folded_name.startswith(folded_text):
+                break
+            matches.append(self.folded[folded_name])
+        return matches
+
+    def fuzzy_matches(self,
+                      folded_text: str,
+                      limit: int) -> list:
+
+        postings = self.postings
+        if postings is None:
+            return []
+
+        shared = Counter()
+        budget = self.POSTINGS_BUDGET
+        for numbers in sorted((postings.get(trigram, ()) for trigram in trigrams(folded_text)),
+                              key=len):
+            if len(numbers) > budget:
+                break
+            shared.update(numbers)
+            budget -= len(numbers)
+
+        if shared:
+            candidates = [self.sorted_folded[number]
+                          for number, _ in shared.most_common(self.FUZZY_CANDIDATES)]
+        elif len(self.sorted_folded) <= self.FUZZY_CANDIDATES * 10:
+            candidates = self.sorted_folded
+        else:
+            return []
+
+        return [self.folded[folded_name] for folded_name in
+                difflib.get_close_matches(folded_text, candidates, n=limit, cutoff=0.6)]
+
+    def suggestions(self,
+                    text: str,
+                    limit: int=3) -> list:
+
+        """Names the typed text was probably meant to be. The case
+        insensitive match first, then prefix and fuzzy matches
+
+        Args:
+            text (str): typed entry not found in the names
+            limit (int, optional): suggestions returned. Defaults to 3.
+        """
+
+        folded_text = text.strip().casefold()
+        if not folded_text:
+            return []
+
+        suggestions = []
+        if folded_text in self.folded:
+            suggestions.append(self.folded[folded_text])
+        for name in self.prefix_matches(folded_text, limit) + \
+                self.fuzzy_matches(folded_text, limit):
+            if name not in suggestions:
+                suggestions.append(name)
+        return suggestions[:limit]
@@ -0,0 +1,222 @@
+
+"""Reproducible houdini environment snapshots per launch context.
+
+After the launcher resolved the environment of a context, the PFX*
+variables it set for that context, JOB, HOUDINI_PACKAGE_DIR and
+HOUDINI_BIN_PATH are written into a versioned and checksummed snapshot. Relaunches, farm submissions and
+the headless path load it straight away, without thadam or YAML access.
+
+Each snapshot records the fingerprints of what it was built from
+(settings.yml, subtasks.json and the thadam answers). It is only trusted
+while those fingerprints still match.
+
+Usage:
+    python env_snapshot.py show SHOW SEQUENCE SHOT TASK
+    python env_snapshot.py launch SHOW SEQUENCE SHOT TASK [hip file]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+
+SNAPSHOT_FORMAT_VERSION = 1
+JOB_SNAPSHOT_NAME = "pfx_environment.json"
+SNAPSHOT_VARIABLES = ('JOB', 'HOUDINI_PACKAGE_DIR', 'HOUDINI_BIN_PATH')
+
+
+def snapshot_dir() -> str:
+
+    """Local cache folder of the environment snapshots"""
+
+    cache_dir = os.environ.get('PFX_LAUNCHER_CACHE_DIR') \
+        or os.path.join(os.environ['TEMP'], "pfx_launcher_cache")
+    return os.path.join(cache_dir, "environments")
+
+
+def snapshot_path(cache_dir: str,
+                  context: tuple) -> str:
+
+    """Snapshot file of the show, sequence, shot and task context"""
+
+    show, sequence, shot, task = context
+    return os.path.join(cache_dir, show, *sequence.split('/'), shot, f"{task}.json")
+
+
+def file_fingerprint(file_path: str):
+
+    """sha1 of the file content. None if the file is not reachable"""
+
+    try:
+        with open(file_path, "rb") as source_file:
+            return hashlib.sha1(source_file.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def data_fingerprint(data) -> str:
+
+    """sha1 of json serialisable data, the thadam answers"""
+
+    return hashlib.sha1(
+        json.dumps(data, sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()
+
+
+def is_context_variable(name: str) -> bool:
+
+    """PFX variables the launcher resolves per context. The PFX_ ones
+    configure the launcher itself and are never part of a snapshot"""
+
+    return name.startswith('PFX') and not name.startswith('PFX_')
+
+
+def snapshot_variables(environ,
+                       names) -> dict:
+
+    """Variables of the environment a snapshot keeps. Only the given
+    names, the ones the launcher set for the context. PFX variables left
+    over from other contexts or the launching shell are not captured
+
+    Args:
+        environ: environment the context was resolved into
+        names (iterable): variables set for the context
+    """
+
+    return {name: environ[name] for name in names
+            if name in environ and (is_context_variable(name) or name in SNAPSHOT_VARIABLES)}
+
+
+def _checksum(snapshot: dict) -> str:
+
+    payload = {name: value for name, value in snapshot.items() if name != 'checksum'}
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+
+
+def write_snapshot(file_path: str,
+                   context: tuple,
+                   variables: dict,
+                   sources: dict,
+                   source_files: dict=None) -> dict:
+
+    """Write the snapshot of a resolved context environment
+
+    Args:
+        file_path (str): snapshot file
+        context (tuple): show, sequence, shot and task
+        variables (dict): resolved environment variables
+        sources (dict): fingerprints of the inputs the environment built from
+        source_files (dict, optional): path of the file sources by name, lets
+                                       the headless path recheck them. Defaults to None.
+    """
+
+    snapshot = {
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'context': list(context),
+        'created_at': time.time(),
+        'sources': sources,
+        'source_files': source_files or {},
+        'variables': variables,
+    }
+    snapshot['checksum'] = _checksum(snapshot)
+
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as snapshot_file:
+        json.dump(snapshot, snapshot_file, indent=4)
+    os.replace(temp_path, file_path)
+    return snapshot
+
+
+def load_snapshot(file_path: str):
+
+    """Snapshot of the file. None if missing, of another format version
+    or the checksum does not match the content"""
+
+    try:
+        with open(file_path, "r") as snapshot_file:
+            snapshot = json.load(snapshot_file)
+    except (OSError, ValueError):
+        return None
+    if snapshot.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        return None
+    if snapshot.get('checksum') != _checksum(snapshot):
+        return None
+    return snapshot
+
+
+def is_current(snapshot: dict,
+               sources: dict) -> bool:
+
+    """True if every given source fingerprint matches the ones the
+    snapshot was built from. Only the given sources are compared, the
+    headless path checks the files without knowing the thadam answers
+
+    Args:
+        snapshot (dict): loaded snapshot
+        sources (dict): current fingerprints
+    """
+
+    built_from = snapshot.get('sources', {})
+    for name, fingerprint in sources.items():
+        if name not in built_from or built_from[name] != fingerprint:
+            return False
+    return True
+
+
+def apply_snapshot(snapshot: dict, environ=None) -> None:
+
+    """Load the snapshot variables into the environment. PFX variables
+    left over from an earlier context are removed"""
+
+    environ = os.environ if environ is None else environ
+    for name in [name for name in environ if is_context_variable(name)]:
+        if name not in snapshot['variables']:
+            del environ[name]
+    environ.update(snapshot['variables'])
+
+
+def file_sources(snapshot: dict) -> dict:
+
+    """Current fingerprints of the files the snapshot was built from"""
+
+    return {name: file_fingerprint(snapshot['source_files'][name])
+            for name in snapshot.get('source_files', {})}
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="PFX houdini environment snapshots")
+    parser.add_argument('command', choices=('show', 'launch'))
+    parser.add_argument('context', nargs=4, metavar=('SHOW', 'SEQUENCE', 'SHOT', 'TASK'))
+    parser.add_argument('hip_file', nargs='?')
+    args = parser.parse_args()
+
+    file_path = snapshot_path(snapshot_dir(), tuple(args.context))
+    snapshot = load_snapshot(file_path)
+    if snapshot is None:
+        sys.exit(f"No valid environment snapshot at {file_path}. Launch once from the launcher")
+
+    if not is_current(snapshot, file_sources(snapshot)):
+        sys.exit(f"Environment snapshot {file_path} is stale. Launch once from the launcher")
+
+    if args.command == 'show':
+        for name, value in sorted(snapshot['variables'].items()):
+            print(f"{name}={value}")
+        return
+
+    environ = dict(os.environ)
+    apply_snapshot(snapshot, environ)
+    command = [environ['HOUDINI_BIN_PATH']]
+    if args.hip_file:
+        command.append(args.hip_file)
+    subprocess.Popen(command, env=environ)
+
+
+if __name__ == "__main__":
+    main()
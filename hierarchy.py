@@ -0,0 +1,335 @@
+
+import abc
+import threading
+
+import shared_cache
+from entities import EntityTree
+from entity_search import HierarchySearchIndex
+
+
+class HierarchyProvider(abc.ABC):
+
+    """Base of the show -> sequence -> shot -> task sources of the launcher.
+
+    Every provider works over the same EntityTree. A provider only decides
+    how missing levels are filled into the tree and which children of a
+    level are visible to the user.
+    """
+
+    def __init__(self, tree: EntityTree) -> None:
+        self.tree = tree
+
+    @abc.abstractmethod
+    def projects(self) -> list:
+
+        """Project records visible to the user"""
+
+    @abc.abstractmethod
+    def sequences(self, project_name: str) -> list:
+
+        """Sequence records of the project"""
+
+    @abc.abstractmethod
+    def shots(self,
+              project_name: str,
+              seq_name: str) -> list:
+
+        """Shot records of the sequence"""
+
+    @abc.abstractmethod
+    def tasks(self,
+              project_name: str,
+              seq_name: str,
+              shot_name: str) -> list:
+
+        """Task records of the shot"""
+
+    def invalidate(self) -> None:
+
+        """Forget whatever the provider cached. Next query goes to the source"""
+
+
+class AssignedHierarchyProvider(HierarchyProvider):
+
+    """User assigned entities. A pure filter over the records already
+    marked as assigned in the tree, never query any server"""
+
+    def _assigned_children(self, *names: str) -> list:
+
+        record = self.tree.find(*names)
+        return record.child_records(assigned_only=True) if record else []
+
+    def projects(self) -> list:
+        return self._assigned_children()
+
+    def sequences(self, project_name: str) -> list:
+        return self._assigned_children(project_name)
+
+    def shots(self,
+              project_name: str,
+              seq_name: str) -> list:
+        return self._assigned_children(project_name, seq_name)
+
+    def tasks(self,
+              project_name: str,
+              seq_name: str,
+              shot_name: str) -> list:
+        return self._assigned_children(project_name, seq_name, shot_name)
+
+
+class SourceHierarchyProvider(HierarchyProvider):
+
+    """Every entity of a thadam like source.
+
+    The source is anything having the thadam parser query methods
+    (get_projects, get_sequences, get_shots and get_tasks). Each level is
+    queried once and merged into the tree, later queries of the same level
+    served from the loaded records. Toggling between the views does no
+    network traffic.
+    """
+
+    def __init__(self,
+                 tree: EntityTree,
+                 source) -> None:
+
+        super().__init__(tree)
+        self.source = source
+        # Records the source returned per level, the records themselves
+        # are the shared ones of the tree
+        self.loaded_levels = {}
+
+    def invalidate(self) -> None:
+        self.loaded_levels.clear()
+
+    def projects(self) -> list:
+
+        if () not in self.loaded_levels:
+            self.loaded_levels[()] = sorted(
+                self.tree.merge_projects(self.source.get_projects()),
+                key=lambda record: record.name
+            )
+        return self.loaded_levels[()]
+
+    def sequences(self, project_name: str) -> list:
+
+        level = (project_name,)
+        if level not in self.loaded_levels:
+            self.loaded_levels[level] = self.tree.merge_sequences(
+                project_name,
+                self.source.get_sequences(project_name)
+            )
+        return self.loaded_levels[level]
+
+    def shots(self,
+              project_name: str,
+              seq_name: str) -> list:
+
+        level = (project_name, seq_name)
+        if level not in self.loaded_levels:
+            self.loaded_levels[level] = sorted(
+                self.tree.merge_shots(project_name,
+                                      seq_name,
+                                      self.source.get_shots(project_name, seq_name)),
+                key=lambda record: record.name
+            )
+        return self.loaded_levels[level]
+
+    def tasks(self,
+              project_name: str,
+              seq_name: str,
+              shot_name: str) -> list:
+
+        level = (project_name, seq_name, shot_name)
+        if level not in self.loaded_levels:
+            # Thadam queries the tasks by ids, make sure the parent
+            # levels were loaded so the ids are known
+            self.projects()
+            self.shots(project_name, seq_name)
+            project = self.tree.find(project_name)
+            shot = self.tree.find(project_name, seq_name, shot_name)
+            if project is None or shot is None:
+                return []
+            self.loaded_levels[level] = self.tree.merge_tasks(
+                project_name,
+                seq_name,
+                shot_name,
+                self.source.get_tasks(project_name,
+                                      project.entity_id,
+                                      shot.entity_id)
+            )
+        return self.loaded_levels[level]
+
+
+class HierarchyResolver:
+
+    """Single entry point of the launcher to the hierarchy.
+
+    Holds one provider per view mode over a common tree. Switching the mode
+    only changes which provider answers, the loaded data stays. Every level
+    answered is added to the search index of the "jump to" search. A level
+    of the "all" view replaces the indexed one, entries thadam no longer
+    lists are dropped.
+    """
+
+    ALL = 'all'
+    ASSIGNED = 'assigned'
+
+    def __init__(self,
+                 tree: EntityTree,
+                 providers: dict,
+                 mode: str=ASSIGNED) -> None:
+
+        """
+        Args:
+            tree (EntityTree): tree shared by all the providers
+            providers (dict): provider per mode name
+            mode (str, optional): active mode. Defaults to ASSIGNED.
+        """
+
+        self.tree = tree
+        self.providers = providers
+        self.mode = mode
+        self.search_index = HierarchySearchIndex()
+        self.search_index.add_tree(tree)
+
+    @classmethod
+    def for_source(cls,
+                   source,
+                   user_assigned_entities: dict=None,
+                   tree: EntityTree=None):
+
+        """Resolver with the "all" view over the given thadam like source and
+        the "assigned" view over the user assignments
+
+        Args:
+            source: object with the thadam parser query methods
+            user_assigned_entities (dict, optional): raw thadam assignment payload.
+                                                     Defaults to None.
+            tree (EntityTree, optional): tree to share. Defaults to a new one.
+        """
+
+        tree = tree or EntityTree()
+        if user_assigned_entities:
+            tree.load_user_assignments(user_assigned_entities)
+        return cls(tree, {
+            cls.ALL: SourceHierarchyProvider(tree, source),
+            cls.ASSIGNED: AssignedHierarchyProvider(tree)
+        })
+
+    @property
+    def provider(self) -> HierarchyProvider:
+        return self.providers[self.mode]
+
+    def invalidate(self) -> None:
+        for provider in self.providers.values():
+            provider.invalidate()
+
+    def fill_search_index(self,
+                          source=None,
+                          cache_path: str=None,
+                          pfx_logger=None) -> threading.Thread:
+
+        """Index the whole hierarchy in a background thread, so the "jump
+        to" search also finds the levels nobody browsed. The cached paths
+        of the earlier sessions are loaded first, then every level of the
+        source replaces the cached one. Returns the started thread
+
+        Args:
+            source (optional): local thadam like source crawled completely,
+                               the SQLite export or the shared snapshot.
+                               Defaults to None, only the cache is loaded.
+            cache_path (str, optional): search index cache file. Defaults to None.
+            pfx_logger (optional): PFXLogger instance. Defaults to None.
+        """
+
+        def fill() -> None:
+            if cache_path:
+                self.search_index.load(cache_path)
+            if source is None:
+                return
+
+            shot_paths = {}
+            try:
+                for method_name, args, value in shared_cache.crawl_entities(source):
+                    if method_name == 'get_projects':
+                        self.search_index.replace_children(
+                            (), [project['proj_code'] for project in value]
+                        )
+                    elif method_name == 'get_sequences':
+                        self.search_index.replace_children(
+                            args, [sequence['seq_name'] for sequence in value]
+                        )
+                    elif method_name == 'get_shots':
+                        self.search_index.replace_children(
+                            args, [shot['shot_name'] for shot in value]
+                        )
+                        for shot in value:
+                            shot_paths[(args[0], shot.get('scope_id'))] = args + (shot['shot_name'],)
+                    elif method_name == 'get_tasks':
+                        shot_path = shot_paths.get((args[0], args[2]))
+                        if shot_path:
+                            self.search_index.replace_children(
+                                shot_path,
+                                [task['type_name'] for task in value
+                                 if task['type_name'] and '-' not in task['type_name']]
+                            )
+            except Exception as error:
+                if pfx_logger:
+                    pfx_logger.error_logger(f"Search index fill stopped ({error})")
+                return
+            if pfx_logger:
+                pfx_logger.info_logger(f"Search index filled, {len(self.search_index)} paths")
+
+        thread = threading.Thread(target=fill, name="search-index-fill", daemon=True)
+        thread.start()
+        return thread
+
+    def _index_level(self,
+                     parent_path: tuple,
+                     records: list) -> None:
+
+        # Only the "all" view answers complete levels
+        if self.mode == self.ALL:
+            self.search_index.replace_records(parent_path, records)
+        else:
+            self.search_index.add_records(parent_path, records)
+
+    def search(self,
+               query: str,
+               limit: int=50) -> list:
+
+        """Paths of the search index matching the query in the active mode"""
+
+        return self.search_index.search(query,
+                                        assigned_only=self.mode == self.ASSIGNED,
+                                        limit=limit)
+
+    def projects(self) -> list:
+
+        records = self.provider.projects()
+        self._index_level((), records)
+        return records
+
+    def sequences(self, project_name: str) -> list:
+
+        records = self.provider.sequences(project_name)
+        self._index_level((project_name,), records)
+        return records
+
+    def shots(self,
+              project_name: str,
+              seq_name: str) -> list:
+
+        records = self.provider.shots(project_name, seq_name)
+        self._index_level((project_name, seq_name), records)
+        return records
+
+    def tasks(self,
+              project_name: str,
+              seq_name: str,
+              shot_name: str) -> list:
+
+        records = self.provider.tasks(project_name, seq_name, shot_name)
+        self._index_level((project_name, seq_name, shot_name),
+                          [record for record in records if '-' not in record.name])
+        return records
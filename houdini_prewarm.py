@@ -0,0 +1,364 @@
+
+"""Opt-in pool of idle houdini processes warmed for the last used context.
+
+Only an explicitly configured bootstrap is warmed, never the GUI houdini
+binary. PFX_HOUDINI_PREWARM_BOOTSTRAP holds its command line, e.g.
+
+    hython R:/studio/pipeline/internal/apps/houdini/prewarm_bootstrap.py
+
+The bootstrap is started through the spawner helper with the resolved
+environment of the context and the hip file arguments of the launch. It
+has to block reading a line from its stdin before doing anything visible.
+"launch" on the handover means the artist clicked launch and the context
+is loaded, an end of file means the launcher went away and it quits.
+
+The memory budget of the pool needs the resident memory of its processes.
+psutil measures it when installed, else /proc on linux and the process
+memory counters of kernel32 on windows. Without any of them pre-warming
+stays off.
+"""
+
+import os
+import time
+import shlex
+import ctypes
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def bootstrap_command():
+
+    """Command line of the bootstrap from PFX_HOUDINI_PREWARM_BOOTSTRAP.
+    None if it is not configured"""
+
+    bootstrap = os.environ.get('PFX_HOUDINI_PREWARM_BOOTSTRAP', '').strip()
+    if not bootstrap:
+        return None
+    return shlex.split(bootstrap, posix=os.name != 'nt')
+
+
+def prewarm_enabled() -> bool:
+
+    """Pre-warming is opt-in. Artists or wranglers switch it on
+    through the PFX_HOUDINI_PREWARM environment variable, it stays off
+    till a bootstrap is configured as well"""
+
+    return os.environ.get('PFX_HOUDINI_PREWARM', '0').lower() in ('1', 'true', 'yes', 'on') \
+        and bootstrap_command() is not None
+
+
+def process_memory_mb(pid: int):
+
+    """Resident memory of the given process in megabytes.
+
+    psutil is used when it is installed. On linux the /proc table is
+    read as a fallback, on windows the process memory counters. None
+    returned if the memory can not be measured
+
+    Args:
+        pid (int): process id
+    """
+
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss / (1024 * 1024)
+        except psutil.Error:
+            return None
+
+    statm_path = f"/proc/{pid}/statm"
+    if os.path.exists(statm_path):
+        with open(statm_path, "r") as statm_file:
+            resident_pages = int(statm_file.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    if os.name == 'nt':
+        return _windows_process_memory_mb(pid)
+    return None
+
+
+class _ProcessMemoryCounters(ctypes.Structure):
+
+    """PROCESS_MEMORY_COUNTERS of the windows api"""
+
+    _fields_ = [('cb', ctypes.c_ulong),
+                ('PageFaultCount', ctypes.c_ulong),
+                ('PeakWorkingSetSize', ctypes.c_size_t),
+                ('WorkingSetSize', ctypes.c_size_t),
+                ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t),
+                ('PeakPagefileUsage', ctypes.c_size_t)]
+
+
+def _windows_process_memory_mb(pid: int):
+
+    """Working set of the process through kernel32, the resident memory
+    psutil reports on windows. None if the process can not be opened"""
+
+    process_query_limited_information = 0x1000
+    process_vm_read = 0x0010
+    try:
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    except (AttributeError, OSError):
+        return None
+    kernel32.OpenProcess.restype = ctypes.c_void_p
+    kernel32.OpenProcess.argtypes = [ctypes.c_ulong, ctypes.c_int, ctypes.c_ulong]
+    kernel32.K32GetProcessMemoryInfo.argtypes = [ctypes.c_void_p,
+                                                 ctypes.POINTER(_ProcessMemoryCounters),
+                                                 ctypes.c_ulong]
+    kernel32.CloseHandle.argtypes = [ctypes.c_void_p]
+
+    handle = kernel32.OpenProcess(process_query_limited_information | process_vm_read,
+                                  False, pid)
+    if not handle:
+        return None
+    try:
+        counters = _ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        if not kernel32.K32GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return None
+        return counters.WorkingSetSize / (1024 * 1024)
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def memory_measurable() -> bool:
+
+    """Whether process memory can be measured here at all, the memory
+    budget of the pool depends on it"""
+
+    return process_memory_mb(os.getpid()) is not None
+
+
+class WarmProcess:
+
+    """An idle bootstrap process started ahead of time for a context"""
+
+    __slots__ = ('context', 'command', 'env', 'spawner', 'request_id', 'started_at')
+
+    def __init__(self,
+                 context: tuple,
+                 command: list,
+                 env: dict,
+                 spawner,
+                 request_id: int) -> None:
+
+        self.context = context
+        self.command = list(command)
+        self.env = env
+        self.spawner = spawner
+        self.request_id = request_id
+        self.started_at = time.monotonic()
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def pid(self):
+
+        """Process id once the spawner reported the start"""
+
+        state = self.spawner.process_state(self.request_id)
+        return state['pid'] if state else None
+
+    def is_alive(self) -> bool:
+
+        state = self.spawner.process_state(self.request_id)
+        return self.spawner.is_running() and state is not None \
+            and state['returncode'] is None and state['error'] is None
+
+    def matches(self,
+                context: tuple,
+                command: list,
+                env: dict) -> bool:
+        return self.context == context and self.command == list(command) and self.env == env
+
+    def terminate(self) -> None:
+        if self.is_alive():
+            self.spawner.kill(self.request_id)
+
+
+class HoudiniPrewarmPool:
+
+    """Keeps one or two idle bootstrap processes started in the background
+    with the environment of the most recently used context.
+
+    When the artist launches the very same context, the warm process is
+    handed over instead of a cold start: the spawner writes "launch" to
+    its stdin, the bootstrap blocked on it loads the context then.
+
+    Pool only serves one context at a time. Warming a new context discards
+    the processes of the older one. The pool is bounded by a memory budget
+    and the idle processes are killed after the idle timeout.
+    """
+
+    def __init__(self,
+                 spawner,
+                 bootstrap: list,
+                 pool_size: int=1,
+                 memory_budget_mb: float=4096,
+                 idle_timeout: float=900,
+                 startup_estimate: float=20,
+                 pfx_logger=None) -> None:
+
+        """
+        Args:
+            spawner (houdini_spawner.HoudiniSpawner): running spawner helper
+                                                      the processes are started from
+            bootstrap (list): bootstrap executable and its arguments
+            pool_size (int, optional): Number of idle processes kept. Defaults to 1.
+            memory_budget_mb (float, optional): Max resident memory of all idle
+                                                processes together. Defaults to 4096.
+            idle_timeout (float, optional): Seconds after that an idle process
+                                            killed. Defaults to 900.
+            startup_estimate (float, optional): Seconds houdini takes for a cold
+                                                start. Used to report the saved time.
+                                                Defaults to 20.
+            pfx_logger (optional): PFXLogger instance. Defaults to None.
+        """
+
+        self.spawner = spawner
+        self.bootstrap = list(bootstrap)
+        self.pool_size = max(1, min(pool_size, 2))
+        self.memory_budget_mb = memory_budget_mb
+        self.idle_timeout = idle_timeout
+        self.startup_estimate = startup_estimate
+        self.pfx_logger = pfx_logger
+        self.warm_processes = []
+
+    @classmethod
+    def from_environment(cls,
+                         spawner,
+                         pfx_logger=None):
+
+        """Build the pool from the PFX_HOUDINI_PREWARM_* environment variables"""
+
+        return cls(
+            spawner,
+            bootstrap_command(),
+            pool_size=int(os.environ.get('PFX_HOUDINI_PREWARM_POOL_SIZE', 1)),
+            memory_budget_mb=float(os.environ.get('PFX_HOUDINI_PREWARM_MEMORY_MB', 4096)),
+            idle_timeout=float(os.environ.get('PFX_HOUDINI_PREWARM_IDLE_TIMEOUT', 900)),
+            startup_estimate=float(os.environ.get('PFX_HOUDINI_PREWARM_STARTUP_ESTIMATE', 20)),
+            pfx_logger=pfx_logger
+        )
+
+    def _info(self, message: str) -> None:
+        if self.pfx_logger:
+            self.pfx_logger.info_logger(message)
+
+    def _discard(self, warm_process: WarmProcess, reason: str) -> None:
+
+        self._info(f"Prewarm: discarding request {warm_process.request_id} "
+                   f"pid {warm_process.pid} ({reason})")
+        warm_process.terminate()
+        self.warm_processes.remove(warm_process)
+
+    def command(self, arguments) -> list:
+
+        """Bootstrap command warmed for the given hip file arguments"""
+
+        return self.bootstrap + list(arguments)
+
+    def memory_usage_mb(self) -> float:
+
+        """Total resident memory of the idle processes. Processes that
+        can not be measured were not counted"""
+
+        usage = 0.0
+        for warm_process in self.warm_processes:
+            memory = process_memory_mb(warm_process.pid) if warm_process.pid else None
+            if memory:
+                usage += memory
+        return usage
+
+    def warm(self,
+             context: tuple,
+             arguments: list,
+             env: dict) -> None:
+
+        """Fill the pool with idle processes for the given context.
+
+        Args:
+            context (tuple): show, sequence, shot and task of the launch
+            arguments (list): hip file arguments of the launch
+            env (dict): fully resolved environment of the context
+        """
+
+        command = self.command(arguments)
+        for warm_process in list(self.warm_processes):
+            if not warm_process.matches(context, command, env):
+                self._discard(warm_process, "context changed")
+
+        self.reap()
+        while len(self.warm_processes) < self.pool_size:
+            if self.warm_processes and self.memory_usage_mb() * \
+                (len(self.warm_processes) + 1) / len(self.warm_processes) > self.memory_budget_mb:
+                self._info("Prewarm: memory budget reached. Not warming more processes")
+                break
+            request_id = self.spawner.spawn(command, env, stdin_pipe=True)
+            if request_id is None:
+                self._info(f"Prewarm: spawner not running, could not start {command}")
+                break
+            self.warm_processes.append(
+                WarmProcess(context, command, env, self.spawner, request_id)
+            )
+            self._info(f"Prewarm: requested {command} for {'/'.join(context)}")
+
+    def acquire(self,
+                context: tuple,
+                arguments: list,
+                env: dict):
+
+        """Hand over an idle process that was warmed for exactly this
+        context, hip file arguments and environment.
+
+        The process is removed from the pool and released through its
+        stdin. Returns a tuple of the warm process and the seconds saved,
+        or None when no matching warm process exist.
+
+        Args:
+            context (tuple): show, sequence, shot and task of the launch
+            arguments (list): hip file arguments of the launch
+            env (dict): fully resolved environment of the context
+        """
+
+        self.reap()
+        command = self.command(arguments)
+        for warm_process in self.warm_processes:
+            if warm_process.matches(context, command, env):
+                if not self.spawner.release(warm_process.request_id):
+                    return None
+                self.warm_processes.remove(warm_process)
+                time_saved = min(warm_process.age, self.startup_estimate)
+                self._info(
+                    f"Prewarm: handed over pid {warm_process.pid}, saved {time_saved:.1f}s"
+                )
+                return warm_process, time_saved
+        return None
+
+    def reap(self) -> None:
+
+        """Drop dead processes, kill the idle ones which exceeded the idle
+        timeout and the oldest ones while the pool is over memory budget"""
+
+        for warm_process in list(self.warm_processes):
+            if not warm_process.is_alive():
+                self._discard(warm_process, "exited")
+            elif warm_process.age > self.idle_timeout:
+                self._discard(warm_process, "idle timeout")
+
+        while self.warm_processes and self.memory_usage_mb() > self.memory_budget_mb:
+            self._discard(self.warm_processes[0], "memory budget")
+
+    def shutdown(self) -> None:
+
+        """Kill all the idle processes. Called while the launcher quits"""
+
+        for warm_process in list(self.warm_processes):
+            self._discard(warm_process, "launcher shutdown")
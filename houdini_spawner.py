@@ -0,0 +1,368 @@
+
+"""Spawner helper process of the launcher.
+
+The launcher starts this helper once, while its own process is still
+small. Launch requests carrying the fully resolved environment are sent
+over the helper's stdin as json lines. The helper execs the houdini
+binary directly, without a shell, through os.posix_spawn where the
+platform has it and subprocess.Popen elsewhere. So the cost of a launch
+no longer depends on how big the Qt launcher process has grown.
+
+A request with "stdin": "pipe" starts the process with a pipe on its
+stdin the helper keeps. The pre-warm pool starts its idle bootstrap
+processes that way and later sends further requests about them:
+    {"action": "release", "id": 1, "line": "launch\n"}   write the line, close stdin
+    {"action": "kill", "id": 1}                          kill the process
+
+Events are written back on stdout as json lines:
+    {"event": "started", "id": 1, "pid": 4242}
+    {"event": "failed", "id": 1, "error": "..."}
+    {"event": "exited", "id": 1, "pid": 4242, "returncode": 0}
+
+The helper quits once its stdin closes. Houdini processes already
+started keep running.
+"""
+
+import os
+import sys
+import json
+import queue
+import shutil
+import signal
+import threading
+import subprocess
+
+
+def spawner_enabled() -> bool:
+
+    """The spawner is on by default. PFX_HOUDINI_SPAWNER=0 launches
+    straight from the launcher process again"""
+
+    return os.environ.get('PFX_HOUDINI_SPAWNER', '1').lower() not in ('0', 'false', 'no', 'off')
+
+
+class SpawnedProcess:
+
+    """A process started by the helper"""
+
+    def __init__(self,
+                 pid: int,
+                 wait,
+                 kill,
+                 stdin=None) -> None:
+
+        """
+        Args:
+            pid (int): process id
+            wait: callable waiting for the exit code
+            kill: callable killing the process
+            stdin (optional): binary writer of the stdin pipe. Defaults to None.
+        """
+
+        self.pid = pid
+        self.wait = wait
+        self.kill = kill
+        self.stdin = stdin
+
+    def release(self, line: str) -> None:
+
+        """Write the line to the stdin pipe and close it"""
+
+        if self.stdin is None:
+            return
+        try:
+            self.stdin.write(line.encode('utf-8'))
+            self.stdin.close()
+        except OSError:
+            pass
+        self.stdin = None
+
+
+def spawn_process(command: list,
+                  env: dict,
+                  stdin_pipe: bool=False) -> SpawnedProcess:
+
+    """Start the command without a shell.
+
+    Args:
+        command (list): executable and its arguments
+        env (dict): environment of the new process
+        stdin_pipe (bool, optional): give the process a stdin pipe the
+                                     helper keeps. Defaults to False.
+    """
+
+    if hasattr(os, 'posix_spawn'):
+        executable = shutil.which(command[0], path=env.get('PATH')) or command[0]
+        file_actions = []
+        if stdin_pipe:
+            read_fd, write_fd = os.pipe()
+            file_actions.append((os.POSIX_SPAWN_DUP2, read_fd, 0))
+        try:
+            pid = os.posix_spawn(executable, command, env, file_actions=file_actions)
+        except OSError:
+            if stdin_pipe:
+                os.close(write_fd)
+            raise
+        finally:
+            if stdin_pipe:
+                os.close(read_fd)
+
+        def wait() -> int:
+            _, status = os.waitpid(pid, 0)
+            return os.waitstatus_to_exitcode(status) \
+                if hasattr(os, 'waitstatus_to_exitcode') else status >> 8
+
+        def kill() -> None:
+            os.kill(pid, signal.SIGKILL)
+
+        return SpawnedProcess(pid,
+                              wait,
+                              kill,
+                              os.fdopen(write_fd, "wb") if stdin_pipe else None)
+
+    process = subprocess.Popen(command,
+                               env=env,
+                               stdin=subprocess.PIPE if stdin_pipe else None,
+                               close_fds=True)
+    return SpawnedProcess(process.pid, process.wait, process.kill, process.stdin)
+
+
+def serve(requests, events) -> None:
+
+    """Spawn a process per request line till the requests run out
+
+    Args:
+        requests: binary stream of json line launch requests
+        events: binary stream the json line events are written to
+    """
+
+    events_lock = threading.Lock()
+    processes = {}
+
+    def send(event: dict) -> None:
+        with events_lock:
+            events.write(json.dumps(event).encode('utf-8') + b"\n")
+            events.flush()
+
+    def report_exit(request_id, process: SpawnedProcess) -> None:
+        returncode = process.wait()
+        processes.pop(request_id, None)
+        send({'event': 'exited', 'id': request_id, 'pid': process.pid, 'returncode': returncode})
+
+    for line in requests:
+        if not line.strip():
+            continue
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            action = request.get('action', 'spawn')
+
+            if action in ('release', 'kill'):
+                process = processes.get(request_id)
+                if process is None:
+                    continue
+                if action == 'release':
+                    process.release(request.get('line', "launch\n"))
+                else:
+                    process.kill()
+                continue
+
+            process = spawn_process(request['command'],
+                                    request['env'],
+                                    stdin_pipe=request.get('stdin') == 'pipe')
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            send({'event': 'failed', 'id': request_id, 'error': str(error)})
+            continue
+
+        processes[request_id] = process
+        send({'event': 'started', 'id': request_id, 'pid': process.pid})
+        threading.Thread(target=report_exit,
+                         args=(request_id, process),
+                         daemon=True).start()
+
+
+class HoudiniSpawner:
+
+    """Launcher side of the spawner helper.
+
+    spawn() only writes the request to the helper. The started, failed and
+    exited events are read in a background thread and handed out by
+    poll_events(), the launcher polls them from a Qt timer. The latest
+    state of every spawned process is kept as well, for process_state().
+    """
+
+    def __init__(self, pfx_logger=None) -> None:
+
+        """
+        Args:
+            pfx_logger (optional): PFXLogger instance. Defaults to None.
+        """
+
+        self.pfx_logger = pfx_logger
+        self.process = None
+        self.events = queue.Queue()
+        self.states = {}
+        self.next_request_id = 1
+        self.write_lock = threading.Lock()
+
+    def _info(self, message: str) -> None:
+        if self.pfx_logger:
+            self.pfx_logger.info_logger(message)
+
+    def start(self) -> bool:
+
+        """Start the helper process. False if it could not be started"""
+
+        try:
+            self.process = subprocess.Popen([sys.executable, os.path.abspath(__file__)],
+                                            stdin=subprocess.PIPE,
+                                            stdout=subprocess.PIPE,
+                                            close_fds=True)
+        except OSError as error:
+            self._info(f"Spawner: helper could not be started ({error})")
+            self.process = None
+            return False
+
+        threading.Thread(target=self._read_events, daemon=True).start()
+        self._info(f"Spawner: helper running as pid {self.process.pid}")
+        return True
+
+    def _read_events(self) -> None:
+
+        for line in self.process.stdout:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            state = self.states.get(event.get('id'))
+            if state is not None:
+                if event['event'] == 'started':
+                    state['pid'] = event['pid']
+                elif event['event'] == 'exited':
+                    state['returncode'] = event['returncode']
+                elif event['event'] == 'failed':
+                    state['error'] = event['error']
+            self.events.put(event)
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def _send(self, request: dict) -> bool:
+
+        try:
+            self.process.stdin.write(json.dumps(request).encode('utf-8') + b"\n")
+            self.process.stdin.flush()
+        except OSError as error:
+            self._info(f"Spawner: helper not reachable ({error})")
+            return False
+        return True
+
+    def spawn(self,
+              command: list,
+              env: dict,
+              stdin_pipe: bool=False):
+
+        """Send a launch request to the helper.
+
+        Returns the request id the events of the launch carry. None if
+        the helper is not running, the caller launches by itself then.
+
+        Args:
+            command (list): houdini binary and its arguments
+            env (dict): fully resolved environment of the launch
+            stdin_pipe (bool, optional): start the process with a stdin
+                                         pipe for release(). Defaults to False.
+        """
+
+        if not self.is_running():
+            return None
+
+        with self.write_lock:
+            request_id = self.next_request_id
+            self.next_request_id += 1
+            request = {'id': request_id, 'command': list(command), 'env': dict(env)}
+            if stdin_pipe:
+                request['stdin'] = 'pipe'
+            self.states[request_id] = {'pid': None, 'returncode': None, 'error': None}
+            if not self._send(request):
+                del self.states[request_id]
+                return None
+        return request_id
+
+    def release(self,
+                request_id: int,
+                line: str="launch\n") -> bool:
+
+        """Write the line to the stdin pipe of a process spawned with
+        stdin_pipe and close it"""
+
+        if not self.is_running():
+            return False
+        with self.write_lock:
+            return self._send({'action': 'release', 'id': request_id, 'line': line})
+
+    def kill(self, request_id: int) -> bool:
+
+        """Kill a process spawned by the helper"""
+
+        if not self.is_running():
+            return False
+        with self.write_lock:
+            return self._send({'action': 'kill', 'id': request_id})
+
+    def process_state(self, request_id: int):
+
+        """Latest pid, returncode and error reported for the request.
+        None if the request is not known"""
+
+        return self.states.get(request_id)
+
+    def poll_events(self) -> list:
+
+        """Events received since the last poll"""
+
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def shutdown(self) -> None:
+
+        """Close the helper's stdin. The helper quits, launched houdini
+        processes keep running"""
+
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.process = None
+
+
+def main() -> None:
+
+    """Helper entry point. The request and event pipes are moved off the
+    standard streams first, so houdini inherits the launcher's console
+    output and never writes into the event pipe"""
+
+    requests = os.fdopen(os.dup(sys.stdin.fileno()), "rb")
+    events = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    os.dup2(2, 1)
+
+    serve(requests, events)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+
+"""Local launch history of the launcher.
+
+Every launch is appended to a SQLite file with its context, the All or
+User view it was picked in, houdini version, launch mode and the seconds
+each launch phase took. The process events reported afterwards (started,
+failed, exited) are appended as well. Rows are never updated. The
+launcher ranks its recent contexts list from it by frecency, and the CLI
+aggregates it.
+
+Usage:
+    python launch_history.py summary [--by context|show|task|version|user|day] [--days 30]
+    python launch_history.py phases [--days 30]
+    python launch_history.py recent [--limit 10]
+"""
+
+import os
+import time
+import sqlite3
+import argparse
+import statistics
+from contextlib import contextmanager
+
+HISTORY_FILE_NAME = "launch_history.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS launches (
+    launch_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    launched_at REAL NOT NULL,
+    user TEXT,
+    show TEXT NOT NULL,
+    sequence TEXT NOT NULL,
+    shot TEXT NOT NULL,
+    task TEXT NOT NULL,
+    view_mode TEXT,
+    houdini_version TEXT,
+    mode TEXT,
+    status TEXT NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS launch_phases (
+    launch_id INTEGER NOT NULL,
+    phase TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS launch_events (
+    launch_id INTEGER NOT NULL,
+    recorded_at REAL NOT NULL,
+    event TEXT NOT NULL,
+    pid INTEGER,
+    returncode INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS launches_launched_at ON launches (launched_at);
+CREATE INDEX IF NOT EXISTS launch_phases_launch_id ON launch_phases (launch_id);
+CREATE INDEX IF NOT EXISTS launch_events_launch_id ON launch_events (launch_id);
+"""
+
+# Frecency weight of a launch by its age in days, newest bucket first
+FRECENCY_BUCKETS = ((4, 100), (14, 70), (31, 50), (90, 30))
+FRECENCY_OLDEST_WEIGHT = 10
+
+SUMMARY_GROUPS = {
+    'context': "show || ' / ' || sequence || ' / ' || shot || ' / ' || task",
+    'show': "show",
+    'task': "task",
+    'version': "COALESCE(houdini_version, '-')",
+    'user': "COALESCE(user, '-')",
+    'day': "date(launched_at, 'unixepoch', 'localtime')",
+}
+
+
+def history_path() -> str:
+
+    """SQLite file of the history. PFX_LAUNCH_HISTORY, else inside the
+    launcher cache folder"""
+
+    if os.environ.get('PFX_LAUNCH_HISTORY'):
+        return os.environ['PFX_LAUNCH_HISTORY']
+    cache_dir = os.environ.get('PFX_LAUNCHER_CACHE_DIR') \
+        or os.path.join(os.environ['TEMP'], "pfx_launcher_cache")
+    return os.path.join(cache_dir, HISTORY_FILE_NAME)
+
+
+def frecency_weight(age_days: float) -> int:
+
+    for max_age_days, weight in FRECENCY_BUCKETS:
+        if age_days < max_age_days:
+            return weight
+    return FRECENCY_OLDEST_WEIGHT
+
+
+class PhaseTimings:
+
+    """Seconds each phase of a launch took, in the order they ran"""
+
+    def __init__(self) -> None:
+        self.durations = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + \
+                time.perf_counter() - start
+
+    @property
+    def total(self) -> float:
+        return sum(self.durations.values())
+
+
+class LaunchHistory:
+
+    """Append only launch history in a local SQLite file.
+
+    Recording never raises. A locked or unwritable history is logged and
+    the launch goes on without it.
+    """
+
+    def __init__(self,
+                 db_path: str,
+                 pfx_logger=None) -> None:
+
+        """
+        Args:
+            db_path (str): SQLite file, created with its folder if missing
+            pfx_logger (optional): PFXLogger instance. Defaults to None.
+        """
+
+        self.db_path = db_path
+        self.pfx_logger = pfx_logger
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.connection = sqlite3.connect(db_path, timeout=5)
+        self.connection.executescript(SCHEMA)
+        # Histories written before the view mode was recorded
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(launches)")]
+        if 'view_mode' not in columns:
+            with self.connection:
+                self.connection.execute("ALTER TABLE launches ADD COLUMN view_mode TEXT")
+
+    @classmethod
+    def from_environment(cls, pfx_logger=None):
+
+        """History at history_path(). Falls back to an in memory history
+        for the session if the file can not be opened"""
+
+        try:
+            return cls(history_path(), pfx_logger=pfx_logger)
+        except (sqlite3.Error, OSError) as error:
+            if pfx_logger:
+                pfx_logger.error_logger(f"Launch history not available ({error})")
+            return cls(":memory:", pfx_logger=pfx_logger)
+
+    def _error(self, message: str) -> None:
+        if self.pfx_logger:
+            self.pfx_logger.error_logger(message)
+
+    def record_launch(self,
+                      context: tuple,
+                      phases: PhaseTimings,
+                      houdini_version: str=None,
+                      mode: str=None,
+                      status: str='launched',
+                      error: str=None,
+                      user: str=None,
+                      view_mode: str=None):
+
+        """Append a launch with its phase timings. Returns its launch id,
+        None if it could not be written
+
+        Args:
+            context (tuple): show, sequence, shot and task
+            phases (PhaseTimings): timings of the launch phases
+            houdini_version (str, optional): launched version. Defaults to None.
+            mode (str, optional): spawner, direct or prewarm. Defaults to None.
+            status (str, optional): launched or failed. Defaults to 'launched'.
+            error (str, optional): reason of a failed launch. Defaults to None.
+            user (str, optional): artist name. Defaults to None.
+            view_mode (str, optional): hierarchy mode the context was picked in,
+                                       all or assigned. Defaults to None.
+        """
+
+        try:
+            with self.connection:
+                cursor = self.connection.execute(
+                    "INSERT INTO launches (launched_at, user, show, sequence, shot, task, "
+                    "view_mode, houdini_version, mode, status, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (time.time(), user, *context, view_mode, houdini_version, mode, status, error)
+                )
+                launch_id = cursor.lastrowid
+                self.connection.executemany(
+                    "INSERT INTO launch_phases (launch_id, phase, seconds) VALUES (?, ?, ?)",
+                    [(launch_id, name, seconds) for name, seconds in phases.durations.items()]
+                )
+            return launch_id
+        except sqlite3.Error as error:
+            self._error(f"Launch history not written ({error})")
+            return None
+
+    def record_event(self,
+                     launch_id: int,
+                     event: str,
+                     pid: int=None,
+                     returncode: int=None,
+                     error: str=None) -> None:
+
+        """Append a process event of a recorded launch"""
+
+        if launch_id is None:
+            return
+        try:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO launch_events (launch_id, recorded_at, event, pid, returncode, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (launch_id, time.time(), event, pid, returncode, error)
+                )
+        except sqlite3.Error as error:
+            self._error(f"Launch history event not written ({error})")
+
+    def recent_contexts(self,
+                        limit: int=10,
+                        window: int=500) -> list:
+
+        """Contexts of the latest successful launches ranked by frecency.
+        Launches the spawner reported failed afterwards do not count.
+        Returns a list of context tuple, score and the view mode of the
+        latest launch of the context (None for launches recorded without)
+
+        Args:
+            limit (int, optional): contexts returned. Defaults to 10.
+            window (int, optional): latest launches looked at. Defaults to 500.
+        """
+
+        try:
+            rows = self.connection.execute(
+                "SELECT show, sequence, shot, task, view_mode, launched_at FROM launches "
+                "WHERE status = 'launched' AND NOT EXISTS (SELECT 1 FROM launch_events e "
+                "WHERE e.launch_id = launches.launch_id AND e.event = 'failed') "
+                "ORDER BY launch_id DESC LIMIT ?", (window,)
+            ).fetchall()
+        except sqlite3.Error as error:
+            self._error(f"Launch history not readable ({error})")
+            return []
+
+        now = time.time()
+        scores = {}
+        view_modes = {}
+        for show, sequence, shot, task, view_mode, launched_at in rows:
+            context = (show, sequence, shot, task)
+            scores[context] = scores.get(context, 0) + \
+                frecency_weight((now - launched_at) / 86400)
+            # Rows come newest first
+            view_modes.setdefault(context, view_mode)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [(context, score, view_modes[context]) for context, score in ranked[:limit]]
+
+    def summary(self,
+                group_by: str='context',
+                days: float=30) -> list:
+
+        """Rows of group, launches, failures, houdini exits with an
+        error code and average launch seconds
+
+        Args:
+            group_by (str, optional): one of SUMMARY_GROUPS. Defaults to 'context'.
+            days (float, optional): look back days. Defaults to 30.
+        """
+
+        group = SUMMARY_GROUPS[group_by]
+        return self.connection.execute(
+            f"SELECT {group} AS grp, COUNT(*), "
+            "SUM(status = 'failed'), "
+            "SUM(EXISTS (SELECT 1 FROM launch_events e WHERE e.launch_id = launches.launch_id "
+            "AND ((e.event = 'exited' AND e.returncode != 0) OR e.event = 'failed'))), "
+            "AVG((SELECT SUM(seconds) FROM launch_phases p WHERE p.launch_id = launches.launch_id)) "
+            "FROM launches WHERE launched_at >= ? GROUP BY grp ORDER BY COUNT(*) DESC",
+            (time.time() - days * 86400,)
+        ).fetchall()
+
+    def phase_summary(self, days: float=30) -> list:
+
+        """Rows of phase, runs, median, 95th percentile and max seconds"""
+
+        samples = {}
+        for phase, seconds in self.connection.execute(
+            "SELECT phase, seconds FROM launch_phases JOIN launches USING (launch_id) "
+            "WHERE launched_at >= ? ORDER BY launch_phases.rowid",
+            (time.time() - days * 86400,)
+        ):
+            samples.setdefault(phase, []).append(seconds)
+
+        rows = []
+        for phase, values in samples.items():
+            values.sort()
+            percentile_95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            rows.append((phase, len(values), statistics.median(values),
+                         percentile_95, values[-1]))
+        return rows
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="PFX launcher launch history")
+    parser.add_argument('command', choices=('summary', 'phases', 'recent'))
+    parser.add_argument('--by', choices=sorted(SUMMARY_GROUPS), default='context')
+    parser.add_argument('--days', type=float, default=30)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--history', default=None,
+                        help="history file (default PFX_LAUNCH_HISTORY or the launcher cache)")
+    args = parser.parse_args()
+
+    history = LaunchHistory(args.history or history_path())
+
+    if args.command == 'summary':
+        print(f"{args.by:50} {'launches':>8} {'failed':>7} {'errors':>7} {'avg s':>7}")
+        for group, launches, failed, errors, average in history.summary(args.by, args.days):
+            print(f"{str(group):50} {launches:8} {failed or 0:7} {errors or 0:7} "
+                  f"{average or 0.0:7.2f}")
+
+    elif args.command == 'phases':
+        print(f"{'phase':24} {'runs':>6} {'median s':>9} {'p95 s':>9} {'max s':>9}")
+        for phase, runs, median, percentile_95, maximum in history.phase_summary(args.days):
+            print(f"{phase:24} {runs:6} {median:9.3f} {percentile_95:9.3f} {maximum:9.3f}")
+
+    else:
+        for context, score, _ in history.recent_contexts(args.limit):
+            print(f"{score:6}  {' / '.join(context)}")
+
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
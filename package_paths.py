@@ -0,0 +1,153 @@
+
+import os
+import time
+
+
+def split_paths(path_list: str) -> list:
+
+    """Entries of a ; or os.pathsep separated path variable"""
+
+    entries = []
+    for entry in path_list.replace(os.pathsep, ';').split(';'):
+        entry = entry.strip()
+        if entry:
+            entries.append(entry)
+    return entries
+
+
+def is_houdini_token(entry: str) -> bool:
+
+    """Entries houdini expands itself, the & default path or a $VARIABLE
+    such as $HFS, $HOUDINI_USER_PREF_DIR or $HIP. They can not be checked
+    from the launcher and are kept as they are"""
+
+    return '&' in entry or '$' in entry
+
+
+class PackageDirectory:
+
+    """Scan result of a single package directory. Houdini token entries
+    are not scanned"""
+
+    __slots__ = ('path', 'token', 'exists', 'package_files')
+
+    def __init__(self, path: str) -> None:
+
+        self.path = path
+        self.token = is_houdini_token(path)
+        self.exists = not self.token and os.path.isdir(path)
+        self.package_files = []
+        if self.exists:
+            try:
+                with os.scandir(path) as entries:
+                    self.package_files = sorted(
+                        entry.name for entry in entries
+                        if entry.name.lower().endswith('.json') and entry.is_file()
+                    )
+            except OSError:
+                self.exists = False
+
+    @property
+    def kept(self) -> bool:
+
+        """Part of HOUDINI_PACKAGE_DIR, a houdini token or a directory
+        holding at least one package file"""
+
+        return self.token or bool(self.package_files)
+
+
+class PackagePathResolver:
+
+    """Resolves HOUDINI_PACKAGE_DIR for a houdini version.
+
+    The studio wide package directories (HOUDINI_PACKAGE_DIR as it was when
+    the launcher started) come first, then the per version internal package
+    directories. Duplicates, directories that do not exist and directories
+    without any package json file are dropped, so houdini scans as few
+    network paths as possible on startup. Entries with houdini tokens
+    (& or $VARIABLE) are kept untouched in their place. Directory scans
+    are cached per version for max_age seconds. Resolving never reads the
+    current HOUDINI_PACKAGE_DIR, repeated launches give the same value.
+    """
+
+    def __init__(self,
+                 base_package_dir: str,
+                 internal_package_dir: str,
+                 max_age: float=300) -> None:
+
+        """
+        Args:
+            base_package_dir (str): HOUDINI_PACKAGE_DIR at launcher startup
+            internal_package_dir (str): HOUDINI_INTERNAL_PACKAGE_DIR roots, the
+                                        version folders live under them
+            max_age (float, optional): Seconds a directory scan is trusted.
+                                       Defaults to 300.
+        """
+
+        self.base_entries = split_paths(base_package_dir)
+        self.internal_roots = split_paths(internal_package_dir)
+        self.max_age = max_age
+        self.resolved = {}
+
+    @classmethod
+    def from_environment(cls):
+        return cls(os.environ.get('HOUDINI_PACKAGE_DIR', ''),
+                   os.environ.get('HOUDINI_INTERNAL_PACKAGE_DIR', ''))
+
+    def candidate_dirs(self, houdini_version: str) -> list:
+
+        """Package directories of the version before validation. Internal
+        roots that already carry the version in their path were skipped"""
+
+        candidates = list(self.base_entries)
+        for internal_root in self.internal_roots:
+            if houdini_version not in internal_root:
+                candidates.append(os.path.join(internal_root, houdini_version))
+        return candidates
+
+    def scan(self, houdini_version: str) -> list:
+
+        """Scanned and deduped package directories of the version,
+        served from the cache while it is younger than max_age"""
+
+        cached = self.resolved.get(houdini_version)
+        if cached and time.monotonic() - cached[0] < self.max_age:
+            return cached[1]
+
+        seen = set()
+        directories = []
+        for candidate in self.candidate_dirs(houdini_version):
+            if not is_houdini_token(candidate):
+                candidate = os.path.normpath(candidate)
+            key = os.path.normcase(candidate)
+            if key in seen:
+                continue
+            seen.add(key)
+            directories.append(PackageDirectory(candidate))
+
+        self.resolved[houdini_version] = (time.monotonic(), directories)
+        return directories
+
+    def package_dirs(self, houdini_version: str) -> list:
+
+        """Directories holding at least one package file and the houdini
+        token entries, in their order"""
+
+        return [directory.path for directory in self.scan(houdini_version)
+                if directory.kept]
+
+    def dropped_dirs(self, houdini_version: str) -> list:
+
+        """Candidate directories left out, missing or without packages"""
+
+        return [directory.path for directory in self.scan(houdini_version)
+                if not directory.kept]
+
+    def package_dir(self, houdini_version: str) -> str:
+
+        """HOUDINI_PACKAGE_DIR value of the version"""
+
+        return os.pathsep.join(self.package_dirs(houdini_version))
+
+    def invalidate(self) -> None:
+        self.resolved.clear()
@@ -1,17 +1,32 @@
 
 import os
 import sys 
+import functools
 import requests
 import yaml
 import json
 import subprocess
 from shutil import which
+from concurrent.futures import ThreadPoolExecutor
 from PySide2.QtUiTools import QUiLoader
 from PySide2 import QtWidgets
-from PySide2.QtCore import Qt
+from PySide2.QtCore import Qt, QTimer, QStringListModel
 from PySide2.QtGui import QPixmap
-from thadam_base import thadam_api
 from thadam_base import logger
+import houdini_prewarm
+import hierarchy
+import thadam_client
+import shared_cache
+import env_snapshot
+import package_paths
+import scope_presets
+import houdini_spawner
+import launch_history
+import subtask_index
+import entity_validation
+import entity_backends
+
+TEMPLATE_HIP_FILE = r"R:/studio/pipeline/internal/apps/houdini/19.5.493/hip/generic/generic_workflow.hip"
 
 class PfxHoudiniLauncher(QtWidgets.QMainWindow):
     
@@ -49,32 +64,73 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
         
         dirname = os.path.dirname(__file__)
         ui_file = os.path.join(dirname, 
-                               "ui\pfx_houdini_shot_launcher.ui"
+                               "ui",
+                               "pfx_houdini_shot_launcher.ui"
         )
         ui_loader = QUiLoader()
         self.launcher_window = ui_loader.load(ui_file)
         self.pfx_logger.info_logger("PFX GUI Loading")
 
-        self.thadam_api_server = thadam_api.ThadamParser()
-        self.thadam_user_api_server = thadam_api.ThadamUserParser()
-        self.pfx_logger.info_logger(f"Running From API {thadam_api.ThadamRestServer().api}")
-        self.pfx_logger.info_logger("Initializing thadam parser")
+        # Thadam parsers wrapped with short timeouts, a circuit breaker 
+        # and the local offline cache. The http requests made inside 
+        # thadam api get the call timeout as well
+        self.thadam_connection = thadam_client.ThadamConnection.from_environment(
+                                                            pfx_logger=self.pfx_logger
+        )
         
-        self.pfx_logger.info_logger("Collecting User Assigned Entities...")
-        self.user_info = \
-                self.thadam_user_api_server.get_artist_details(
-                    artist_name=os.environ['USERNAME']
-                )
-        self.pfx_logger.info_logger(self.user_info)
+        # Subtasks and frame ranges of a whole sequence, scanned in the
+        # background and read once the sequence is picked
+        self.subtask_index = subtask_index.SubtaskIndex(
+                    self.root_subtask_path,
+                    os.path.join(self.thadam_connection.cache.cache_dir, "subtask_index"),
+                    pfx_logger=self.pfx_logger
+        )
         
-        self.user_assigned_entities = \
-            self.thadam_user_api_server.get_artist_assigned_item_details(
-                        artist_id=self.user_info['id']
+        # Entity backend chosen by PFX_ENTITY_BACKEND, the thadam server 
+        # or a local SQLite export. For thadam the studio wide snapshot on 
+        # the shared drive answers the entity queries first, only the 
+        # misses reach the server. A local export is queried directly
+        self.entity_backend = entity_backends.backend_from_environment()
+        if self.entity_backend.remote:
+            self.thadam_connection.shared_cache = \
+                                shared_cache.SharedSnapshotCache.from_environment()
+            self.thadam_api_server = self.thadam_connection.client(
+                                                self.entity_backend.entity_parser, 
+                                                "entities", 
+                                                shared=self.entity_backend.shared_cache
             )
-        self.pfx_logger.info_logger("Collected User Assigned Entities")
-        self.pfx_logger.info_logger(
-            json.dumps(self.user_assigned_entities, indent=4)
+            self.thadam_user_api_server = self.thadam_connection.client(
+                                                self.entity_backend.user_parser, "users"
+            )
+        else:
+            self.thadam_api_server = self.entity_backend.entity_parser()
+            self.thadam_user_api_server = self.entity_backend.user_parser()
+        self.pfx_logger.info_logger(f"Running From {self.entity_backend.description()}")
+        self.pfx_logger.info_logger("Initializing thadam parser")
+        
+        user_assigned_entities = self.fetch_user_assigned_entities()
+        # Assignments refetched after a reconnect on a worker of its own,
+        # the thadam workers stay free for the queries it makes
+        self.assignment_refresh_executor = ThreadPoolExecutor(
+                                                max_workers=1,
+                                                thread_name_prefix="assignments"
         )
+        self.user_assignment_refresh = None
+        self.was_offline = False
+        
+        # Compact hierarchy shared by the user and "All" views. The raw 
+        # assignment payload is not kept around once it is loaded.
+        # Switching views only swaps the provider over the loaded tree
+        self.hierarchy = hierarchy.HierarchyResolver.for_source(
+                                        self.thadam_api_server,
+                                        user_assigned_entities
+        )
+        
+        # Captures HOUDINI_PACKAGE_DIR as the launcher was started with
+        self.package_resolver = package_paths.PackagePathResolver.from_environment()
+        # Environment variables the current launch context set, the ones
+        # the environment snapshot keeps
+        self.context_variables = set()
         
         self.show_combo_box = self.launcher_window.findChild(
             QtWidgets.QComboBox,
@@ -125,6 +181,57 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
             QtWidgets.QLabel,
             "icon"
         )
+        
+        self.jump_to_line_edit = self.launcher_window.findChild(
+            QtWidgets.QLineEdit,
+            "jump_to_lineedit"
+        )
+        
+        self.connection_status_label = self.launcher_window.findChild(
+            QtWidgets.QLabel,
+            "connection_status_label"
+        )
+        
+        self.validation_label = self.launcher_window.findChild(
+            QtWidgets.QLabel,
+            "validation_label"
+        )
+        
+        self.recent_contexts_combo_box = self.launcher_window.findChild(
+            QtWidgets.QComboBox,
+            "recent_contexts_combobox"
+        )
+        
+        # Offline / stale indicator and the refresh once thadam is back
+        self.connection_status_timer = QTimer(self)
+        self.connection_status_timer.timeout.connect(self.update_connection_status)
+        self.connection_status_timer.start(2 * 1000)
+        QtWidgets.QApplication.instance().aboutToQuit.connect(
+                                            self.thadam_connection.shutdown
+        )
+        QtWidgets.QApplication.instance().aboutToQuit.connect(
+                                            self.subtask_index.shutdown
+        )
+        QtWidgets.QApplication.instance().aboutToQuit.connect(
+            functools.partial(self.assignment_refresh_executor.shutdown, wait=False)
+        )
+        # Entity records of the current selection
+        self.projects = []
+        self.get_sequences = []
+        self.shots = []
+        self.task_types = []
+        self.shot_frame_ranges = {}
+        
+        # Name set of every level, the typed entries are validated against
+        self.validation_warnings = {
+            self.show_combo_box: "Entered Project Does Not Exist!!",
+            self.sequence_combo_box: "Entered Sequence Does Not Exist!!",
+            self.shot_combo_box: "Entered Shot Does Not Exist!!",
+            self.task_combo_box: "Entered Task Does Not Exist!!",
+        }
+        self.entity_names = {combo_box: entity_validation.NameIndex()
+                             for combo_box in self.validation_warnings}
+        
         # Signals triggered if the radio button is changed
         self.user_radio_btn.toggled.connect(self.set_projects)
         self.all_radio_btn.toggled.connect(self.set_projects)
@@ -148,6 +255,22 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
         self.configure_widget_text_completer(self.shot_combo_box, "Select Shot..")
         self.configure_widget_text_completer(self.task_combo_box, "Select Task..")
         
+        # Typed entry validation. Checks are debounced, the duplicate 
+        # editingFinished signals of one edit collapse into one check
+        self.pending_validations = {}
+        self.validation_owner = None
+        self.validation_timer = QTimer(self)
+        self.validation_timer.setSingleShot(True)
+        self.validation_timer.setInterval(150)
+        self.validation_timer.timeout.connect(self.run_pending_validations)
+        for combo_box in self.validation_warnings:
+            combo_box.lineEdit().textEdited.connect(
+                functools.partial(self.schedule_validation, combo_box, False)
+            )
+            combo_box.lineEdit().editingFinished.connect(
+                functools.partial(self.schedule_validation, combo_box, True)
+            )
+        
         self.launch_houdini_button.clicked.connect(self.launch_houdini)
         
         # Load sequence and the project info from the thadam server 
@@ -170,15 +293,208 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
         
         # Task selection signals to the sub task module
         self.task_combo_box.activated[str].connect(self.sub_task)
+        self.shot_combo_box.activated[str].connect(self.set_task)
         
         tool_icon = os.path.join(dirname, "icons/satellite.png")
         tool_pixmap = QPixmap(tool_icon)
         self.master_icon.setPixmap(tool_pixmap.scaled(60,60, Qt.KeepAspectRatio))
         
+        # Scope preset window, built on the first use and then reused
+        self.sp = None
         self.presets_button.clicked.connect(self.launch_preset_gui)
+        
+        # Global "jump to" search over the whole hierarchy. Results
+        # were filtered by the index itself, the completer only shows them.
+        # Filled in the background from the local export or the shared 
+        # snapshot. Straight from thadam only the browsed levels are known
+        self.search_index_cache = os.path.join(os.environ['TEMP'], 
+                                               "launcher_search_index.json")
+        search_source = None
+        if not self.entity_backend.remote:
+            search_source = self.thadam_api_server
+        elif self.thadam_connection.shared_cache:
+            search_source = self.thadam_connection.shared_cache.parser()
+        self.hierarchy.fill_search_index(search_source,
+                                         cache_path=self.search_index_cache,
+                                         pfx_logger=self.pfx_logger)
+        self.jump_to_results = {}
+        self.jump_to_model = QStringListModel(self)
+        jump_to_completer = QtWidgets.QCompleter(self.jump_to_model, self)
+        jump_to_completer.setCompletionMode(
+            QtWidgets.QCompleter.UnfilteredPopupCompletion
+        )
+        self.jump_to_line_edit.setCompleter(jump_to_completer)
+        self.jump_to_line_edit.textEdited.connect(self.update_jump_to_results)
+        jump_to_completer.activated[str].connect(self.jump_to_context)
+        QtWidgets.QApplication.instance().aboutToQuit.connect(
+            lambda: self.hierarchy.search_index.save(self.search_index_cache)
+        )
+        
+        # Helper process houdini is spawned from. Started once, launches 
+        # no longer fork the launcher process or go through a shell
+        self.spawner = None
+        self.launched_processes = {}
+        if houdini_spawner.spawner_enabled():
+            spawner = houdini_spawner.HoudiniSpawner(pfx_logger=self.pfx_logger)
+            if spawner.start():
+                self.spawner = spawner
+                self.spawner_events_timer = QTimer(self)
+                self.spawner_events_timer.timeout.connect(self.handle_spawner_events)
+                self.spawner_events_timer.start(1000)
+        
+        # Opt-in pool of idle bootstrap processes warmed through the 
+        # spawner with the environment of the last launched context
+        self.prewarm_pool = None
+        if houdini_prewarm.prewarm_enabled():
+            if not houdini_prewarm.memory_measurable():
+                self.pfx_logger.error_logger("Prewarm memory budget can not be measured "
+                                             "(psutil missing). Not pre-warming")
+            elif self.spawner:
+                self.prewarm_pool = houdini_prewarm.HoudiniPrewarmPool.from_environment(
+                                                                self.spawner,
+                                                                pfx_logger=self.pfx_logger
+                )
+                self.prewarm_reap_timer = QTimer(self)
+                self.prewarm_reap_timer.timeout.connect(self.prewarm_pool.reap)
+                self.prewarm_reap_timer.start(30 * 1000)
+                QtWidgets.QApplication.instance().aboutToQuit.connect(
+                                                        self.prewarm_pool.shutdown
+                )
+            else:
+                self.pfx_logger.error_logger("Prewarm needs the spawner helper. Not pre-warming")
+        
+        # After the pool, its idle processes are killed through the helper
+        if self.spawner:
+            QtWidgets.QApplication.instance().aboutToQuit.connect(
+                                                    self.spawner.shutdown
+            )
+        
+        # Local launch history. Ranks the recent contexts list, a pick 
+        # there fills every level at once
+        self.launch_history = launch_history.LaunchHistory.from_environment(
+                                                        pfx_logger=self.pfx_logger
+        )
+        QtWidgets.QApplication.instance().aboutToQuit.connect(
+                                                self.launch_history.close
+        )
+        self.recent_contexts_combo_box.activated[int].connect(self.apply_recent_context)
+        self.refresh_recent_contexts()
+        
         if os.path.exists(self.launcher_preset):
             self.apply_values_to_launcher_fields(self.launcher_preset)
+            self.prewarm_last_context()
+        
+        
+    def fetch_user_assigned_entities(self) -> dict:
+        
+        """Query the artist details and the user assigned entities. 
+        Served from the offline cache if thadam not reachable. Empty 
+        assignments returned if nothing was cached either
+        """
+        
+        self.pfx_logger.info_logger("Collecting User Assigned Entities...")
+        self.user_info = None
+        try:
+            self.user_info, user_assigned_entities = self.query_user_assignments()
+        except thadam_client.ThadamUnavailable as error:
+            self.pfx_logger.error_logger(str(error))
+            return {}
+        
+        self.pfx_logger.info_logger(self.user_info)
+        if not self.user_info:
+            self.pfx_logger.error_logger(f"No artist details for {os.environ['USERNAME']}")
+            return {}
+        
+        self.pfx_logger.info_logger("Collected User Assigned Entities")
+        self.pfx_logger.info_logger(
+            json.dumps(user_assigned_entities, indent=4)
+        )
+        return user_assigned_entities
+    
+    def query_user_assignments(self) -> tuple:
+        
+        """Artist details and user assigned entities from thadam. Runs on
+        the refresh worker as well, so it touches no launcher state and 
+        logs nothing. Details are None for an unknown artist. Raises 
+        ThadamUnavailable if thadam is not reachable and nothing cached
+        """
+        
+        user_info = self.thadam_user_api_server.get_artist_details(
+                            artist_name=os.environ['USERNAME']
+        )
+        if not user_info:
+            return None, {}
+        return user_info, self.thadam_user_api_server.get_artist_assigned_item_details(
+                                                            artist_id=user_info['id']
+        )
+    
+    def update_connection_status(self) -> None:
+        
+        """Show the offline / stale indicator, or the age of the shared 
+        snapshot when an outdated one answered. Once thadam is reachable 
+        again the cached hierarchy dropped and the user assignments 
+        refetched in the background
+        """
+        
+        if self.thadam_connection.offline:
+            self.was_offline = True
+            self.connection_status_label.setText("OFFLINE - Showing Cached Data")
+            return
+        
+        if self.was_offline:
+            self.was_offline = False
+            self.pfx_logger.info_logger("Thadam back online. Refreshing..")
+            self.hierarchy.invalidate()
+            self.user_assignment_refresh = self.assignment_refresh_executor.submit(
+                                                    self.query_user_assignments
+            )
         
+        if self.user_assignment_refresh and self.user_assignment_refresh.done():
+            refresh = self.user_assignment_refresh
+            self.user_assignment_refresh = None
+            try:
+                user_info, user_assigned_entities = refresh.result()
+            except thadam_client.ThadamUnavailable as error:
+                self.pfx_logger.error_logger(f"Assignments not refreshed ({error})")
+            else:
+                if user_info:
+                    # Rebuilt, entities unassigned meanwhile lose their mark
+                    self.user_info = user_info
+                    self.hierarchy.tree.replace_user_assignments(user_assigned_entities)
+                    self.hierarchy.search_index.clear_assigned()
+                    self.hierarchy.search_index.add_tree(self.hierarchy.tree, 
+                                                         assigned_only=True)
+                    self.thadam_connection.stale = False
+                    self.pfx_logger.info_logger("User assignments refreshed")
+        
+        snapshot = self.thadam_connection.shared_cache
+        if self.thadam_connection.stale:
+            self.connection_status_label.setText("STALE - Showing Cached Data")
+        elif snapshot and snapshot.hits and not snapshot.is_fresh and snapshot.age is not None:
+            self.connection_status_label.setText(
+                        f"Shared Snapshot {snapshot.age / 60:.0f} min old"
+            )
+        else:
+            self.connection_status_label.clear()
+    
+    def query_hierarchy(self, 
+                        level: str, 
+                        *names: str) -> list:
+        
+        """Records of the given hierarchy level. Empty list returned with a 
+        warning if thadam not reachable and the level was never cached
+        
+        Args:
+            level (str): resolver method name (projects, sequences, shots, tasks)
+            names (str): names of the parent levels
+        """
+        
+        try:
+            return getattr(self.hierarchy, level)(*names)
+        except thadam_client.ThadamUnavailable as error:
+            self.pfx_logger.error_logger(str(error))
+            self.connection_status_label.setText("OFFLINE - Not Cached, Retry Later")
+            return []
         
     def show_warning_gui(self, 
                      message: str) -> None:
@@ -225,18 +541,64 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
         )
         widget.setCurrentIndex(-1)  
     
+    def schedule_validation(self,
+                            combo_box: QtWidgets.QComboBox,
+                            final: bool,
+                            *_) -> None:
+        
+        """Queue a typed entry check of the combo box and restart the 
+        debounce timer
+        
+        Args:
+            combo_box (QtWidgets.QComboBox): edited combo box
+            final (bool): True once editing finished, False while typing
+        """
+        
+        self.pending_validations[combo_box] = \
+            self.pending_validations.get(combo_box, False) or final
+        self.validation_timer.start()
+    
+    def run_pending_validations(self) -> None:
+        
+        """Check the entries queued during the debounce interval"""
+        
+        pending_validations, self.pending_validations = self.pending_validations, {}
+        for combo_box, final in pending_validations.items():
+            self.thadam_entity_exist(combo_box,
+                                     self.entity_names[combo_box],
+                                     combo_box.currentText(),
+                                     final=final,
+                                     warning=self.validation_warnings[combo_box]
+            )
+    
+    def show_validation_message(self,
+                                widgets: QtWidgets,
+                                message: str) -> None:
+        
+        """Inline, non modal validation message of the widget. An empty
+        message clears it if the widget is the one it was shown for"""
+        
+        if message:
+            self.validation_owner = widgets
+            self.validation_label.setText(message)
+        elif self.validation_owner is widgets:
+            self.validation_owner = None
+            self.validation_label.clear()
+    
     def thadam_entity_exist(self,
                             widgets : QtWidgets,
-                            thadam_entities: list,
+                            entity_names: entity_validation.NameIndex,
                             selected_entity: str,
-                            warning: str='') -> None:
+                            final: bool=True,
+                            warning: str='') -> bool:
         """Method checks whether the user entered words
-        exist in the dropdown item. If not exist throw
-        Warning QT message box exceptions.
+        exist in the dropdown item. If not exist the warning
+        and "did you mean" suggestions shown inline under 
+        the combo boxes.
         
-        If the passed QT widget item matches with the 
-        predefined object name then it perform those section
-        operations. 
+        While typing only an entry no name starts with is 
+        flagged. Once editing finished a wrong entry clears 
+        the fields depending on it. 
         
         Example:
             If the Show typed entry made by the user is wrong
@@ -245,69 +607,75 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
 
         Args:
             widgets (QtWidgets): The Qtwidget Object 
-            thadam_entities (list): List of collection gathered from the 
+            entity_names (entity_validation.NameIndex): Names of the 
                                     respective entities
             selected_entity (str): Selected entity from dropdown
+            final (bool, optional): Editing finished. Defaults to True.
             warning (str, optional): Respective warning message. Defaults to ''.
         """
         
-        # Iterate through the catched entities and if the list 
-        # contains the user typed entity then make the enity_exist status true
-        # nothing proceed.
-        entity_exist = False
-        if selected_entity:
-            for entities in thadam_entities:
-                for _, entity_name in entities.items():
-                    if selected_entity == entity_name:
-                        entity_exist = True
-                        
-            # IF the entered entity is not exist in the entity list then 
-            # the warning message showed from where the user 
-            # performing operations from 
-            if not entity_exist:
-                self.show_warning_gui(warning)
-                self.pfx_logger.error_logger(warning) 
-                if widgets.objectName() == "show_list_combobox":
-                    self.pfx_logger.error_logger(
-                            f"Entered Show \"{self.show_combo_box.currentText()}\" Does not Exist.Clearing all"
-                    ) 
-                    self.show_info_plaintextedit.clear()
-                    self.show_combo_box.lineEdit().clear()
-                    self.sequence_combo_box.lineEdit().clear()
-                    self.shot_combo_box.lineEdit().clear()
-                    self.task_combo_box.lineEdit().clear()
-                    
-                    
-                if widgets.objectName() == "sequence_list_combobox":
-                    logger_msg  = f"Entered Sequence \"{self.sequence_combo_box.currentText()}\""
-                    logger_msg  += "Does not Exist. Clearing sequence, shot and task"
-                    
-                    self.pfx_logger.error_logger(
-                        logger_msg
-                    )
-                    self.sequence_combo_box.lineEdit().clear()
-                    self.shot_combo_box.lineEdit().clear()
-                    self.task_combo_box.lineEdit().clear()
-                     
-                    
-                if widgets.objectName() == "shot_list_combobox":
-                    
-                    self.pfx_logger.error_logger(
-                        f"Entered Shot \"{self.shot_combo_box.currentText()}\" Does not Exist. Clearing shot and task"
-                    ) 
-                    self.shot_combo_box.lineEdit().clear()
-                    self.task_combo_box.lineEdit().clear()
-                    
-                    
-                if widgets.objectName() == "task_list_combobox":
-                    
-                    self.pfx_logger.error_logger(
-                                f"Entered Task \"{self.task_combo_box.currentText()}\" Does not Exist. Clearing task"
-                    ) 
-                    self.task_combo_box.lineEdit().clear()
-                    
-
-
+        if not selected_entity or selected_entity in entity_names:
+            self.show_validation_message(widgets, '')
+            return True
+        
+        suggestions = entity_names.suggestions(selected_entity)
+        did_you_mean = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ''
+        
+        if not final:
+            if entity_names.prefix_matches(selected_entity.casefold(), 1):
+                self.show_validation_message(widgets, '')
+            else:
+                self.show_validation_message(
+                    widgets, f"No match for \"{selected_entity}\".{did_you_mean}"
+                )
+            return False
+        
+        # IF the entered entity is not exist in the entity list then 
+        # the warning showed inline and the fields depending on
+        # it cleared
+        self.show_validation_message(widgets, f"{warning}{did_you_mean}")
+        self.pfx_logger.error_logger(warning) 
+        if widgets.objectName() == "show_list_combobox":
+            self.pfx_logger.error_logger(
+                    f"Entered Show \"{self.show_combo_box.currentText()}\" Does not Exist.Clearing all"
+            ) 
+            self.show_info_plaintextedit.clear()
+            self.show_combo_box.lineEdit().clear()
+            self.sequence_combo_box.lineEdit().clear()
+            self.shot_combo_box.lineEdit().clear()
+            self.task_combo_box.lineEdit().clear()
+            
+            
+        if widgets.objectName() == "sequence_list_combobox":
+            logger_msg  = f"Entered Sequence \"{self.sequence_combo_box.currentText()}\""
+            logger_msg  += "Does not Exist. Clearing sequence, shot and task"
+            
+            self.pfx_logger.error_logger(
+                logger_msg
+            )
+            self.sequence_combo_box.lineEdit().clear()
+            self.shot_combo_box.lineEdit().clear()
+            self.task_combo_box.lineEdit().clear()
+             
+            
+        if widgets.objectName() == "shot_list_combobox":
+            
+            self.pfx_logger.error_logger(
+                f"Entered Shot \"{self.shot_combo_box.currentText()}\" Does not Exist. Clearing shot and task"
+            ) 
+            self.shot_combo_box.lineEdit().clear()
+            self.task_combo_box.lineEdit().clear()
+            
+            
+        if widgets.objectName() == "task_list_combobox":
+            
+            self.pfx_logger.error_logger(
+                        f"Entered Task \"{self.task_combo_box.currentText()}\" Does not Exist. Clearing task"
+            ) 
+            self.task_combo_box.lineEdit().clear()
+        
+        return False
+        
     def set_project_info(self, project_name: str) -> None:
         
         """Project level configuration files pulled from the 
@@ -322,16 +690,25 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
                                 file from 
         """
         self.show_info_plaintextedit.clear()
-        self.project_infos = self.thadam_api_server.get_project_infos(project_name)
+        try:
+            self.project_infos = self.thadam_api_server.get_project_infos(project_name)
+        except thadam_client.ThadamUnavailable as error:
+            self.pfx_logger.error_logger(str(error))
+            self.project_infos = []
         for project_infos in self.project_infos:
             for title, value in project_infos.items():
                 self.show_info_plaintextedit.appendPlainText(title +" : " + str(value))
         
-        custom_env_path = r'%s\%s\settings.yml' \
-                                            %(os.environ['HOUDINI_SHOW_SETTINGS'],
-                                              self.show_combo_box.currentText()
-                                            )                      
-        if not os.path.exists(custom_env_path):
+        custom_env_path = os.path.join(os.environ['HOUDINI_SHOW_SETTINGS'],
+                                       self.show_combo_box.currentText(),
+                                       "settings.yml"
+        )
+        self.custom_env_path = custom_env_path
+        # Read through the offline cache, the last good copy is used
+        # while the settings share is not reachable
+        custom_env_file = self.thadam_connection.cache.load_file(custom_env_path,
+                                                                 yaml.safe_load)
+        if custom_env_file is None:
             
             self.show_msg_box("Project Settings Not Configured!!..")
             self.sequence_combo_box.clear()
@@ -340,8 +717,7 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
             ) 
 
         else:                                               
-            with open(custom_env_path, 'r') as cus_env_file:
-                self.custom_env_file = yaml.safe_load(cus_env_file)
+            self.custom_env_file = custom_env_file
             self.pfx_logger.info_logger(f"{custom_env_path} loaded!!")
             
             for title, value in self.custom_env_file.items():
@@ -391,31 +767,19 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
         self.task_combo_box.clear()
         
         if self.all_radio_btn.isChecked():
-            self.projects = self.thadam_api_server.get_projects()
-            self.projects = sorted(self.projects, key=lambda d: d['proj_code'])
-            
-            
+            self.hierarchy.mode = hierarchy.HierarchyResolver.ALL
         if self.user_radio_btn.isChecked():
-            self.projects= []
-            for project in list(self.user_assigned_entities):
-                project_dict = {}
-                project_dict['proj_code'] =  project
-                if project_dict not in self.projects:
-                    self.projects.append(project_dict)
+            self.hierarchy.mode = hierarchy.HierarchyResolver.ASSIGNED
+        self.projects = self.query_hierarchy('projects')
 
         for project in self.projects:
-            self.show_combo_box.addItem(project['proj_code'])
+            self.show_combo_box.addItem(project.name)
+        self.entity_names[self.show_combo_box] = entity_validation.NameIndex(
+                                        project.name for project in self.projects
+        )
         
         self.show_combo_box.setCurrentIndex(-1) 
         
-        self.show_combo_box.lineEdit().editingFinished.connect(
-            lambda : self.thadam_entity_exist(self.show_combo_box,
-                                              self.projects, 
-                                              self.show_combo_box.currentText(),
-                                              warning="Entered Project Does Not Exist!!",
-            )
-        )
-        
     def set_sequence(self, 
                      project_name:str
         )-> None:
@@ -432,31 +796,15 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
         self.shot_combo_box.clear()
         self.task_combo_box.clear()
         
-        if self.all_radio_btn.isChecked():
-            self.get_sequences = self.thadam_api_server.get_sequences(project_name)
-            
-        if self.user_radio_btn.isChecked():
-            self.get_sequences = []
-            for sequence in self.user_assigned_entities[project_name]:
-                sequence_dict = {}
-                sequence_dict['seq_name'] =  list(sequence.keys())[0]
-                if sequence_dict not in self.get_sequences:
-                    self.get_sequences.append(sequence_dict)
-
+        self.get_sequences = self.query_hierarchy('sequences', project_name)
         for sequence in self.get_sequences:
-            sequences.add(sequence['seq_name'])
+            sequences.add(sequence.name)
         
         for sequence in sorted(sequences):
             self.sequence_combo_box.addItem(sequence)
+        self.entity_names[self.sequence_combo_box] = entity_validation.NameIndex(sequences)
         
         self.sequence_combo_box.setCurrentIndex(-1)
-        self.sequence_combo_box.lineEdit().editingFinished.connect(
-            lambda : self.thadam_entity_exist(self.sequence_combo_box,
-                                              self.get_sequences, 
-                                              self.sequence_combo_box.currentText(),
-                                              warning="Entered Sequence Does Not Exist!!",
-            )
-        )
         
      
     def set_shot(self, 
@@ -474,25 +822,27 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
         self.shot_combo_box.clear()
         self.task_combo_box.clear()
         
-        if self.all_radio_btn.isChecked():
-            self.shots = self.thadam_api_server.get_shots(project_name,
-                                                    seq_name
-            )
-            self.shots = sorted(self.shots, key=lambda d: d['shot_name'])
-            
-        if self.user_radio_btn.isChecked():
-            self.shots = []
-            for sequences in self.user_assigned_entities[project_name]:
-                try:
-                    for shots in sequences[seq_name]:
-                        shot_dict = {}
-                        shot_dict['shot_name'] =  shots
-                        if shot_dict not in self.shots:
-                            self.shots.append(shot_dict)
-                except KeyError: pass
+        self.shots = self.query_hierarchy('shots', project_name, seq_name)
                 
         for shot in self.shots:
-            self.shot_combo_box.addItem(shot['shot_name'])
+            self.shot_combo_box.addItem(shot.name)
+        self.entity_names[self.shot_combo_box] = entity_validation.NameIndex(
+                                        shot.name for shot in self.shots
+        )
+        
+        # Frame range per shot of the sequence. Thadam's frame range wins, 
+        # the sequence index only keeps the ones thadam answered earlier and
+        # fills them in while thadam has none for a shot right now
+        self.subtask_index.open_sequence(
+                    project_name,
+                    seq_name,
+                    {shot.name: shot.frame_range for shot in self.shots if shot.frame_range}
+        )
+        index_frame_ranges = self.subtask_index.frame_ranges(project_name, seq_name)
+        self.shot_frame_ranges = {
+            shot.name: shot.frame_range or index_frame_ranges.get(shot.name)
+            for shot in self.shots
+        }
         
         self.preserve_text_edit_cursor_position(
                     self.frame_range_text_edit_last_cursor_positions
@@ -500,14 +850,6 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
         self.show_info_plaintextedit.insertPlainText(" ")
         
         self.shot_combo_box.setCurrentIndex(-1)
-        self.shot_combo_box.activated[str].connect(self.set_task)
-        self.shot_combo_box.lineEdit().editingFinished.connect(
-            lambda : self.thadam_entity_exist(self.shot_combo_box,
-                                              self.shots, 
-                                              self.shot_combo_box.currentText(),
-                                              warning="Entered Shot Does Not Exist!!",
-            )
-        )
     
     def set_task(self) -> None:
         
@@ -521,70 +863,39 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
         get_selected_sequence = self.sequence_combo_box.currentText()
         get_selected_shot = self.shot_combo_box.currentText()
         
-        if self.all_radio_btn.isChecked():
-            for project in self.projects:
-                if project['proj_code'] == get_selected_project_name:
-                    get_selected_show_id = project['proj_id']
-            
-            for shots in self.shots:
-                if shots['shot_name'] == get_selected_shot:
-                    get_selected_shot_id = shots['scope_id']
-
-            self.task_types = self.thadam_api_server.get_tasks(
-                                                        get_selected_project_name,
-                                                        get_selected_show_id,
-                                                        get_selected_shot_id
-            )
-        if self.user_radio_btn.isChecked():
-            
-            get_selected_shot = self.shot_combo_box.currentText()
-            self.task_types = []
-            for sequences in self.user_assigned_entities[get_selected_project_name]:
-                try:
-                    for shots in sequences[get_selected_sequence]:
-                        if shots == get_selected_shot:
-                            for task in sequences[get_selected_sequence][shots]:
-                                task_dict = {}
-                                task_dict['type_name'] =  task
-                                if task_dict not in self.task_types:
-                                    self.task_types.append(task_dict)
-                except: pass          
+        self.task_types = self.query_hierarchy('tasks',
+                                               get_selected_project_name,
+                                               get_selected_sequence,
+                                               get_selected_shot
+        )
         
         self.preserve_text_edit_cursor_position(self.frame_range_text_edit_last_cursor_positions)
 
         # If shots have the frame range then it given priority
         # the frame ranfe property updated with this else it 
         # take from the task
-        for shot in self.shots:
-            if 'shot_name' in shot:
-                if shot['shot_name'] == self.shot_combo_box.currentText():
-                    if 'frame_range' in shot:
-                        if shot['frame_range']:
-                            self.frame_range = shot['frame_range']
-                            self.show_info_plaintextedit.insertPlainText(
-                                "\nframe_range : " + self.frame_range
-                            )
-                        else:
-                            self.frame_range = '1001-1200'
-                            self.show_info_plaintextedit.insertPlainText(
-                                "\nframe_range [launcher] : " + self.frame_range
-                            )
+        if get_selected_shot in self.shot_frame_ranges:
+            if self.shot_frame_ranges[get_selected_shot]:
+                self.frame_range = self.shot_frame_ranges[get_selected_shot]
+                self.show_info_plaintextedit.insertPlainText(
+                    "\nframe_range : " + self.frame_range
+                )
+            elif self.all_radio_btn.isChecked():
+                self.frame_range = '1001-1200'
+                self.show_info_plaintextedit.insertPlainText(
+                    "\nframe_range [launcher] : " + self.frame_range
+                )
         # If the shot dont have frame range and taske has
         # the it given priority         
         for task_types in self.task_types:
-            if task_types['type_name']:
-                if '-' in task_types['type_name']:
-                    self.frame_range = task_types['type_name']
+            if task_types.name:
+                if '-' in task_types.name:
+                    self.frame_range = task_types.name
                     self.show_info_plaintextedit.insertPlainText(
                         "\nframe_range : " + self.frame_range
                     )
-                elif not task_types['type_name']:
-                    self.frame_range = '1001-1200' 
-                    self.show_info_plaintextedit.insertPlainText(
-                        "\nframe_range [launcher] : " + self.frame_range
-                    )
                 else:
-                    tasks.add(task_types['type_name'])
+                    tasks.add(task_types.name)
             else:
                 self.frame_range = '1001-1200'
                 self.show_info_plaintextedit.insertPlainText(
@@ -593,14 +904,8 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
                 
         for task_types in sorted(tasks):
             self.task_combo_box.addItem(task_types)
+        self.entity_names[self.task_combo_box] = entity_validation.NameIndex(tasks)
         self.task_combo_box.setCurrentIndex(-1)
-        self.task_combo_box.lineEdit().editingFinished.connect(
-            lambda : self.thadam_entity_exist(self.task_combo_box,
-                                              self.task_types, 
-                                              self.task_combo_box.currentText(),
-                                              warning="Entered Task Does Not Exist!!",
-            )
-        )
         self.show_info_plaintextedit.insertPlainText(" ")
 
     def sub_task_file_path(self) -> None:
@@ -621,11 +926,15 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
         """
         Gather all the sub tasks and show cases in the text info
         """
-        subtask_file = self.sub_task_file_path()
-        
-        if os.path.exists(subtask_file):
-            with open(subtask_file, "r") as subtaskfile:
-                self.subtasks = json.load(subtaskfile)
+        # The sequence index answers from memory. Only while it is not
+        # built yet the subtasks file itself is read
+        known, subtasks = self.subtask_index.lookup(*self.current_context())
+        if not known:
+            subtasks = self.thadam_connection.cache.load_file(self.sub_task_file_path(),
+                                                              json.load)
+        
+        if subtasks is not None:
+            self.subtasks = subtasks
 
             self.preserve_text_edit_cursor_position(
                         self.sub_task_text_edit_last_cursor_positions
@@ -643,33 +952,39 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
     def generate_houdini_environment_variables(self) -> None:
         
         """ Generate all the environment variables to ingest 
-        while opening houdini"""
+        while opening houdini. The variables set are recorded in
+        context_variables, the ones an earlier context set and this one
+        does not are removed"""
+        
+        for name in self.context_variables:
+            os.environ.pop(name, None)
+        self.context_variables = set()
         
-        os.environ['PFXSHOW'] = self.show_combo_box.currentText()
+        self.set_context_variable('PFXSHOW', self.show_combo_box.currentText())
         self.pfx_logger.info_logger(f"Project Setted \"{os.environ['PFXSHOW']}\"")
         
-        os.environ['PFXPRDSTEP'] = self.sequence_combo_box.currentText().split('/')[0]
+        self.set_context_variable('PFXPRDSTEP', self.sequence_combo_box.currentText().split('/')[0])
         self.pfx_logger.info_logger(f"Production Step Setted \"{os.environ['PFXPRDSTEP']}\"")
         
-        os.environ['PFXSEQ'] = self.sequence_combo_box.currentText().split('/')[-1]
+        self.set_context_variable('PFXSEQ', self.sequence_combo_box.currentText().split('/')[-1])
         self.pfx_logger.info_logger(f"Sequence Setted \"{os.environ['PFXSEQ']}\"")
         
-        os.environ['PFXSHOT'] = self.shot_combo_box.currentText()
+        self.set_context_variable('PFXSHOT', self.shot_combo_box.currentText())
         self.pfx_logger.info_logger(f"Shot Setted \"{os.environ['PFXSHOT']}\"")
         
-        os.environ['PFXTASK'] = self.task_combo_box.currentText()
+        self.set_context_variable('PFXTASK', self.task_combo_box.currentText())
         self.pfx_logger.info_logger(f"Shot Setted \"{os.environ['PFXTASK']}\"")
         
         # Frame range environment variable created if available
         if hasattr(self,'frame_range'):
-            os.environ['PFXFRAME_RANGE'] = self.frame_range
+            self.set_context_variable('PFXFRAME_RANGE', self.frame_range)
             self.pfx_logger.info_logger(f"Frame Range Setted \"{os.environ['PFXFRAME_RANGE']}\"")
         else:
             self.pfx_logger.error_logger(f"No Frame range setted. Production Call!!")
         
         # Sub Tasks Created if existed 
         if hasattr(self,'subtasks'):
-            os.environ['PFXSUBTASKS'] = ",".join(self.subtasks)
+            self.set_context_variable('PFXSUBTASKS', ",".join(self.subtasks))
             self.pfx_logger.info_logger(f"Retrived Subtasks \"{os.environ['PFXSUBTASKS']}\"")
         else:
             self.pfx_logger.error_logger(f"No Subtasks Setted. Lead or Sup Call!!")
@@ -677,40 +992,141 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
             
         for project_infos in self.project_infos:
             for title, value in project_infos.items():
-                os.environ[f'PFX{title.upper()}'] = str(value)
+                self.set_context_variable(f'PFX{title.upper()}', str(value))
                 self.pfx_logger.info_logger(f'PFX{title.upper()} = {str(value)}')
                 
         for title, value in self.custom_env_file.items():
             
-            os.environ[f'PFX{title.upper()}'] = str(value)
+            self.set_context_variable(f'PFX{title.upper()}', str(value))
             self.pfx_logger.info_logger(f'PFX{title.upper()} = {str(value)}')
             
         # Fx publish dir path 
-        os.environ[f'PFXFX_PUBLISH_DIR'] = os.environ['FX_PUBLISH_DB_DIR']
+        self.set_context_variable(f'PFXFX_PUBLISH_DIR', os.environ['FX_PUBLISH_DB_DIR'])
         self.pfx_logger.info_logger(f"fx publish dir setted to \"{os.environ[f'PFXFX_PUBLISH_DIR']}\"")
         
-        os.environ['JOB'] = os.environ['PFXPROJECT_PATH'] + '/' + \
-                os.environ['PFXSHOW'] + '/' + \
-                os.environ['PFXSEQ']  + '/' + \
-                os.environ['PFXSHOT'] + '/' + \
-                os.environ['PFXTASK'] + '/' + \
-                self.user_name   
+        self.set_context_variable(
+                    'JOB', 
+                    os.environ['PFXPROJECT_PATH'] + '/' + 
+                    os.environ['PFXSHOW'] + '/' + 
+                    os.environ['PFXSEQ']  + '/' + 
+                    os.environ['PFXSHOT'] + '/' + 
+                    os.environ['PFXTASK'] + '/' + 
+                    self.user_name
+        )
         self.pfx_logger.info_logger(f"JOB = \"{os.environ['JOB']}\"")
         
-        houdini_internal_pkg_dir = ''
-        for houdini_internal_pkg_dirs in os.environ['HOUDINI_INTERNAL_PACKAGE_DIR'].split(';'):
-            if os.environ['PFXHOUDINI_VERSION'] not in houdini_internal_pkg_dirs: 
-                houdini_internal_pkg_dir += \
-                    houdini_internal_pkg_dirs + os.sep + os.environ['PFXHOUDINI_VERSION'] + ';'
-  
-        if houdini_internal_pkg_dir not in os.environ['HOUDINI_PACKAGE_DIR']:
-            os.environ['HOUDINI_PACKAGE_DIR'] +=  os.pathsep + houdini_internal_pkg_dir
+        # Built from the package directories of the launcher startup, not 
+        # the current value, so relaunches never grow the variable
+        houdini_version = os.environ['PFXHOUDINI_VERSION']
+        self.set_context_variable('HOUDINI_PACKAGE_DIR', 
+                                  self.package_resolver.package_dir(houdini_version))
+        for dropped_dir in self.package_resolver.dropped_dirs(houdini_version):
+            self.pfx_logger.info_logger(f"Skipped package dir without packages \"{dropped_dir}\"")
         self.pfx_logger.info_logger(f"HOUDINI_PACKAGE_DIR = \"{os.environ['HOUDINI_PACKAGE_DIR']}\"")
          
-        os.environ['HOUDINI_BIN_PATH'] = \
-            fr"C:\Program Files\Side Effects Software\Houdini {os.environ['PFXHOUDINI_VERSION']}\bin\houdini.exe"
+        self.set_context_variable(
+                    'HOUDINI_BIN_PATH',
+                    fr"C:\Program Files\Side Effects Software\Houdini {os.environ['PFXHOUDINI_VERSION']}\bin\houdini.exe"
+        )
         self.pfx_logger.info_logger(f"Houdini exe path = \"{os.environ['HOUDINI_BIN_PATH']}\"")
         
+    def set_context_variable(self, 
+                             name: str, 
+                             value: str) -> None:
+        
+        """Set an environment variable of the launch context and record
+        it for the environment snapshot"""
+        
+        os.environ[name] = value
+        self.context_variables.add(name)
+        
+    def environment_snapshot_sources(self) -> dict:
+        
+        """Fingerprints of everything the context environment is built 
+        from. settings.yml, subtasks.json, the thadam answers and the 
+        launcher inputs of generate_houdini_environment_variables"""
+        
+        return {
+            'settings': env_snapshot.file_fingerprint(self.custom_env_path),
+            'subtasks': env_snapshot.file_fingerprint(self.sub_task_file_path()),
+            'thadam': env_snapshot.data_fingerprint([
+                self.project_infos,
+                getattr(self, 'frame_range', None),
+                self.subtasks
+            ]),
+            'launcher': env_snapshot.data_fingerprint({
+                'fx_publish_db_dir': os.environ.get('FX_PUBLISH_DB_DIR'),
+                'user_name': self.user_name,
+                'package_dir': self.package_resolver.base_entries,
+                'internal_package_dir': self.package_resolver.internal_roots,
+                'template_hip_file': TEMPLATE_HIP_FILE
+            })
+        }
+    
+    def snapshot_package_dir_is_current(self, snapshot: dict) -> bool:
+        
+        """True if the package directories of the snapshot version still
+        resolve to its HOUDINI_PACKAGE_DIR. Package folders appear and 
+        empty out without any of the fingerprinted sources changing
+        
+        Args:
+            snapshot (dict): loaded snapshot
+        """
+        
+        variables = snapshot['variables']
+        houdini_version = variables.get('PFXHOUDINI_VERSION')
+        if not houdini_version:
+            return False
+        return variables.get('HOUDINI_PACKAGE_DIR') == \
+            self.package_resolver.package_dir(houdini_version)
+    
+    def resolve_houdini_environment(self) -> None:
+        
+        """Load the environment snapshot of the current context if it is
+        still current with its sources. Else generate the environment 
+        variables and write a new snapshot for the later launches
+        """
+        
+        context = self.current_context()
+        snapshot_file = env_snapshot.snapshot_path(env_snapshot.snapshot_dir(), context)
+        sources = self.environment_snapshot_sources()
+        
+        snapshot = env_snapshot.load_snapshot(snapshot_file)
+        if snapshot and env_snapshot.is_current(snapshot, sources) \
+            and self.snapshot_package_dir_is_current(snapshot):
+            env_snapshot.apply_snapshot(snapshot)
+            self.context_variables = set(snapshot['variables'])
+            self.pfx_logger.info_logger(f"Environment loaded from snapshot {snapshot_file}")
+            return
+        
+        self.generate_houdini_environment_variables()
+        env_snapshot.write_snapshot(
+                            snapshot_file,
+                            context,
+                            env_snapshot.snapshot_variables(os.environ, self.context_variables),
+                            sources,
+                            source_files={'settings': self.custom_env_path,
+                                          'subtasks': self.sub_task_file_path()}
+        )
+        self.pfx_logger.info_logger(f"Environment snapshot written {snapshot_file}")
+    
+    def write_job_environment_snapshot(self) -> None:
+        
+        """Copy of the context environment snapshot next to the $JOB 
+        folder. Farm submissions load it from there"""
+        
+        snapshot = env_snapshot.load_snapshot(
+            env_snapshot.snapshot_path(env_snapshot.snapshot_dir(), self.current_context())
+        )
+        if snapshot:
+            env_snapshot.write_snapshot(
+                os.path.join(os.environ['JOB'], env_snapshot.JOB_SNAPSHOT_NAME),
+                self.current_context(),
+                snapshot['variables'],
+                snapshot['sources'],
+                source_files=snapshot['source_files']
+            )
+        
     def create_folders(self) -> None:
         
         """ Create all the necessary folders for the given job path"""
@@ -739,29 +1155,36 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
     
     def launch_preset_gui(self) -> None:
         
-        import scope_presets
-        from imp import reload
-        reload(scope_presets)
-        self.sp = scope_presets.ScopePresets(self)
+        """Show the scope preset window. One window is built on the first
+        click and reused afterwards, its preset list reloaded from disk
+        """
+        
+        if self.sp is None:
+            self.sp = scope_presets.ScopePresets(self)
+            self.sp.scope_list.clicked.connect(self.apply_user_selected_scope_item)
+        else:
+            self.sp.refresh()
+        
         self.sp.scope_preset_window.show()
+        self.sp.scope_preset_window.raise_()
+        self.sp.scope_preset_window.activateWindow()
+    
+    def apply_user_selected_scope_item(self) -> None:
         
+        """Apply the preset clicked in the scope preset window"""
         
-        def apply_user_selected_scope_item():
-            
-            row = self.sp.scope_list.selectionModel().selectedIndexes()[0].row()
-            selected_preset = self.sp.scope_list.model().index(row, 0).data()
-            
-            preset_file_path = os.path.join(
-                os.environ['SCOPE_PRESET_PATH'], selected_preset
-            )
-            
-            self.apply_values_to_launcher_fields(preset_file_path)
-                
-        try:    
-            self.sp.scope_list.clicked.connect(
-                        apply_user_selected_scope_item
-            )
-        except AttributeError: pass
+        selected_indexes = self.sp.scope_list.selectionModel().selectedIndexes()
+        if not selected_indexes:
+            return
+        selected_preset = self.sp.scope_list.model().index(
+                                            selected_indexes[0].row(), 0
+        ).data()
+        
+        preset_file_path = os.path.join(
+            os.environ['SCOPE_PRESET_PATH'], selected_preset
+        )
+        
+        self.apply_values_to_launcher_fields(preset_file_path)
         
     def apply_values_to_launcher_fields(self,
                                         preset_file_path: str) -> None:
@@ -781,21 +1204,45 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
         elif user_radio_btn_status:
             self.user_radio_btn.setChecked(True)
         
-        proceed_other_entries = [True for projects in self.projects if show == projects['proj_code']]
+        self.apply_context(show, sequence, shot, task)
+    
+    def apply_context(self,
+                      show: str,
+                      sequence: str='',
+                      shot: str='',
+                      task: str='') -> None:
+        
+        """Fill the show, sequence, shot and task combo boxes at once.
+        Levels are filled as deep as the given names go
+        
+        Args:
+            show (str): show name
+            sequence (str, optional): sequence name. Defaults to ''.
+            shot (str, optional): shot name. Defaults to ''.
+            task (str, optional): task name. Defaults to ''.
+        """
+        
+        proceed_other_entries = [True for projects in self.projects if show == projects.name]
         
         if proceed_other_entries:      
             show_index = self.show_combo_box.findText(show)
             self.show_combo_box.setCurrentIndex(show_index)
             self.set_sequence(show)
             self.set_project_info(show)
+            if not sequence:
+                return
             
             seq_index = self.sequence_combo_box.findText(sequence)
             self.sequence_combo_box.setCurrentIndex(seq_index)
             self.set_shot(show, sequence)
+            if not shot:
+                return
             
             shot_index = self.shot_combo_box.findText(shot)
             self.shot_combo_box.setCurrentIndex(shot_index)
             self.set_task()
+            if not task:
+                return
             
             task_index = self.task_combo_box.findText(task)
             self.task_combo_box.setCurrentIndex(task_index)
@@ -810,6 +1257,34 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
             QtWidgets.QMessageBox.information(self, 
                                                 "PFX Houdini Launcher",
                                             "The Project Does Not Exist or Not Assigned !!")
+    
+    def update_jump_to_results(self, text: str) -> None:
+        
+        """Refresh the jump to popup with the paths matching the 
+        typed text
+        
+        Args:
+            text (str): User typed text 
+        """
+        
+        self.jump_to_results = {
+            " / ".join(path): path for path in self.hierarchy.search(text)
+        }
+        self.jump_to_model.setStringList(list(self.jump_to_results))
+        self.jump_to_line_edit.completer().complete()
+    
+    def jump_to_context(self, result: str) -> None:
+        
+        """Fill all the combo boxes from the picked jump to result
+        
+        Args:
+            result (str): Picked result text from the popup
+        """
+        
+        path = self.jump_to_results.get(result)
+        if path:
+            self.pfx_logger.info_logger(f"Jump to {result}")
+            self.apply_context(*path)
                 
     def register_last_selected_entries(self) -> None:
         
@@ -825,7 +1300,183 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
         with open(self.launcher_preset, "w") as preset_file:
             json.dump( preset_dict, preset_file, indent=4)
         
+    
+    def current_context(self) -> tuple:
+        
+        """Show, sequence, shot and task currently selected in the launcher"""
+        
+        return (self.show_combo_box.currentText(),
+                self.sequence_combo_box.currentText(),
+                self.shot_combo_box.currentText(),
+                self.task_combo_box.currentText())
+    
+    def houdini_launch_command(self) -> list:
+        
+        """Houdini binary with the arguments of the launch"""
+        
+        return [os.environ['HOUDINI_BIN_PATH']] + self.houdini_launch_arguments()
+    
+    def houdini_launch_arguments(self) -> list:
+        
+        """Hip file arguments of the launch"""
+        
+        return [TEMPLATE_HIP_FILE] if self.template_chkbox.isChecked() else []
+    
+    def prewarm_last_context(self) -> None:
+        
+        """Start idle bootstrap processes for the context currently
+        filled in the launcher. Warmed with the environment snapshot of
+        the context, the launcher environment itself is left untouched. 
+        Nothing happens if pre-warm mode not enabled, the fields are not 
+        completely filled or the context has no current snapshot
+        """
+        
+        context = self.current_context()
+        if not self.prewarm_pool or not all(context):
+            return
+        
+        snapshot = env_snapshot.load_snapshot(
+            env_snapshot.snapshot_path(env_snapshot.snapshot_dir(), context)
+        )
+        if not snapshot \
+            or not env_snapshot.is_current(snapshot, self.environment_snapshot_sources()) \
+            or not self.snapshot_package_dir_is_current(snapshot):
+            self.pfx_logger.info_logger(f"Prewarm: no current snapshot of {'/'.join(context)}")
+            return
+        
+        env = dict(os.environ)
+        env_snapshot.apply_snapshot(snapshot, env)
+        self.prewarm_pool.warm(context, self.houdini_launch_arguments(), env)
           
+    def record_launch(self,
+                      phases: launch_history.PhaseTimings,
+                      mode: str,
+                      status: str='launched',
+                      error: str=None):
+        
+        """Append the launch of the current context to the launch history.
+        Returns its launch id
+        
+        Args:
+            phases (launch_history.PhaseTimings): timings of the launch phases
+            mode (str): spawner, direct or prewarm
+            status (str, optional): launched or failed. Defaults to 'launched'.
+            error (str, optional): reason of a failed launch. Defaults to None.
+        """
+        
+        self.pfx_logger.info_logger(
+            "Launch phases " + ", ".join(f"{name} {seconds:.2f}s" 
+                                         for name, seconds in phases.durations.items())
+        )
+        return self.launch_history.record_launch(self.current_context(),
+                                                 phases,
+                                                 houdini_version=os.environ.get('PFXHOUDINI_VERSION'),
+                                                 mode=mode,
+                                                 status=status,
+                                                 error=error,
+                                                 user=self.user_name,
+                                                 view_mode=self.hierarchy.mode
+        )
+    
+    def refresh_recent_contexts(self) -> None:
+        
+        """Reload the recent contexts list ranked by frecency"""
+        
+        self.recent_contexts_combo_box.clear()
+        for context, _, view_mode in self.launch_history.recent_contexts():
+            self.recent_contexts_combo_box.addItem(" / ".join(context), 
+                                                   (context, view_mode))
+        self.recent_contexts_combo_box.setCurrentIndex(-1)
+    
+    def apply_recent_context(self, index: int) -> None:
+        
+        """Fill all the combo boxes from the picked recent context, in 
+        the All or User view it was launched from
+        
+        Args:
+            index (int): index of the picked context
+        """
+        
+        recent_context = self.recent_contexts_combo_box.itemData(index)
+        if recent_context:
+            context, view_mode = recent_context
+            self.pfx_logger.info_logger(f"Recent context {' / '.join(context)}")
+            if view_mode == hierarchy.HierarchyResolver.ALL:
+                self.all_radio_btn.setChecked(True)
+            elif view_mode == hierarchy.HierarchyResolver.ASSIGNED:
+                self.user_radio_btn.setChecked(True)
+            self.apply_context(*context)
+    
+    def spawn_houdini(self, command: list) -> dict:
+        
+        """Start houdini through the spawner helper. Launched straight 
+        from the launcher, still without a shell, if the helper is not 
+        running. Returns the launch entry, its pid is filled once known.
+        A direct launch that could not start is warned about and its
+        entry carries the error
+        
+        Args:
+            command (list): houdini binary and its arguments
+        """
+        
+        request_id = None
+        if self.spawner:
+            request_id = self.spawner.spawn(command, dict(os.environ))
+        
+        if request_id is None:
+            launch = {'context': self.current_context(), 'pid': None, 'mode': 'direct'}
+            try:
+                process = subprocess.Popen(command, env=os.environ)
+            except OSError as error:
+                launch['error'] = f"{command[0]}: {error}"
+                self.pfx_logger.error_logger(f"Houdini launch failed: {launch['error']}")
+                self.show_warning_gui(f"Houdini Launch Failed!!\n\n{launch['error']}")
+                return launch
+            launch['pid'] = process.pid
+            self.pfx_logger.info_logger(f"Houdini started directly as pid {process.pid}")
+            return launch
+        
+        self.launched_processes[request_id] = {
+            'context': self.current_context(),
+            'pid': None,
+            'mode': 'spawner'
+        }
+        return self.launched_processes[request_id]
+    
+    def handle_spawner_events(self) -> None:
+        
+        """Started, failed and exited reports of the spawner helper
+        for the houdini processes launched in this session"""
+        
+        for event in self.spawner.poll_events():
+            # Idle pre-warm processes are only tracked once handed over
+            launch = self.launched_processes.get(event['id'])
+            if launch is None:
+                continue
+            context = '/'.join(launch.get('context', ()))
+            
+            self.launch_history.record_event(launch.get('launch_id'),
+                                             event['event'],
+                                             pid=event.get('pid'),
+                                             returncode=event.get('returncode'),
+                                             error=event.get('error')
+            )
+            
+            if event['event'] == 'started':
+                launch['pid'] = event['pid']
+                self.pfx_logger.info_logger(f"Houdini started as pid {event['pid']} for {context}")
+                
+            elif event['event'] == 'failed':
+                self.launched_processes.pop(event['id'], None)
+                self.pfx_logger.error_logger(f"Houdini launch failed for {context}: {event['error']}")
+                self.show_warning_gui(f"Houdini Launch Failed!!\n\n{event['error']}")
+                
+            elif event['event'] == 'exited':
+                self.launched_processes.pop(event['id'], None)
+                self.pfx_logger.info_logger(
+                    f"Houdini pid {event['pid']} of {context} exited with code {event['returncode']}"
+                )
+    
     def launch_houdini(self) -> None:
         
         """Launch houdini from the bin path with all the ingested 
@@ -845,26 +1496,62 @@ class PfxHoudiniLauncher(QtWidgets.QMainWindow):
                 self.pfx_logger.error_logger("All Fields Are Required To Be Filled!!") 
                 
         else:
-            self.register_last_selected_entries()
-            self.generate_houdini_environment_variables()
-            self.create_folders()
+            phases = launch_history.PhaseTimings()
+            with phases.phase('register'):
+                self.register_last_selected_entries()
+            with phases.phase('resolve_environment'):
+                self.resolve_houdini_environment()
+            with phases.phase('create_folders'):
+                self.create_folders()
+            with phases.phase('write_job_snapshot'):
+                self.write_job_environment_snapshot()
 
             if not which(os.environ['HOUDINI_BIN_PATH']):
                 msgs = os.environ['HOUDINI_BIN_PATH']
                 msgs += "\n\nSpecified Houdini Version Not Exist"
                 self.show_msg_box(msgs)
                 self.pfx_logger.error_logger(f"{os.environ['HOUDINI_BIN_PATH']} Not Exist!!. Contact IT") 
+                self.record_launch(phases, None, status='failed',
+                                   error=f"{os.environ['HOUDINI_BIN_PATH']} not found")
                 
             else:
                 self.pfx_logger.info_logger(f"Opening Houdini {os.environ['HOUDINI_BIN_PATH']}")
-                if self.template_chkbox.isChecked():
-                    subprocess.Popen([os.environ['HOUDINI_BIN_PATH'], r"R:/studio/pipeline/internal/apps/houdini/19.5.493/hip/generic/generic_workflow.hip"],
-                                    shell=True,
-                                    env=os.environ)
-                else:
-                    subprocess.Popen(os.environ['HOUDINI_BIN_PATH'],
-                                    shell=True,
-                                    env=os.environ)
+                command = self.houdini_launch_command()
+                
+                with phases.phase('spawn'):
+                    warm_launch = None
+                    if self.prewarm_pool:
+                        warm_launch = self.prewarm_pool.acquire(self.current_context(),
+                                                                self.houdini_launch_arguments(),
+                                                                dict(os.environ)
+                        )
+                    if warm_launch:
+                        warm_process, time_saved = warm_launch
+                        launch = {'context': self.current_context(),
+                                  'pid': warm_process.pid, 
+                                  'mode': 'prewarm'}
+                        self.launched_processes[warm_process.request_id] = launch
+                    else:
+                        launch = self.spawn_houdini(command)
+                
+                if launch.get('error'):
+                    self.record_launch(phases, launch['mode'], 
+                                       status='failed', 
+                                       error=launch['error'])
+                    self.refresh_recent_contexts()
+                    return
+                
+                launch['launch_id'] = self.record_launch(phases, launch['mode'])
+                if launch['pid']:
+                    self.launch_history.record_event(launch['launch_id'],
+                                                     'started',
+                                                     pid=launch['pid'])
+                if warm_launch:
+                    self.show_msg_box(f"Warm Houdini Handed Over. Saved {time_saved:.1f}s")
+                
+                # Refill the pool, this context is now the last used one
+                self.prewarm_last_context()
+            self.refresh_recent_contexts()
         
 
 if __name__ == "__main__":
@@ -18,7 +18,8 @@ class ScopePresets(QtWidgets.QMainWindow):
         
         dirname = os.path.dirname(__file__)
         ui_file = os.path.join(dirname, 
-                               "ui\pfx_scope_preset.ui"
+                               "ui",
+                               "pfx_scope_preset.ui"
         )
         ui_loader = QUiLoader()
         self.scope_preset_window = ui_loader.load(ui_file)
@@ -65,6 +66,15 @@ class ScopePresets(QtWidgets.QMainWindow):
                 item = QtGui.QStandardItem(preset)
                 self.model.appendRow(item)
             self.scope_list.setModel(self.model)
+    
+    def refresh(self) -> None:
+        
+        """Reload the preset list of the reused window. The items of the
+        model are released instead of stacking a new model per opening"""
+        
+        self.scope_list.clearSelection()
+        self.model.clear()
+        self.collect_presets()
         
           
     def add_scope(self):
@@ -0,0 +1,407 @@
+
+"""Studio wide shared cache tier of the thadam entity queries.
+
+A publisher job crawls thadam once and writes a versioned snapshot to
+the shared drive. Launchers read the snapshot first and only the misses
+reach the thadam server, so the whole studio opening the launcher at the
+same time costs the server nothing.
+
+Snapshot layout:
+    <PFX_SHARED_CACHE_DIR>/
+        current.json            {"version": 12, "created_at": ...}
+        v000012/_global.json    {query key: answer}
+        v000012/<project>.json  {query key: answer}
+
+Usage:
+    python shared_cache.py publish [--keep 3]
+    python shared_cache.py info
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+
+import thadam_client
+
+GLOBAL_SHARD = '_global'
+
+
+def shard_name(args: tuple) -> str:
+
+    """Snapshot file of a query. Entity queries sharded by their
+    project, the first argument. Argument less queries go global"""
+
+    if args and isinstance(args[0], str):
+        return args[0]
+    return GLOBAL_SHARD
+
+
+def crawl_entities(parser):
+
+    """Walk every project, sequence, shot and task of a thadam like
+    parser. Yields the method name, the arguments and the answer of
+    every query made, the publisher and the SQLite export both store
+    what this crawl sees
+
+    Args:
+        parser: thadam parser (or any thadam like source) to crawl
+    """
+
+    projects = parser.get_projects()
+    yield 'get_projects', (), projects
+    for project in projects:
+        project_name = project['proj_code']
+        yield 'get_project_infos', (project_name,), parser.get_project_infos(project_name)
+        sequences = parser.get_sequences(project_name)
+        yield 'get_sequences', (project_name,), sequences
+        for sequence in sequences:
+            shots = parser.get_shots(project_name, sequence['seq_name'])
+            yield 'get_shots', (project_name, sequence['seq_name']), shots
+            for shot in shots:
+                args = (project_name, project.get('proj_id'), shot.get('scope_id'))
+                yield 'get_tasks', args, parser.get_tasks(*args)
+
+
+def _write_json(file_path: str, data) -> None:
+
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as json_file:
+        json.dump(data, json_file)
+    os.replace(temp_path, file_path)
+
+
+class SharedSnapshotCache:
+
+    """Read side of the shared cache tier.
+
+    Shards of the current snapshot are loaded lazily on first use. The
+    snapshot pointer is rechecked every check_interval seconds and a newer
+    version replaces the loaded shards. Snapshots older than max_age are
+    not used at all, the ones older than fresh_age are still served and
+    reported through age and is_fresh.
+    """
+
+    def __init__(self,
+                 cache_dir: str,
+                 max_age: float=6 * 3600,
+                 check_interval: float=300,
+                 fresh_age: float=300) -> None:
+
+        """
+        Args:
+            cache_dir (str): shared drive folder of the snapshots
+            max_age (float, optional): Seconds a snapshot is trusted. Defaults to 6 hours.
+            check_interval (float, optional): Seconds between checks for a newer
+                                              snapshot. Defaults to 300.
+            fresh_age (float, optional): Seconds a snapshot counts as up to date.
+                                         Defaults to 300.
+        """
+
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self.fresh_age = fresh_age
+        self.version = None
+        self.created_at = None
+        self.checked_at = None
+        self.shards = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_environment(cls):
+
+        """Shared cache configured through PFX_SHARED_CACHE_*. None
+        returned if PFX_SHARED_CACHE_DIR is not set"""
+
+        cache_dir = os.environ.get('PFX_SHARED_CACHE_DIR')
+        if not cache_dir:
+            return None
+        return cls(cache_dir,
+                   max_age=float(os.environ.get('PFX_SHARED_CACHE_MAX_AGE', 6 * 3600)),
+                   check_interval=float(os.environ.get('PFX_SHARED_CACHE_CHECK_INTERVAL', 300)),
+                   fresh_age=float(os.environ.get('PFX_SHARED_CACHE_FRESH_AGE', 300)))
+
+    @property
+    def is_fresh(self) -> bool:
+
+        """Current snapshot younger than fresh_age"""
+
+        age = self.age
+        return age is not None and age <= self.fresh_age
+
+    @property
+    def age(self):
+
+        """Seconds since the current snapshot was published, None if
+        there is no snapshot"""
+
+        created_at = self.created_at
+        return time.time() - created_at if created_at else None
+
+    def _refresh_pointer(self) -> None:
+
+        now = time.monotonic()
+        if self.checked_at is not None and now - self.checked_at < self.check_interval:
+            return
+        self.checked_at = now
+        try:
+            with open(os.path.join(self.cache_dir, "current.json"), "r") as pointer_file:
+                pointer = json.load(pointer_file)
+        except (OSError, ValueError):
+            pointer = {}
+
+        if pointer.get('version') != self.version:
+            self.version = pointer.get('version')
+            self.created_at = pointer.get('created_at')
+            self.shards = {}
+
+    def _read_shard(self,
+                    version: int,
+                    name: str) -> dict:
+
+        shard_path = os.path.join(self.cache_dir, f"v{version:06d}", f"{name}.json")
+        try:
+            with open(shard_path, "r") as shard_file:
+                return json.load(shard_file)
+        except (OSError, ValueError):
+            return {}
+
+    def _usable_version(self):
+
+        """Version of the current snapshot, None if there is none or it
+        is older than max_age. Call with the lock held"""
+
+        self._refresh_pointer()
+        if self.version is None \
+            or not self.created_at \
+            or time.time() - self.created_at > self.max_age:
+            return None
+        return self.version
+
+    def read_shard(self, name: str) -> dict:
+
+        """Shard of the current snapshot read straight from the share,
+        not kept in the loaded shards. Empty if there is no usable snapshot"""
+
+        with self.lock:
+            version = self._usable_version()
+        if version is None:
+            return {}
+        return self._read_shard(version, name)
+
+    def get(self,
+            key: str,
+            args: tuple) -> tuple:
+
+        """Answer of the query from the current snapshot.
+
+        Returns a tuple of found status and the answer
+
+        Args:
+            key (str): query key, as built by thadam_client.call_key
+            args (tuple): positional arguments of the query, pick the shard
+        """
+
+        found, value = self.lookup(key, args)
+        with self.lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return found, value
+
+    def lookup(self,
+               key: str,
+               args: tuple) -> tuple:
+
+        """Like get, without counting towards the hit rate. A shard not
+        loaded yet is read and parsed outside the lock, lookups of the
+        loaded shards never wait on the share"""
+
+        name = shard_name(args)
+        with self.lock:
+            version = self._usable_version()
+            if version is None:
+                return False, None
+            shard_data = self.shards.get(name)
+
+        if shard_data is None:
+            shard_data = self._read_shard(version, name)
+            with self.lock:
+                # Kept only if no newer version replaced the shards meanwhile
+                if self.version == version:
+                    shard_data = self.shards.setdefault(name, shard_data)
+
+        if key in shard_data:
+            return True, shard_data[key]
+        return False, None
+
+    def parser(self, client_name: str="entities"):
+
+        """Thadam like parser over the current snapshot"""
+
+        return SnapshotParser(self, client_name)
+
+    def stats(self) -> dict:
+
+        """Hit rate metrics of the shared tier"""
+
+        lookups = self.hits + self.misses
+        return {
+            'version': self.version,
+            'age': self.age,
+            'fresh': self.is_fresh,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+class SnapshotParser:
+
+    """Thadam like parser answering only from the current snapshot.
+    Queries the snapshot does not hold answer empty, the server is never
+    asked. Crawled to index the whole hierarchy for the "jump to" search.
+
+    Only the shard of the project being crawled is held, read by the
+    parser itself. The shards the launcher queries load stay untouched,
+    a full crawl never keeps the whole studio in memory.
+    """
+
+    def __init__(self,
+                 snapshot_cache: SharedSnapshotCache,
+                 client_name: str="entities") -> None:
+
+        self.snapshot_cache = snapshot_cache
+        self.client_name = client_name
+        self.shard_name = None
+        self.shard = {}
+
+    def _answer(self,
+                method_name: str,
+                *args):
+
+        name = shard_name(args)
+        if name != self.shard_name:
+            self.shard = {}
+            self.shard = self.snapshot_cache.read_shard(name)
+            self.shard_name = name
+        value = self.shard.get(thadam_client.call_key(self.client_name, method_name, args, {}))
+        return value if value is not None else []
+
+    def get_projects(self) -> list:
+        return self._answer('get_projects')
+
+    def get_project_infos(self, project_name: str) -> list:
+        return self._answer('get_project_infos', project_name)
+
+    def get_sequences(self, project_name: str) -> list:
+        return self._answer('get_sequences', project_name)
+
+    def get_shots(self,
+                  project_name: str,
+                  seq_name: str) -> list:
+        return self._answer('get_shots', project_name, seq_name)
+
+    def get_tasks(self,
+                  project_name: str,
+                  project_id,
+                  shot_id) -> list:
+        return self._answer('get_tasks', project_name, project_id, shot_id)
+
+
+class SnapshotPublisher:
+
+    """Write side of the shared cache tier. Crawls every project,
+    sequence, shot and task of thadam once and publishes them as the
+    next snapshot version"""
+
+    def __init__(self,
+                 cache_dir: str,
+                 parser,
+                 client_name: str="entities") -> None:
+
+        """
+        Args:
+            cache_dir (str): shared drive folder of the snapshots
+            parser: thadam parser (or any thadam like source) to crawl
+            client_name (str, optional): client name of the launcher queries
+                                         the keys are built for. Defaults to "entities".
+        """
+
+        self.cache_dir = cache_dir
+        self.parser = parser
+        self.client_name = client_name
+        self.shards = {}
+
+    def crawl(self) -> None:
+
+        for method_name, args, value in crawl_entities(self.parser):
+            key = thadam_client.call_key(self.client_name, method_name, args, {})
+            self.shards.setdefault(shard_name(args), {})[key] = value
+
+    def publish(self, keep: int=3) -> int:
+
+        """Crawl thadam and write the next snapshot version. Only the
+        latest keep versions are left on the shared drive
+
+        Args:
+            keep (int, optional): snapshot versions to keep. Defaults to 3.
+        """
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        versions = sorted(int(folder[1:]) for folder in os.listdir(self.cache_dir)
+                          if folder.startswith('v') and folder[1:].isdigit())
+        version = versions[-1] + 1 if versions else 1
+
+        self.shards = {}
+        self.crawl()
+
+        version_dir = os.path.join(self.cache_dir, f"v{version:06d}")
+        os.makedirs(version_dir)
+        for name, shard in self.shards.items():
+            _write_json(os.path.join(version_dir, f"{name}.json"), shard)
+        # Pointer written last, launchers never see a half written version
+        _write_json(os.path.join(self.cache_dir, "current.json"),
+                    {'version': version, 'created_at': time.time()})
+
+        for old_version in versions[:max(0, len(versions) + 1 - keep)]:
+            old_dir = os.path.join(self.cache_dir, f"v{old_version:06d}")
+            for file_name in os.listdir(old_dir):
+                os.remove(os.path.join(old_dir, file_name))
+            os.rmdir(old_dir)
+        return version
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="PFX launcher shared thadam cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    publish_parser = subparsers.add_parser("publish", help="crawl thadam and publish a snapshot")
+    publish_parser.add_argument("--keep", type=int, default=3)
+    subparsers.add_parser("info", help="show the current snapshot")
+    args = parser.parse_args()
+
+    cache_dir = os.environ['PFX_SHARED_CACHE_DIR']
+    if args.command == "publish":
+        from thadam_base import thadam_api
+        publisher = SnapshotPublisher(cache_dir, thadam_api.ThadamParser())
+        version = publisher.publish(keep=args.keep)
+        print(f"Published snapshot v{version:06d} to {cache_dir}")
+    else:
+        try:
+            with open(os.path.join(cache_dir, "current.json"), "r") as pointer_file:
+                pointer = json.load(pointer_file)
+        except (OSError, ValueError):
+            sys.exit(f"No snapshot published in {cache_dir}")
+        age = time.time() - pointer['created_at']
+        print(f"Snapshot v{pointer['version']:06d}, {age / 60:.0f} minutes old")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+SUBTASK_FILE_NAME = "subtasks.json"
+INDEX_FORMAT_VERSION = 2
+
+
+def file_mtime(file_path: str):
+
+    """Modification time of the file, None if it does not exist"""
+
+    try:
+        return os.stat(file_path).st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def scan_shot(shot_dir: str) -> tuple:
+
+    """Subtasks of every task folder of a shot folder and the modification
+    time of their subtasks files. A task folder without a readable subtasks
+    file maps to None subtasks
+
+    Args:
+        shot_dir (str): SUB_TASK_DIR/show/sequence/shot folder
+    """
+
+    tasks = {}
+    mtimes = {}
+    try:
+        with os.scandir(shot_dir) as entries:
+            task_dirs = [entry for entry in entries if entry.is_dir()]
+    except OSError:
+        return tasks, mtimes
+
+    for task_dir in task_dirs:
+        subtask_path = os.path.join(task_dir.path, SUBTASK_FILE_NAME)
+        try:
+            mtimes[task_dir.name] = file_mtime(subtask_path)
+            with open(subtask_path, "r") as subtask_file:
+                tasks[task_dir.name] = json.load(subtask_file)
+        except (OSError, ValueError):
+            tasks[task_dir.name] = None
+    return tasks, mtimes
+
+
+class SubtaskIndex:
+
+    """Per sequence index of the subtasks and frame ranges of every shot.
+
+    The subtask tree of a sequence is scanned once in the background, the
+    shot folders in parallel, and written to a local index file. The
+    launcher opens it once per sequence and answers every shot and task
+    of the sequence from memory, instead of reading a subtasks.json from
+    the network share per selection. An index older than max_age is
+    served and refreshed in the background.
+
+    Lookups never touch the share. At most every check_interval seconds a
+    lookup queues a background check of the modification times of the
+    subtasks files the index was built from, an edited or removed one
+    rebuilds the index of the sequence. Until then the earlier subtasks are
+    answered. A task folder the index does not know is reported unknown,
+    the caller reads its subtasks file directly.
+    """
+
+    def __init__(self,
+                 subtask_root: str,
+                 index_dir: str,
+                 max_age: float=300,
+                 check_interval: float=10,
+                 scan_workers: int=8,
+                 pfx_logger=None) -> None:
+
+        """
+        Args:
+            subtask_root (str): SUB_TASK_DIR, root of the subtask tree
+            index_dir (str): local folder of the index files
+            max_age (float, optional): Seconds an index is served without
+                                       refreshing it. Defaults to 300.
+            check_interval (float, optional): Seconds between the background checks
+                                              of the subtasks files of a sequence.
+                                              Defaults to 10.
+            scan_workers (int, optional): Shot folders scanned in parallel.
+                                          Defaults to 8.
+            pfx_logger (optional): PFXLogger instance. Defaults to None.
+        """
+
+        self.subtask_root = subtask_root
+        self.index_dir = index_dir
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self.pfx_logger = pfx_logger
+        self.indexes = {}
+        self.building = {}
+        self.checked_at = {}
+        self.lock = threading.Lock()
+        self.builder = ThreadPoolExecutor(max_workers=1)
+        self.scanner = ThreadPoolExecutor(max_workers=scan_workers)
+
+    def _info(self, message: str) -> None:
+        if self.pfx_logger:
+            self.pfx_logger.info_logger(message)
+
+    def index_path(self,
+                   show: str,
+                   sequence: str) -> str:
+        return os.path.join(self.index_dir, show, *sequence.split('/'), "subtask_index.json")
+
+    def build(self,
+              show: str,
+              sequence: str,
+              frame_ranges: dict) -> dict:
+
+        """Scan the subtask tree of the sequence and write its index file
+
+        Args:
+            show (str): show name
+            sequence (str): sequence name
+            frame_ranges (dict): frame range per shot name from thadam
+        """
+
+        start = time.monotonic()
+        sequence_dir = os.path.join(self.subtask_root, show, *sequence.split('/'))
+        try:
+            with os.scandir(sequence_dir) as entries:
+                shot_dirs = {entry.name: entry.path for entry in entries if entry.is_dir()}
+        except OSError:
+            shot_dirs = {}
+
+        shot_names = sorted(shot_dirs)
+        scanned = dict(zip(shot_names,
+                           self.scanner.map(scan_shot, [shot_dirs[name] for name in shot_names])))
+        empty_scan = ({}, {})
+
+        index = {
+            'format_version': INDEX_FORMAT_VERSION,
+            'show': show,
+            'sequence': sequence,
+            'built_at': time.time(),
+            'shots': {
+                shot_name: {'frame_range': frame_ranges.get(shot_name),
+                            'subtasks': scanned.get(shot_name, empty_scan)[0],
+                            'mtimes': scanned.get(shot_name, empty_scan)[1]}
+                for shot_name in sorted(set(scanned) | set(frame_ranges))
+            }
+        }
+
+        index_path = self.index_path(show, sequence)
+        temp_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            with open(temp_path, "w") as index_file:
+                json.dump(index, index_file)
+            os.replace(temp_path, index_path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self.indexes[(show, sequence)] = index
+        self._info(f"Subtask index of {show}/{sequence} built from {len(shot_dirs)} "
+                   f"shot folders in {time.monotonic() - start:.2f}s")
+        return index
+
+    def _load_file(self,
+                   show: str,
+                   sequence: str):
+
+        try:
+            with open(self.index_path(show, sequence), "r") as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError):
+            return None
+        if index.get('format_version') != INDEX_FORMAT_VERSION:
+            return None
+        return index
+
+    def refresh(self,
+                show: str,
+                sequence: str,
+                frame_ranges: dict):
+
+        """Rebuild the index of the sequence in the background. A build
+        already running for the sequence is reused. Returns its future"""
+
+        key = (show, sequence)
+        with self.lock:
+            future = self.building.get(key)
+            if future is None or future.done():
+                future = self.builder.submit(self.build, show, sequence, dict(frame_ranges))
+                self.building[key] = future
+        return future
+
+    def changed_since_scan(self,
+                           show: str,
+                           sequence: str) -> bool:
+
+        """True if a subtasks file of the sequence index was added, edited
+        or removed since the scan. False while the share is not reachable,
+        the index is the best answer there is then"""
+
+        index = self.indexes.get((show, sequence))
+        if index is None:
+            return False
+        sequence_dir = os.path.join(self.subtask_root, show, *sequence.split('/'))
+        try:
+            for shot_name, shot in index['shots'].items():
+                for task, mtime in shot.get('mtimes', {}).items():
+                    subtask_path = os.path.join(sequence_dir, shot_name, task, SUBTASK_FILE_NAME)
+                    if file_mtime(subtask_path) != mtime:
+                        return True
+        except OSError:
+            return False
+        return False
+
+    def _check(self,
+               show: str,
+               sequence: str):
+
+        if self.changed_since_scan(show, sequence):
+            return self.build(show, sequence, self.frame_ranges(show, sequence))
+        return self.indexes.get((show, sequence))
+
+    def check(self,
+              show: str,
+              sequence: str) -> None:
+
+        """Queue a background check of the subtasks files of the sequence,
+        at most once every check_interval seconds. A build or check already
+        running for the sequence is reused"""
+
+        key = (show, sequence)
+        now = time.monotonic()
+        with self.lock:
+            if now - self.checked_at.get(key, float('-inf')) < self.check_interval:
+                return
+            self.checked_at[key] = now
+            future = self.building.get(key)
+            if future is None or future.done():
+                self.building[key] = self.builder.submit(self._check, show, sequence)
+
+    def open_sequence(self,
+                      show: str,
+                      sequence: str,
+                      frame_ranges: dict) -> None:
+
+        """Load the index of the sequence once the artist picked it.
+        Refreshed in the background if it is missing or older than max_age
+
+        Args:
+            show (str): show name
+            sequence (str): sequence name
+            frame_ranges (dict): frame range per shot name from thadam
+        """
+
+        key = (show, sequence)
+        index = self.indexes.get(key)
+        if index is None:
+            index = self._load_file(show, sequence)
+            if index is not None:
+                self.indexes[key] = index
+
+        if index is None or time.time() - index['built_at'] > self.max_age \
+            or any(frame_range != index['shots'].get(shot_name, {}).get('frame_range')
+                   for shot_name, frame_range in frame_ranges.items()):
+            self.refresh(show, sequence, frame_ranges)
+
+    def frame_ranges(self,
+                     show: str,
+                     sequence: str) -> dict:
+
+        """Frame range per shot of the sequence index. These are the
+        thadam frame ranges the index was last built with, the subtask
+        tree holds none"""
+
+        index = self.indexes.get((show, sequence))
+        if index is None:
+            return {}
+        return {shot_name: shot['frame_range']
+                for shot_name, shot in index['shots'].items() if shot['frame_range']}
+
+    def lookup(self,
+               show: str,
+               sequence: str,
+               shot: str,
+               task: str):
+
+        """Subtasks of the task from the index, answered from memory.
+        Returns a tuple of known and the subtasks. Not known while the
+        sequence has no index yet or the task is not in it, the caller reads
+        the subtasks file itself then. Subtasks are None if the task has no
+        subtasks file. Queues the background check of the sequence
+        """
+
+        index = self.indexes.get((show, sequence))
+        if index is None:
+            return False, None
+        self.check(show, sequence)
+        shot_entry = index['shots'].get(shot, {})
+        if task not in shot_entry.get('mtimes', {}):
+            return False, None
+        return True, shot_entry['subtasks'].get(task)
+
+    def shutdown(self) -> None:
+        self.builder.shutdown(wait=False)
+        self.scanner.shutdown(wait=False)
@@ -0,0 +1,132 @@
+"""SQLite export of a stand-in thadam. Every query answers the same
+through the export, exports are published as versions behind the export
+file and a failed export leaves nothing behind.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+import shared_cache
+import entity_backends
+
+
+class StandInThadam:
+
+    """Entity and user parser of a small studio"""
+
+    def __init__(self, fps: int=24) -> None:
+        self.fps = fps
+
+    def get_projects(self) -> list:
+        return [{'proj_code': 'PRJ001', 'proj_id': 1}, {'proj_code': 'PRJ002', 'proj_id': 2}]
+
+    def get_project_infos(self, project_name: str) -> list:
+        return [{'fps': self.fps, 'resolution': '2048x858'}]
+
+    def get_sequences(self, project_name: str) -> list:
+        return [{'seq_name': 'sq0010'}, {'seq_name': 'sq0020'}]
+
+    def get_shots(self,
+                  project_name: str,
+                  seq_name: str) -> list:
+        return [{'scope_id': int(seq_name[2:]) * 10 + index, 'shot_name': f"{seq_name}_sh{index:03d}0"}
+                for index in range(1, 4)]
+
+    def get_tasks(self,
+                  project_name: str,
+                  project_id,
+                  shot_id) -> list:
+        return [{'task_name': task, 'scope_id': shot_id} for task in ('fx', 'lgt')]
+
+    def get_artist_details(self, artist_name: str):
+        return {'id': 7, 'name': artist_name} if artist_name == 'jdoe' else None
+
+    def get_artist_assigned_item_details(self, artist_id) -> dict:
+        return {'PRJ001': {'sq0010': ['sq0010_sh0010']}}
+
+
+class SQLiteExportTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.export_path = os.path.join(self.temp_dir, "exports", "entities.db")
+        self.thadam = StandInThadam()
+
+    def export(self, thadam=None, **kwargs) -> dict:
+        thadam = thadam or self.thadam
+        return entity_backends.export_entities(thadam, thadam, self.export_path, **kwargs)
+
+    def open_export(self) -> entity_backends.SQLiteExport:
+        export = entity_backends.SQLiteExport(self.export_path)
+        self.addCleanup(export.connection.close)
+        return export
+
+    def test_round_trip(self) -> None:
+
+        counts = self.export(artists=['jdoe'])
+        export = self.open_export()
+
+        self.assertEqual(list(shared_cache.crawl_entities(export)),
+                         list(shared_cache.crawl_entities(self.thadam)))
+        self.assertEqual(export.get_artist_details('jdoe'), {'id': 7, 'name': 'jdoe'})
+        self.assertEqual(export.get_artist_assigned_item_details(7),
+                         self.thadam.get_artist_assigned_item_details(7))
+        self.assertIsNone(export.get_artist_details('nobody'))
+        self.assertEqual((counts['projects'], counts['shots'], counts['tasks']), (2, 12, 24))
+
+    def test_open_export_keeps_its_version(self) -> None:
+
+        self.export()
+        export = self.open_export()
+        self.export(StandInThadam(fps=25))
+
+        self.assertEqual(export.get_project_infos('PRJ001')[0]['fps'], 24)
+        self.assertEqual(self.open_export().get_project_infos('PRJ001')[0]['fps'], 25)
+
+    def test_only_the_latest_versions_are_kept(self) -> None:
+
+        for _ in range(4):
+            self.export(keep=2)
+        self.assertEqual(entity_backends.export_versions(self.export_path), [3, 4])
+
+    def test_unknown_artist_exports_nothing(self) -> None:
+
+        with self.assertRaises(ValueError):
+            self.export(artists=['jdoe', 'nobody'])
+        self.assertFalse(os.path.exists(self.export_path))
+        self.assertEqual(entity_backends.export_versions(self.export_path), [])
+
+    def test_failed_crawl_leaves_no_temp_file(self) -> None:
+
+        with mock.patch.object(StandInThadam, 'get_tasks', side_effect=ConnectionError):
+            with self.assertRaises(ConnectionError):
+                self.export()
+        self.assertEqual(os.listdir(os.path.dirname(self.export_path)), [])
+
+    def test_backend_from_environment(self) -> None:
+
+        self.export()
+        with mock.patch.dict(os.environ, {'PFX_ENTITY_BACKEND': 'SQLite',
+                                          'PFX_ENTITY_EXPORT': self.export_path}):
+            backend = entity_backends.backend_from_environment()
+        self.assertFalse(backend.remote)
+        parser = backend.entity_parser()
+        self.addCleanup(parser.connection.close)
+        self.assertEqual(parser.get_sequences('PRJ002'), self.thadam.get_sequences('PRJ002'))
+
+        with mock.patch.dict(os.environ, {'PFX_ENTITY_BACKEND': 'shotgrid'}):
+            with self.assertRaises(ValueError):
+                entity_backends.backend_from_environment()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+
+"""Jump to search index, results against a brute force scan and the
+typing latency on a studio sized index."""
+
+import os
+import sys
+import time
+import random
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+import entity_search
+
+TASKS = ('fx', 'FX_sim', 'anim', 'lgt', 'comp-v2')
+
+
+def studio_paths(project_count: int,
+                 sequence_count: int,
+                 shot_count: int) -> list:
+
+    paths = []
+    for project_index in range(project_count):
+        project = (f"PRJ{project_index:03d}",)
+        paths.append(project)
+        for sequence_index in range(sequence_count):
+            seq_name = f"sq{sequence_index * 10:04d}"
+            sequence = project + (seq_name,)
+            paths.append(sequence)
+            for shot_index in range(shot_count):
+                shot = sequence + (f"{seq_name}_sh{shot_index * 10:04d}",)
+                paths.append(shot)
+                paths.extend(shot + (task,) for task in TASKS[:4])
+    return paths
+
+
+def brute_force_search(paths,
+                       assigned: set,
+                       query: str,
+                       assigned_only: bool=False,
+                       limit: int=50) -> list:
+
+    words = [word for word in query.lower().replace('/', ' ').split() if word]
+    if all(len(word) < 2 for word in words):
+        return []
+    ranked = []
+    for path in paths:
+        if assigned_only and path not in assigned:
+            continue
+        key = "/".join(path).lower()
+        if all(word in key for word in words):
+            prefix_hits = sum(1 for word in words
+                              if key.startswith(word) or '/' + word in key)
+            ranked.append((-prefix_hits, len(path),
+                           tuple((name.lower(), name) for name in path), path))
+    ranked.sort()
+    return [entry[-1] for entry in ranked[:limit]]
+
+
+def best_time(function, rounds: int=3) -> float:
+
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class HierarchySearchIndexTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        random_generator = random.Random(7)
+        self.paths = []
+        self.assigned = set()
+        self.index = entity_search.HierarchySearchIndex()
+        for project_name in ("Show1", "PRJ2", "abc3"):
+            self.add((project_name,), random_generator)
+            for seq_name in random_generator.sample(["sq010", "SQ020", "seq_030", "sq040"], 3):
+                self.add((project_name, seq_name), random_generator)
+                for shot_index in range(random_generator.randint(1, 12)):
+                    shot_name = random_generator.choice([f"sh{shot_index:03d}0",
+                                                         f"{seq_name}_sh{shot_index:03d}0"])
+                    shot = (project_name, seq_name, shot_name)
+                    if shot in self.paths:
+                        continue
+                    self.add(shot, random_generator)
+                    for task in random_generator.sample(TASKS, random_generator.randint(0, 3)):
+                        self.add(shot + (task,), random_generator)
+
+    def add(self,
+            path: tuple,
+            random_generator) -> None:
+
+        # Parents of assigned paths are assigned, like the user assignments
+        assigned = random_generator.random() < 0.3 and \
+            all(path[:depth] in self.assigned for depth in range(1, len(path)))
+        self.index.add(path, assigned)
+        self.paths.append(path)
+        if assigned:
+            self.assigned.add(path)
+
+    def test_matches_a_brute_force_scan(self) -> None:
+
+        random_generator = random.Random(11)
+        names = [name for path in self.paths for name in path]
+        for _ in range(500):
+            query = " ".join(
+                random_generator.choice(names)[random_generator.randint(0, 3):]
+                [:random_generator.randint(1, 6)]
+                for _ in range(random_generator.randint(1, 3))
+            )
+            assigned_only = random_generator.random() < 0.3
+            limit = random_generator.choice([5, 50])
+            self.assertEqual(
+                self.index.search(query, assigned_only=assigned_only, limit=limit),
+                brute_force_search(self.paths, self.assigned, query, assigned_only, limit),
+                query
+            )
+
+    def test_single_letters_return_nothing(self) -> None:
+        self.assertEqual(self.index.search("s h"), [])
+
+    def test_replaced_level_drops_stale_children(self) -> None:
+
+        index = entity_search.HierarchySearchIndex()
+        for path in [("PRJ",), ("PRJ", "sq010"), ("PRJ", "sq010", "sh0010"),
+                     ("PRJ", "sq020")]:
+            index.add(path)
+        index.add(("PRJ", "sq030"), assigned=True)
+        index.add(("PRJ", "sq030", "sh0010"), assigned=True)
+
+        index.replace_children(("PRJ",), ["sq020", "sq040"])
+
+        self.assertEqual(index.search("sq0"),
+                         [("PRJ", "sq020"), ("PRJ", "sq030"), ("PRJ", "sq040"),
+                          ("PRJ", "sq030", "sh0010")])
+        self.assertEqual(index.search("sh0010"), [("PRJ", "sq030", "sh0010")])
+
+    def test_cache_round_trip_keeps_live_paths_only(self) -> None:
+
+        cache_path = os.path.join(TESTS_DIR, "_search_index_cache.json")
+        self.addCleanup(lambda: os.path.exists(cache_path) and os.remove(cache_path))
+        self.index.remove(self.paths[0])
+        self.index.save(cache_path)
+
+        loaded = entity_search.HierarchySearchIndex()
+        loaded.load(cache_path)
+
+        self.assertEqual(len(loaded), len(self.index))
+        self.assertEqual(loaded.search("sq", limit=500), self.index.search("sq", limit=500))
+        self.assertEqual(loaded.search("sq", assigned_only=True), [])
+
+
+class SearchLatencyTest(unittest.TestCase):
+
+    """Typing stays under 10 ms on a 100k path index, right after new
+    paths arrived as well"""
+
+    QUERIES = ("sh", "sq", "fx", "prj", "sh0420", "sq0010 sh0020 fx",
+               "prj001 anim", "anim sh", "0020", "zz9")
+    BUDGET = 0.010
+
+    @classmethod
+    def setUpClass(cls) -> None:
+
+        cls.index = entity_search.HierarchySearchIndex()
+        for path in studio_paths(10, 25, 80):
+            cls.index.add(path)
+
+    def test_index_holds_a_studio(self) -> None:
+        self.assertGreater(len(self.index), 100000)
+
+    def test_queries_within_budget(self) -> None:
+
+        for query in self.QUERIES:
+            elapsed = best_time(lambda: self.index.search(query))
+            self.assertLess(elapsed, self.BUDGET, f"{query!r} took {elapsed * 1000:.1f} ms")
+
+    def test_first_query_after_new_paths_within_budget(self) -> None:
+
+        for count, query in enumerate(self.QUERIES):
+            self.index.add(("PRJ004", "sq9990", f"sq9990_sh{count:04d}", "fx"))
+            start = time.perf_counter()
+            self.index.search(query)
+            elapsed = time.perf_counter() - start
+            self.assertLess(elapsed, self.BUDGET, f"{query!r} took {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Did you mean suggestions of typed entries over the names of one
+hierarchy level, small levels and a large one indexed in the background.
+"""
+
+import os
+import sys
+import time
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+import entity_validation
+
+SHOTS = ["sq0010_sh0010", "sq0010_sh0020", "sq0010_sh0030", "sq0020_sh0010", "SQ0030_sh0100"]
+
+
+class NameIndexTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.index = entity_validation.NameIndex(SHOTS)
+
+    def test_exact_names(self) -> None:
+
+        self.assertIn("sq0010_sh0020", self.index)
+        self.assertNotIn("sq0010_SH0020", self.index)
+        self.assertEqual(len(self.index), len(SHOTS))
+
+    def test_case_insensitive_match_comes_first(self) -> None:
+        self.assertEqual(self.index.suggestions("sq0030_SH0100")[0], "SQ0030_sh0100")
+
+    def test_prefix_matches(self) -> None:
+        self.assertEqual(self.index.suggestions("sq0010_"),
+                         ["sq0010_sh0010", "sq0010_sh0020", "sq0010_sh0030"])
+
+    def test_typos_are_suggested(self) -> None:
+
+        self.assertEqual(self.index.suggestions("sq0020_hs0010", limit=1), ["sq0020_sh0010"])
+        self.assertIn("sq0010_sh0030", self.index.suggestions("sq001_sh0030"))
+
+    def test_nothing_for_empty_or_unrelated_text(self) -> None:
+
+        self.assertEqual(self.index.suggestions("  "), [])
+        self.assertEqual(self.index.suggestions("comp_v2"), [])
+
+    def test_large_level_suggests_once_indexed(self) -> None:
+
+        names = [f"sq{sequence:04d}_sh{shot:04d}" for sequence in range(0, 500, 10)
+                 for shot in range(0, 1000, 10)]
+        index = entity_validation.NameIndex(names)
+        deadline = time.monotonic() + 10
+        while index.postings is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(index.suggestions("SQ0420_SH0870", limit=1), ["sq0420_sh0870"])
+        self.assertIn("sq0420_sh0870", index.suggestions("sq0420_sh870"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""Environment snapshots of a launch context. Only the variables set for
+the context are kept, a snapshot is invalidated by changed sources or a
+tampered file, and applying one removes the PFX leftovers.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+import env_snapshot
+
+CONTEXT = ('PRJ001', 'fx/sq0010', 'sh0010', 'fx')
+
+
+class EnvSnapshotTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.settings_path = os.path.join(self.temp_dir, "settings.yml")
+        with open(self.settings_path, "w") as settings_file:
+            settings_file.write("fps: 24\n")
+        self.snapshot_file = env_snapshot.snapshot_path(self.temp_dir, CONTEXT)
+        self.variables = {'PFXSHOW': 'PRJ001', 'PFXFPS': '24', 'JOB': '/jobs/PRJ001'}
+        self.sources = {'settings': env_snapshot.file_fingerprint(self.settings_path),
+                        'thadam': env_snapshot.data_fingerprint([{'fps': 24}])}
+        env_snapshot.write_snapshot(self.snapshot_file, CONTEXT, self.variables, self.sources,
+                                    source_files={'settings': self.settings_path})
+
+    def test_keeps_only_the_variables_set_for_the_context(self) -> None:
+
+        environ = {'PFXSHOW': 'PRJ001', 'PFXOLD_SETTING': 'left over', 'JOB': '/jobs/PRJ001',
+                   'PFX_LAUNCHER_CACHE_DIR': '/tmp', 'PATH': '/bin'}
+        self.assertEqual(env_snapshot.snapshot_variables(environ, {'PFXSHOW', 'JOB'}),
+                         {'PFXSHOW': 'PRJ001', 'JOB': '/jobs/PRJ001'})
+
+    def test_round_trip(self) -> None:
+
+        snapshot = env_snapshot.load_snapshot(self.snapshot_file)
+        self.assertEqual(snapshot['variables'], self.variables)
+        self.assertEqual(snapshot['context'], list(CONTEXT))
+        self.assertTrue(env_snapshot.is_current(snapshot, self.sources))
+        self.assertTrue(env_snapshot.is_current(snapshot, env_snapshot.file_sources(snapshot)))
+
+    def test_changed_sources_invalidate(self) -> None:
+
+        snapshot = env_snapshot.load_snapshot(self.snapshot_file)
+        self.assertFalse(env_snapshot.is_current(
+            snapshot, dict(self.sources, thadam=env_snapshot.data_fingerprint([{'fps': 25}]))
+        ))
+        self.assertFalse(env_snapshot.is_current(snapshot, {'subtasks': None}))
+
+        with open(self.settings_path, "w") as settings_file:
+            settings_file.write("fps: 25\n")
+        self.assertFalse(env_snapshot.is_current(snapshot, env_snapshot.file_sources(snapshot)))
+
+    def test_tampered_snapshot_is_not_loaded(self) -> None:
+
+        with open(self.snapshot_file, "r") as snapshot_file:
+            snapshot = json.load(snapshot_file)
+        snapshot['variables']['PFXFPS'] = '25'
+        with open(self.snapshot_file, "w") as snapshot_file:
+            json.dump(snapshot, snapshot_file)
+        self.assertIsNone(env_snapshot.load_snapshot(self.snapshot_file))
+
+    def test_apply_removes_leftover_context_variables(self) -> None:
+
+        environ = {'PFXSHOW': 'PRJ002', 'PFXFRAME_RANGE': '1001-1100',
+                   'PFX_LAUNCHER_CACHE_DIR': '/tmp', 'PATH': '/bin'}
+        env_snapshot.apply_snapshot(env_snapshot.load_snapshot(self.snapshot_file), environ)
+        self.assertEqual(environ, dict(self.variables,
+                                       PFX_LAUNCHER_CACHE_DIR='/tmp', PATH='/bin'))
+
+
+if __name__ == "__main__":
+    unittest.main()
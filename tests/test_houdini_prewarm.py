@@ -0,0 +1,183 @@
+
+"""Pre-warm pool against a stand-in bootstrap executable.
+
+The stand-in is a small python script started through a real spawner
+helper. It blocks on its stdin like the hython bootstrap does and writes
+what it got, "launch" on a handover or "eof" once its stdin closed
+without one, to a marker file.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+import houdini_prewarm
+import houdini_spawner
+
+STAND_IN_SCRIPT = """
+import os
+import sys
+
+line = sys.stdin.readline().strip() or "eof"
+with open(os.environ['STAND_IN_MARKER'], "a") as marker_file:
+    marker_file.write(" ".join([line] + sys.argv[1:]) + "\\n")
+"""
+
+CONTEXT = ('PRJ001', 'sq0010', 'sh0010', 'fx')
+OTHER_CONTEXT = ('PRJ001', 'sq0010', 'sh0020', 'fx')
+
+
+def wait_for(condition, timeout: float=10) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class HoudiniPrewarmPoolTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.temp_dir = tempfile.mkdtemp()
+        stand_in_path = os.path.join(self.temp_dir, "stand_in_bootstrap.py")
+        with open(stand_in_path, "w") as stand_in_file:
+            stand_in_file.write(STAND_IN_SCRIPT)
+        self.marker_path = os.path.join(self.temp_dir, "marker.txt")
+        self.env = dict(os.environ, STAND_IN_MARKER=self.marker_path)
+
+        self.spawner = houdini_spawner.HoudiniSpawner()
+        self.assertTrue(self.spawner.start())
+        self.pool = houdini_prewarm.HoudiniPrewarmPool(self.spawner,
+                                                       [sys.executable, stand_in_path])
+
+    def tearDown(self) -> None:
+
+        self.pool.shutdown()
+        self.spawner.shutdown()
+        shutil.rmtree(self.temp_dir)
+
+    def marker_lines(self) -> list:
+        if not os.path.exists(self.marker_path):
+            return []
+        with open(self.marker_path, "r") as marker_file:
+            return marker_file.read().splitlines()
+
+    def warm_and_wait(self, context: tuple):
+
+        self.pool.warm(context, ["scene.hip"], self.env)
+        self.assertEqual(len(self.pool.warm_processes), 1)
+        warm_process = self.pool.warm_processes[0]
+        self.assertTrue(wait_for(lambda: warm_process.pid is not None))
+        return warm_process
+
+    def test_handover_releases_the_warm_process(self) -> None:
+
+        warm_process = self.warm_and_wait(CONTEXT)
+        self.assertTrue(warm_process.is_alive())
+        self.assertEqual(self.marker_lines(), [])
+
+        handed_over, time_saved = self.pool.acquire(CONTEXT, ["scene.hip"], self.env)
+
+        self.assertIs(handed_over, warm_process)
+        self.assertGreater(time_saved, 0)
+        self.assertEqual(self.pool.warm_processes, [])
+        self.assertTrue(wait_for(lambda: self.marker_lines() == ["launch scene.hip"]))
+        self.assertTrue(wait_for(
+            lambda: self.spawner.process_state(warm_process.request_id)['returncode'] == 0
+        ))
+
+    def test_other_context_is_not_handed_over(self) -> None:
+
+        self.warm_and_wait(CONTEXT)
+
+        self.assertIsNone(self.pool.acquire(OTHER_CONTEXT, ["scene.hip"], self.env))
+        self.assertIsNone(self.pool.acquire(CONTEXT, [], self.env))
+        self.assertIsNone(self.pool.acquire(CONTEXT, ["scene.hip"],
+                                            dict(self.env, JOB="elsewhere")))
+        self.assertEqual(len(self.pool.warm_processes), 1)
+
+    def test_warming_a_new_context_discards_the_old_one(self) -> None:
+
+        old_process = self.warm_and_wait(CONTEXT)
+        new_process = self.warm_and_wait(OTHER_CONTEXT)
+
+        self.assertIsNot(old_process, new_process)
+        self.assertEqual(new_process.context, OTHER_CONTEXT)
+        self.assertTrue(wait_for(lambda: not old_process.is_alive()))
+        self.assertNotIn("launch scene.hip", self.marker_lines())
+
+    def test_idle_timeout_kills_the_process(self) -> None:
+
+        warm_process = self.warm_and_wait(CONTEXT)
+        self.pool.idle_timeout = 0
+        self.pool.reap()
+
+        self.assertEqual(self.pool.warm_processes, [])
+        self.assertTrue(wait_for(lambda: not warm_process.is_alive()))
+
+    def test_memory_budget_kills_the_process(self) -> None:
+
+        warm_process = self.warm_and_wait(CONTEXT)
+        if not houdini_prewarm.process_memory_mb(warm_process.pid):
+            self.skipTest("process memory can not be measured here")
+        self.pool.memory_budget_mb = 0.001
+        self.pool.reap()
+
+        self.assertEqual(self.pool.warm_processes, [])
+        self.assertTrue(wait_for(lambda: not warm_process.is_alive()))
+
+    def test_spawner_shutdown_lets_the_bootstrap_quit(self) -> None:
+
+        self.warm_and_wait(CONTEXT)
+        self.pool.warm_processes.clear()
+        self.spawner.shutdown()
+
+        self.assertTrue(wait_for(lambda: self.marker_lines() == ["eof scene.hip"]))
+
+
+class PrewarmEnabledTest(unittest.TestCase):
+
+    def test_needs_a_bootstrap(self) -> None:
+
+        with mock.patch.dict(os.environ, {'PFX_HOUDINI_PREWARM': '1'}):
+            os.environ.pop('PFX_HOUDINI_PREWARM_BOOTSTRAP', None)
+            self.assertFalse(houdini_prewarm.prewarm_enabled())
+
+            os.environ['PFX_HOUDINI_PREWARM_BOOTSTRAP'] = "hython prewarm_bootstrap.py"
+            self.assertTrue(houdini_prewarm.prewarm_enabled())
+            self.assertEqual(houdini_prewarm.bootstrap_command(),
+                             ["hython", "prewarm_bootstrap.py"])
+
+    def test_off_by_default(self) -> None:
+
+        with mock.patch.dict(os.environ,
+                             {'PFX_HOUDINI_PREWARM_BOOTSTRAP': "hython prewarm_bootstrap.py"}):
+            os.environ.pop('PFX_HOUDINI_PREWARM', None)
+            self.assertFalse(houdini_prewarm.prewarm_enabled())
+
+    def test_memory_not_measurable_without_psutil_or_proc(self) -> None:
+
+        with mock.patch.object(houdini_prewarm, 'psutil', None), \
+                mock.patch.object(houdini_prewarm.os.path, 'exists', return_value=False), \
+                mock.patch.object(houdini_prewarm.os, 'name', 'posix'):
+            self.assertFalse(houdini_prewarm.memory_measurable())
+
+    @unittest.skipUnless(os.name == 'nt' or sys.platform.startswith('linux'),
+                         "no psutil free memory fallback on this platform")
+    def test_memory_measurable_without_psutil(self) -> None:
+
+        with mock.patch.object(houdini_prewarm, 'psutil', None):
+            self.assertGreater(houdini_prewarm.process_memory_mb(os.getpid()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Frecency ranking of the recent contexts in an in memory launch
+history. Launch times are set through a patched clock.
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+import launch_history
+
+NOW = 1700000000.0
+DAY = 86400
+FX = ('PRJ001', 'sq0010', 'sh0010', 'fx')
+ANIM = ('PRJ001', 'sq0010', 'sh0010', 'anim')
+LGT = ('PRJ001', 'sq0020', 'sh0030', 'lgt')
+
+
+class RecentContextsTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.history = launch_history.LaunchHistory(":memory:")
+        self.addCleanup(self.history.close)
+
+    def launch(self,
+               context: tuple,
+               days_ago: float,
+               status: str='launched',
+               view_mode: str=None):
+
+        with mock.patch.object(launch_history.time, 'time', return_value=NOW - days_ago * DAY):
+            return self.history.record_launch(context, launch_history.PhaseTimings(),
+                                              status=status, view_mode=view_mode)
+
+    def recent(self) -> list:
+
+        with mock.patch.object(launch_history.time, 'time', return_value=NOW):
+            return self.history.recent_contexts()
+
+    def test_recent_launches_outweigh_older_frequent_ones(self) -> None:
+
+        for days_ago in (40, 45, 50):
+            self.launch(FX, days_ago)
+        self.launch(ANIM, 1)
+        self.launch(LGT, 100)
+
+        self.assertEqual(self.recent(), [(ANIM, 100, None), (FX, 90, None), (LGT, 10, None)])
+
+    def test_frequency_adds_up(self) -> None:
+
+        self.launch(FX, 1)
+        self.launch(FX, 2)
+        self.launch(ANIM, 0.5)
+
+        self.assertEqual([context for context, _, _ in self.recent()], [FX, ANIM])
+
+    def test_failed_launches_do_not_count(self) -> None:
+
+        self.launch(FX, 1, status='failed')
+        spawned = self.launch(ANIM, 1)
+        self.history.record_event(spawned, 'failed', error="houdini.exe not found")
+        self.launch(LGT, 20)
+
+        self.assertEqual([context for context, _, _ in self.recent()], [LGT])
+
+    def test_latest_view_mode_is_returned(self) -> None:
+
+        self.launch(FX, 3, view_mode='all')
+        self.launch(FX, 1, view_mode='assigned')
+
+        self.assertEqual(self.recent(), [(FX, 200, 'assigned')])
+
+
+if __name__ == "__main__":
+    unittest.main()
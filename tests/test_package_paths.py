@@ -0,0 +1,87 @@
+"""HOUDINI_PACKAGE_DIR resolution over a temporary package tree.
+Duplicates and folders without packages are dropped, houdini tokens
+are kept in their place and relaunches give the same value.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+import package_paths
+
+HOUDINI_VERSION = "20.0.653"
+
+
+class PackagePathResolverTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.studio_dir = self.package_folder("studio", "studio_tools.json")
+        self.empty_dir = self.package_folder("empty")
+        self.internal_root = os.path.join(self.temp_dir, "internal")
+        self.internal_dir = self.package_folder(os.path.join("internal", HOUDINI_VERSION),
+                                                "internal_tools.json")
+        self.missing_dir = os.path.join(self.temp_dir, "missing")
+
+    def package_folder(self,
+                       name: str,
+                       *package_files: str) -> str:
+
+        folder = os.path.join(self.temp_dir, name)
+        os.makedirs(folder)
+        for file_name in package_files:
+            with open(os.path.join(folder, file_name), "w") as package_file:
+                package_file.write("{}")
+        return folder
+
+    def resolver(self, *entries: str) -> package_paths.PackagePathResolver:
+        return package_paths.PackagePathResolver(";".join(entries), self.internal_root)
+
+    def test_drops_duplicates_missing_and_empty_folders(self) -> None:
+
+        resolver = self.resolver(self.studio_dir, self.studio_dir + os.sep,
+                                 os.path.join(self.studio_dir, "..", "studio"),
+                                 self.empty_dir, self.missing_dir)
+
+        self.assertEqual(resolver.package_dirs(HOUDINI_VERSION),
+                         [self.studio_dir, self.internal_dir])
+        self.assertEqual(resolver.dropped_dirs(HOUDINI_VERSION),
+                         [self.empty_dir, self.missing_dir])
+
+    def test_houdini_tokens_keep_their_place(self) -> None:
+
+        resolver = self.resolver("$HOUDINI_USER_PREF_DIR/packages", self.studio_dir, "&",
+                                 self.empty_dir, "&")
+
+        self.assertEqual(resolver.package_dirs(HOUDINI_VERSION),
+                         ["$HOUDINI_USER_PREF_DIR/packages", self.studio_dir, "&",
+                          self.internal_dir])
+
+    def test_relaunch_gives_the_same_value(self) -> None:
+
+        resolver = self.resolver(self.studio_dir, "&")
+        package_dir = resolver.package_dir(HOUDINI_VERSION)
+        self.assertEqual(resolver.package_dir(HOUDINI_VERSION), package_dir)
+        self.assertEqual(package_dir.split(os.pathsep), [self.studio_dir, "&", self.internal_dir])
+
+    def test_scans_are_cached_till_invalidated(self) -> None:
+
+        resolver = self.resolver(self.studio_dir, self.empty_dir)
+        self.assertNotIn(self.empty_dir, resolver.package_dirs(HOUDINI_VERSION))
+
+        with open(os.path.join(self.empty_dir, "late_tools.json"), "w") as package_file:
+            package_file.write("{}")
+        self.assertNotIn(self.empty_dir, resolver.package_dirs(HOUDINI_VERSION))
+        resolver.invalidate()
+        self.assertIn(self.empty_dir, resolver.package_dirs(HOUDINI_VERSION))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Shared snapshot tier published from a stand-in thadam parser. Hit
+rate, newer versions replacing the loaded shards, snapshots past their
+max age and the snapshot parser crawl.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+import shared_cache
+import thadam_client
+
+
+class StandInParser:
+
+    """Two projects of one sequence, two shots and a task per shot"""
+
+    def __init__(self, sequence_name: str="sq0010") -> None:
+        self.sequence_name = sequence_name
+
+    def get_projects(self) -> list:
+        return [{'proj_code': 'PRJ001', 'proj_id': 1}, {'proj_code': 'PRJ002', 'proj_id': 2}]
+
+    def get_project_infos(self, project_name: str) -> list:
+        return [{'fps': 24}]
+
+    def get_sequences(self, project_name: str) -> list:
+        return [{'seq_name': self.sequence_name}]
+
+    def get_shots(self,
+                  project_name: str,
+                  seq_name: str) -> list:
+        return [{'scope_id': f"{seq_name}_sh0010"}, {'scope_id': f"{seq_name}_sh0020"}]
+
+    def get_tasks(self,
+                  project_name: str,
+                  project_id,
+                  shot_id) -> list:
+        return [{'task_name': 'fx', 'shot': shot_id}]
+
+
+def query_key(method_name: str, *args) -> str:
+    return thadam_client.call_key("entities", method_name, args, {})
+
+
+class SharedSnapshotCacheTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        shared_cache.SnapshotPublisher(self.cache_dir, StandInParser()).publish()
+        self.cache = shared_cache.SharedSnapshotCache(self.cache_dir, check_interval=0)
+
+    def test_hits_and_misses_are_counted(self) -> None:
+
+        self.assertEqual(self.cache.get(query_key('get_sequences', 'PRJ001'), ('PRJ001',)),
+                         (True, [{'seq_name': 'sq0010'}]))
+        self.assertEqual(self.cache.get(query_key('get_sequences', 'PRJ009'), ('PRJ009',)),
+                         (False, None))
+        self.assertEqual(self.cache.get(query_key('get_projects'), ()),
+                         (True, StandInParser().get_projects()))
+
+        stats = self.cache.stats()
+        self.assertEqual((stats['version'], stats['hits'], stats['misses']), (1, 2, 1))
+        self.assertAlmostEqual(stats['hit_rate'], 2 / 3)
+        self.assertTrue(stats['fresh'])
+
+    def test_newer_version_replaces_the_loaded_shards(self) -> None:
+
+        key = query_key('get_sequences', 'PRJ001')
+        self.assertEqual(self.cache.lookup(key, ('PRJ001',))[1], [{'seq_name': 'sq0010'}])
+
+        shared_cache.SnapshotPublisher(self.cache_dir, StandInParser("sq0020")).publish()
+        self.assertEqual(self.cache.lookup(key, ('PRJ001',))[1], [{'seq_name': 'sq0020'}])
+        self.assertEqual(self.cache.version, 2)
+
+    def test_snapshot_past_max_age_is_not_used(self) -> None:
+
+        pointer_path = os.path.join(self.cache_dir, "current.json")
+        with open(pointer_path, "w") as pointer_file:
+            json.dump({'version': 1, 'created_at': time.time() - 7200}, pointer_file)
+        cache = shared_cache.SharedSnapshotCache(self.cache_dir, max_age=3600)
+
+        self.assertEqual(cache.lookup(query_key('get_projects'), ()), (False, None))
+        self.assertEqual(cache.parser().get_projects(), [])
+
+    def test_only_the_latest_versions_are_kept(self) -> None:
+
+        for _ in range(3):
+            shared_cache.SnapshotPublisher(self.cache_dir, StandInParser()).publish(keep=2)
+        self.assertEqual(sorted(folder for folder in os.listdir(self.cache_dir)
+                                if folder.startswith('v')),
+                         ["v000003", "v000004"])
+
+    def test_snapshot_parser_crawls_the_whole_hierarchy(self) -> None:
+
+        crawled = list(shared_cache.crawl_entities(self.cache.parser()))
+        expected = list(shared_cache.crawl_entities(StandInParser()))
+        self.assertEqual(crawled, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+
+"""Short run of the scope preset window soak. Memory stays flat and no
+handler gets connected again across the open, apply and close cycles.
+Needs PySide2, skipped without it."""
+
+import os
+import sys
+import importlib.util
+import unittest
+from unittest import mock
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "benchmarks"))
+
+
+@unittest.skipIf(importlib.util.find_spec("PySide2") is None, "PySide2 not installed")
+class ScopePresetSoakTest(unittest.TestCase):
+
+    CYCLES = 1000
+    WARM_UP = 200
+    MAX_GROWTH_KB = 256
+
+    @classmethod
+    def setUpClass(cls) -> None:
+
+        import soak_presets
+
+        with mock.patch.dict(os.environ):
+            cls.result = soak_presets.run_soak(cls.CYCLES, cls.WARM_UP, presets=5)
+
+    def test_memory_stays_flat(self) -> None:
+        self.assertLess(self.result['growth_kb'], self.MAX_GROWTH_KB)
+
+    def test_receiver_counts_stay_stable(self) -> None:
+        self.assertEqual(self.result['final_receivers'], self.result['baseline_receivers'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Subtask index of a temporary subtask tree. Lookups answer from memory,
+the background check rebuilds the index once a subtasks file changed
+and task folders added after the scan are reported unknown.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+import subtask_index
+
+SHOW = 'PRJ001'
+SEQUENCE = 'fx/sq0010'
+
+
+class SubtaskIndexTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.subtask_root = os.path.join(self.temp_dir, "subtasks")
+        self.write_subtasks('sh0010', 'fx', ['sim', 'render'])
+        os.makedirs(self.task_dir('sh0020', 'anim'))
+
+        self.index = subtask_index.SubtaskIndex(self.subtask_root,
+                                                os.path.join(self.temp_dir, "index"),
+                                                check_interval=0)
+        self.addCleanup(self.index.shutdown)
+        self.index.open_sequence(SHOW, SEQUENCE, {'sh0010': '1001-1100'})
+        self.wait()
+
+    def task_dir(self,
+                 shot: str,
+                 task: str) -> str:
+        return os.path.join(self.subtask_root, SHOW, *SEQUENCE.split('/'), shot, task)
+
+    def write_subtasks(self,
+                       shot: str,
+                       task: str,
+                       subtasks: list) -> str:
+
+        os.makedirs(self.task_dir(shot, task), exist_ok=True)
+        subtask_path = os.path.join(self.task_dir(shot, task), subtask_index.SUBTASK_FILE_NAME)
+        with open(subtask_path, "w") as subtask_file:
+            json.dump(subtasks, subtask_file)
+        return subtask_path
+
+    def wait(self) -> None:
+
+        future = self.index.building.get((SHOW, SEQUENCE))
+        if future:
+            future.result(timeout=10)
+
+    def test_answers_from_the_index(self) -> None:
+
+        self.assertEqual(self.index.lookup(SHOW, SEQUENCE, 'sh0010', 'fx'),
+                         (True, ['sim', 'render']))
+        self.assertEqual(self.index.lookup(SHOW, SEQUENCE, 'sh0020', 'anim'), (True, None))
+        self.assertEqual(self.index.frame_ranges(SHOW, SEQUENCE), {'sh0010': '1001-1100'})
+
+    def test_unknown_before_the_sequence_is_indexed(self) -> None:
+        self.assertEqual(self.index.lookup(SHOW, 'fx/sq0020', 'sh0010', 'fx'), (False, None))
+
+    def test_task_folder_added_after_the_scan_is_unknown(self) -> None:
+
+        self.write_subtasks('sh0010', 'lgt', ['key'])
+        self.assertEqual(self.index.lookup(SHOW, SEQUENCE, 'sh0010', 'lgt'), (False, None))
+
+    def test_edited_subtasks_file_rebuilds_the_index(self) -> None:
+
+        subtask_path = self.write_subtasks('sh0010', 'fx', ['sim', 'render', 'cache'])
+        edited_at = time.time() + 10
+        os.utime(subtask_path, (edited_at, edited_at))
+
+        self.index.lookup(SHOW, SEQUENCE, 'sh0010', 'fx')
+        self.wait()
+        self.assertEqual(self.index.lookup(SHOW, SEQUENCE, 'sh0010', 'fx'),
+                         (True, ['sim', 'render', 'cache']))
+
+    def test_checks_are_rate_limited(self) -> None:
+
+        self.index.check_interval = 3600
+        self.index.lookup(SHOW, SEQUENCE, 'sh0010', 'fx')
+        self.wait()
+        self.write_subtasks('sh0010', 'fx', ['sim'])
+
+        self.index.lookup(SHOW, SEQUENCE, 'sh0010', 'fx')
+        self.wait()
+        self.assertEqual(self.index.lookup(SHOW, SEQUENCE, 'sh0010', 'fx'),
+                         (True, ['sim', 'render']))
+
+    def test_index_file_is_reused(self) -> None:
+
+        index = subtask_index.SubtaskIndex(self.subtask_root,
+                                           os.path.join(self.temp_dir, "index"))
+        self.addCleanup(index.shutdown)
+        index.open_sequence(SHOW, SEQUENCE, {'sh0010': '1001-1100'})
+        self.assertEqual(index.lookup(SHOW, SEQUENCE, 'sh0010', 'fx'), (True, ['sim', 'render']))
+
+        # The queued check finds nothing changed, no rebuild
+        index.building[(SHOW, SEQUENCE)].result(timeout=10)
+        self.assertEqual(index.indexes[(SHOW, SEQUENCE)]['built_at'],
+                         self.index.indexes[(SHOW, SEQUENCE)]['built_at'])
+
+
+if __name__ == "__main__":
+    unittest.main()
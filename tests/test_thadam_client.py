@@ -0,0 +1,180 @@
+"""Circuit breaker, offline cache fallback and the stale flag of the
+thadam connection, and the call counters with the shared cache tier in
+front of it. The thadam parser is a stand-in object, no server needed.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+import shared_cache
+import thadam_client
+
+
+class StandInParser:
+
+    """Answers like a thadam parser, or raises while down is set"""
+
+    def __init__(self) -> None:
+        self.down = False
+        self.calls = 0
+
+    def get_projects(self) -> list:
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("thadam down")
+        return [{'proj_code': 'PRJ001', 'proj_id': 1}]
+
+    def get_sequences(self, project_name: str) -> list:
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("thadam down")
+        return [{'seq_name': 'sq0010'}]
+
+
+class ThadamConnectionTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.connection = thadam_client.ThadamConnection(os.path.join(self.temp_dir, "cache"),
+                                                         call_timeout=5,
+                                                         failure_threshold=2,
+                                                         retry_interval=3600)
+        self.parser = StandInParser()
+        self.client = self.connection.client(lambda: self.parser, "entities")
+
+    def tearDown(self) -> None:
+
+        self.connection.shutdown()
+        shutil.rmtree(self.temp_dir)
+
+    def test_failure_answers_from_the_cache_and_marks_stale(self) -> None:
+
+        self.assertEqual(self.client.get_projects(), self.parser.get_projects())
+        self.assertFalse(self.connection.stale)
+
+        self.parser.down = True
+        self.assertEqual(self.client.get_projects(), [{'proj_code': 'PRJ001', 'proj_id': 1}])
+        self.assertTrue(self.connection.stale)
+        self.assertFalse(self.connection.offline)
+
+    def test_next_server_answer_clears_stale(self) -> None:
+
+        self.client.get_projects()
+        self.parser.down = True
+        self.client.get_projects()
+        self.assertTrue(self.connection.stale)
+
+        self.parser.down = False
+        self.client.get_sequences("PRJ001")
+        self.assertFalse(self.connection.stale)
+
+    def test_breaker_opens_and_stops_calling_the_server(self) -> None:
+
+        self.client.get_projects()
+        self.parser.down = True
+        self.client.get_projects()
+        self.client.get_projects()
+        self.assertTrue(self.connection.offline)
+
+        calls = self.parser.calls
+        self.assertEqual(self.client.get_projects(), [{'proj_code': 'PRJ001', 'proj_id': 1}])
+        self.assertEqual(self.parser.calls, calls)
+
+    def test_nothing_cached_raises_unavailable(self) -> None:
+
+        self.parser.down = True
+        with self.assertRaises(thadam_client.ThadamUnavailable):
+            self.client.get_sequences("PRJ001")
+
+
+class OfflineCacheFileTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = thadam_client.OfflineCache(os.path.join(self.temp_dir, "cache"))
+        self.share_dir = os.path.join(self.temp_dir, "share", "PRJ001")
+        os.makedirs(self.share_dir)
+        self.file_path = os.path.join(self.share_dir, "settings.json")
+        with open(self.file_path, "w") as settings_file:
+            json.dump({'fps': 24}, settings_file)
+        self.assertEqual(self.cache.load_file(self.file_path, json.load), {'fps': 24})
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.temp_dir)
+
+    def test_unreachable_share_answers_the_copy(self) -> None:
+
+        shutil.rmtree(self.share_dir)
+        self.assertEqual(self.cache.load_file(self.file_path, json.load), {'fps': 24})
+
+    def test_file_removed_from_a_reachable_share_is_missing(self) -> None:
+
+        os.remove(self.file_path)
+        self.assertIsNone(self.cache.load_file(self.file_path, json.load))
+        shutil.rmtree(self.share_dir)
+        self.assertIsNone(self.cache.load_file(self.file_path, json.load))
+
+
+class SharedTierStatsTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.temp_dir = tempfile.mkdtemp()
+        snapshot_dir = os.path.join(self.temp_dir, "snapshots")
+        self.publish(snapshot_dir)
+
+        self.connection = thadam_client.ThadamConnection(os.path.join(self.temp_dir, "cache"),
+                                                         retry_interval=3600)
+        self.connection.shared_cache = shared_cache.SharedSnapshotCache(snapshot_dir,
+                                                                        fresh_age=-1)
+        self.parser = StandInParser()
+        self.client = self.connection.client(lambda: self.parser, "entities", shared=True)
+
+    def publish(self, snapshot_dir: str) -> None:
+
+        """Snapshot holding the sequences of PRJ001 only"""
+
+        os.makedirs(os.path.join(snapshot_dir, "v000001"))
+        key = thadam_client.call_key("entities", "get_sequences", ("PRJ001",), {})
+        with open(os.path.join(snapshot_dir, "v000001", "PRJ001.json"), "w") as shard_file:
+            json.dump({key: [{'seq_name': 'sq0010'}]}, shard_file)
+        with open(os.path.join(snapshot_dir, "current.json"), "w") as pointer_file:
+            json.dump({'version': 1, 'created_at': time.time()}, pointer_file)
+
+    def tearDown(self) -> None:
+
+        self.connection.shutdown()
+        shutil.rmtree(self.temp_dir)
+
+    def test_only_server_calls_are_counted(self) -> None:
+
+        for _ in range(5):
+            self.assertEqual(self.client.get_sequences("PRJ001"), [{'seq_name': 'sq0010'}])
+        self.client.get_projects()
+
+        stats = self.connection.stats()
+        self.assertEqual(stats['server_calls'], 1)
+        self.assertEqual(stats['coalesced_calls'], 0)
+        self.assertEqual(self.parser.calls, 1)
+        self.assertEqual((stats['shared_cache']['hits'], stats['shared_cache']['misses']), (5, 1))
+
+    def test_old_snapshot_is_reported_apart_from_stale(self) -> None:
+
+        self.client.get_sequences("PRJ001")
+        self.assertFalse(self.connection.stale)
+        self.assertFalse(self.connection.stats()['shared_cache']['fresh'])
+        self.assertIsNotNone(self.connection.stats()['shared_cache']['age'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,498 @@
+
+import os
+import json
+import time
+import hashlib
+import functools
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+# Timeout of the http requests made inside a thadam call, per thread
+_request_timeout = threading.local()
+
+
+class ThadamUnavailable(Exception):
+
+    """Thadam server not reachable and nothing cached for the query"""
+
+
+def call_key(client_name: str,
+             method_name: str,
+             args: tuple,
+             kwargs: dict) -> str:
+
+    """Cache key of a thadam query. Shared by the offline cache and
+    the studio wide shared cache tier"""
+
+    return json.dumps([client_name, method_name, list(args), kwargs],
+                      sort_keys=True, default=str)
+
+
+def _install_request_timeout() -> None:
+
+    """Wrap requests.Session.request once. Requests made without an
+    explicit timeout inside request_timeout get the timeout of their
+    thread, every other request of the process is left as it is"""
+
+    if requests is None or getattr(requests.Session.request, 'thadam_timeout', False):
+        return
+    session_request = requests.Session.request
+
+    @functools.wraps(session_request)
+    def request(self, method, url, **kwargs):
+        timeout = getattr(_request_timeout, 'seconds', None)
+        if timeout is not None and kwargs.get('timeout') is None:
+            kwargs['timeout'] = timeout
+        return session_request(self, method, url, **kwargs)
+
+    request.thadam_timeout = True
+    requests.Session.request = request
+
+
+@contextmanager
+def request_timeout(seconds: float):
+
+    """Timeout of the http requests the thadam parsers make in this thread"""
+
+    _install_request_timeout()
+    previous = getattr(_request_timeout, 'seconds', None)
+    _request_timeout.seconds = seconds
+    try:
+        yield
+    finally:
+        _request_timeout.seconds = previous
+
+
+class CircuitBreaker:
+
+    """Stops calling the thadam server after repeated failures.
+
+    After failure_threshold failures in a row the breaker opens and every
+    call served from the offline cache straight away, so the UI never waits
+    on a dead server. Closing it again is left to the reconnect probe of
+    ThadamConnection.
+    """
+
+    def __init__(self, failure_threshold: int=2) -> None:
+
+        self.failure_threshold = failure_threshold
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.failures >= self.failure_threshold
+
+    def record_success(self) -> None:
+
+        with self.lock:
+            self.failures = 0
+
+    def record_failure(self) -> None:
+
+        with self.lock:
+            self.failures += 1
+
+
+def share_reachable(file_path: str) -> bool:
+
+    """Whether the share holding the file answers, told by the folder of
+    the file. A file missing from an existing folder is really missing"""
+
+    return os.path.isdir(os.path.dirname(os.path.abspath(file_path)))
+
+
+class OfflineCache:
+
+    """Local copies of every thadam answer and network share file the
+    launcher read successfully. Served while the server or the share
+    is not reachable"""
+
+    def __init__(self, cache_dir: str) -> None:
+
+        self.cache_dir = cache_dir
+        for folder in ('entities', 'files'):
+            os.makedirs(os.path.join(cache_dir, folder), exist_ok=True)
+
+    def _entry_path(self,
+                    folder: str,
+                    key: str) -> str:
+        return os.path.join(self.cache_dir,
+                            folder,
+                            hashlib.sha1(key.encode('utf-8')).hexdigest() + ".json")
+
+    def _write(self,
+               entry_path: str,
+               key: str,
+               value) -> None:
+
+        temp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w") as entry_file:
+                json.dump({'key': key, 'saved_at': time.time(), 'value': value}, entry_file)
+            os.replace(temp_path, entry_path)
+        except (OSError, TypeError, ValueError):
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _read(self, entry_path: str):
+
+        try:
+            with open(entry_path, "r") as entry_file:
+                return json.load(entry_file)
+        except (OSError, ValueError):
+            return None
+
+    def put(self,
+            key: str,
+            value) -> None:
+        self._write(self._entry_path('entities', key), key, value)
+
+    def get(self, key: str):
+
+        """Cached entry dict with key, saved_at and value. None if not cached"""
+
+        return self._read(self._entry_path('entities', key))
+
+    def load_file(self,
+                  file_path: str,
+                  loader):
+
+        """Load a network share file through the given loader function
+        and keep a copy of the loaded data. The copy is returned when the
+        share is not reachable. A file missing from a reachable share is
+        missing, None returned and its copy dropped. None returned as well
+        if neither exist
+
+        Args:
+            file_path (str): path of the file on the share
+            loader (callable): function parsing the opened file object
+        """
+
+        entry_path = self._entry_path('files', file_path)
+        try:
+            with open(file_path, "r") as share_file:
+                data = loader(share_file)
+        except FileNotFoundError:
+            if share_reachable(file_path):
+                if os.path.exists(entry_path):
+                    os.remove(entry_path)
+                return None
+            entry = self._read(entry_path)
+            return entry['value'] if entry else None
+        except OSError:
+            entry = self._read(entry_path)
+            return entry['value'] if entry else None
+        self._write(entry_path, file_path, data)
+        return data
+
+
+class ThadamConnection:
+
+    """State shared by all the thadam clients of the launcher. The circuit
+    breaker, the offline cache, the worker threads which enforce the call
+    timeout and the background reconnect probe.
+
+    Once the breaker opens, the probe thread retries the call that opened
+    it every retry_interval seconds and closes the breaker when it
+    succeeds. The launcher watches offline and stale to refresh its data.
+    """
+
+    def __init__(self,
+                 cache_dir: str,
+                 call_timeout: float=5,
+                 failure_threshold: int=2,
+                 retry_interval: float=30,
+                 pfx_logger=None) -> None:
+
+        """
+        Args:
+            cache_dir (str): folder of the offline cache
+            call_timeout (float, optional): Seconds a thadam call may take. Defaults to 5.
+            failure_threshold (int, optional): Failures in a row that switch to
+                                               offline mode. Defaults to 2.
+            retry_interval (float, optional): Seconds between reconnect attempts.
+                                              Defaults to 30.
+            pfx_logger (optional): PFXLogger instance. Defaults to None.
+        """
+
+        self.cache = OfflineCache(cache_dir)
+        self.breaker = CircuitBreaker(failure_threshold)
+        self.call_timeout = call_timeout
+        self.retry_interval = retry_interval
+        self.pfx_logger = pfx_logger
+        self.executor = ThreadPoolExecutor(max_workers=4,
+                                           thread_name_prefix="thadam")
+        # Set when an answer came from the offline cache, cleared by
+        # the next answer from the server
+        self.stale = False
+        self.probe_function = None
+        self.probe_thread = None
+        self.stop_event = threading.Event()
+        # Identical queries in flight share one server request
+        self.in_flight = {}
+        self.in_flight_lock = threading.Lock()
+        self.server_calls = 0
+        self.coalesced_calls = 0
+        self.shared_cache = None
+        # The shared drive fails on its own, a hanging share only skips
+        # the shared tier for retry_interval seconds
+        self.shared_breaker = CircuitBreaker(failure_threshold)
+        self.shared_failed_at = 0.0
+
+    @classmethod
+    def from_environment(cls, pfx_logger=None):
+
+        """Build the connection from the PFX_THADAM_* environment variables"""
+
+        return cls(
+            cache_dir=os.environ.get('PFX_LAUNCHER_CACHE_DIR',
+                                     os.path.join(os.environ['TEMP'], "pfx_launcher_cache")),
+            call_timeout=float(os.environ.get('PFX_THADAM_TIMEOUT', 5)),
+            failure_threshold=int(os.environ.get('PFX_THADAM_FAILURE_THRESHOLD', 2)),
+            retry_interval=float(os.environ.get('PFX_THADAM_RETRY_INTERVAL', 30)),
+            pfx_logger=pfx_logger
+        )
+
+    @property
+    def offline(self) -> bool:
+        return self.breaker.is_open
+
+    def _log(self, message: str) -> None:
+        if self.pfx_logger:
+            self.pfx_logger.error_logger(message)
+
+    def _info(self, message: str) -> None:
+        if self.pfx_logger:
+            self.pfx_logger.info_logger(message)
+
+    def client(self,
+               factory,
+               name: str,
+               shared: bool=False):
+
+        """Resilient client over the thadam parser the factory builds
+
+        Args:
+            factory (callable): builds the thadam parser, called lazily inside
+                                the guarded call so a failing constructor
+                                is handled like a failing query
+            name (str): name of the client, part of the cache keys
+            shared (bool, optional): answer from the shared cache tier first.
+                                     Defaults to False.
+        """
+
+        return ResilientThadamClient(self, factory, name, shared)
+
+    def _submit(self,
+                key: str,
+                function,
+                server_call: bool=True):
+
+        """Future of the query. Joins the in flight request of the same
+        key instead of sending another one. Only server calls count
+        towards server_calls and coalesced_calls"""
+
+        with self.in_flight_lock:
+            future = self.in_flight.get(key)
+            if future is not None:
+                if server_call:
+                    self.coalesced_calls += 1
+                return future
+            if server_call:
+                self.server_calls += 1
+            future = self.in_flight[key] = self.executor.submit(function)
+
+        def forget(_):
+            with self.in_flight_lock:
+                self.in_flight.pop(key, None)
+        future.add_done_callback(forget)
+        return future
+
+    def shared_get(self,
+                   key: str,
+                   args: tuple) -> tuple:
+
+        """Answer of the query from the shared snapshot tier. The shard is
+        read on a worker with the call timeout behind a breaker of its own,
+        so a hanging share falls back to the server instead of blocking the
+        UI. The age of the snapshot is reported by the shared cache
+        itself, apart from the stale flag of the server answers.
+
+        Returns a tuple of found status and the answer
+
+        Args:
+            key (str): query key, as built by call_key
+            args (tuple): positional arguments of the query
+        """
+
+        if self.shared_cache is None:
+            return False, None
+        if self.shared_breaker.is_open \
+            and time.monotonic() - self.shared_failed_at < self.retry_interval:
+            return False, None
+
+        future = self._submit('shared:' + key,
+                              functools.partial(self.shared_cache.get, key, args),
+                              server_call=False)
+        try:
+            found, value = future.result(timeout=self.call_timeout)
+        except FutureTimeoutError:
+            self._shared_failed(f"Shared cache read {key} timed out after {self.call_timeout}s")
+            return False, None
+        except Exception as error:
+            self._shared_failed(f"Shared cache read {key} failed: {error}")
+            return False, None
+
+        self.shared_breaker.record_success()
+        return found, value
+
+    def _shared_failed(self, message: str) -> None:
+
+        self._log(message)
+        self.shared_breaker.record_failure()
+        self.shared_failed_at = time.monotonic()
+
+    def stats(self) -> dict:
+
+        """Server and shared tier metrics of the connection"""
+
+        stats = {
+            'server_calls': self.server_calls,
+            'coalesced_calls': self.coalesced_calls,
+            'offline': self.offline
+        }
+        if self.shared_cache:
+            stats['shared_cache'] = self.shared_cache.stats()
+        return stats
+
+    def call(self,
+             key: str,
+             function):
+
+        """Run the function with the call timeout behind the circuit breaker.
+        The http requests of the function get the call timeout as well, so
+        a hanging server never blocks a worker thread for good. Successful
+        answers written to the offline cache, failures and calls made while
+        offline answered from it and mark the connection stale until the
+        next server answer.
+
+        Args:
+            key (str): offline cache key of the call
+            function (callable): the actual thadam query
+        """
+
+        if not self.breaker.is_open:
+            future = self._submit(key, functools.partial(self._timed, function))
+            try:
+                value = future.result(timeout=self.call_timeout)
+            except FutureTimeoutError:
+                self._failed(function, f"Thadam call {key} timed out after {self.call_timeout}s")
+            except Exception as error:
+                self._failed(function, f"Thadam call {key} failed: {error}")
+            else:
+                self.breaker.record_success()
+                self.stale = False
+                self.cache.put(key, value)
+                return value
+
+        entry = self.cache.get(key)
+        if entry is None:
+            raise ThadamUnavailable(f"Thadam server not reachable and {key} not cached")
+        self.stale = True
+        return entry['value']
+
+    def _timed(self, function):
+        with request_timeout(self.call_timeout):
+            return function()
+
+    def _failed(self,
+                function,
+                message: str) -> None:
+
+        self._log(message)
+        self.breaker.record_failure()
+        if self.breaker.is_open:
+            self._log("Thadam server unreachable. Launcher running offline from the local cache")
+            self.probe_function = function
+            self._start_reconnect_probe()
+
+    def _start_reconnect_probe(self) -> None:
+
+        """Background thread retrying the call which opened the breaker"""
+
+        def probe_loop():
+            while not self.stop_event.wait(self.retry_interval):
+                if not self.breaker.is_open:
+                    continue
+                future = self.executor.submit(self._timed, self.probe_function)
+                try:
+                    future.result(timeout=self.call_timeout)
+                except Exception:
+                    continue
+                self.breaker.record_success()
+                self._info("Thadam server reachable again")
+
+        if self.probe_thread is None:
+            self.probe_thread = threading.Thread(target=probe_loop,
+                                                 name="thadam-reconnect",
+                                                 daemon=True)
+            self.probe_thread.start()
+
+    def shutdown(self) -> None:
+
+        self._info(f"Thadam connection stats {self.stats()}")
+        self.stop_event.set()
+        self.executor.shutdown(wait=False)
+
+
+class ResilientThadamClient:
+
+    """Drop in for the thadam parsers. Every query method of the
+    wrapped parser answered through ThadamConnection.call. With the
+    shared flag the studio wide snapshot of the connection is asked first"""
+
+    def __init__(self,
+                 connection: ThadamConnection,
+                 factory,
+                 name: str,
+                 shared: bool=False) -> None:
+
+        self.connection = connection
+        self.factory = factory
+        self.name = name
+        self.shared = shared
+        self.parser = None
+        self.parser_lock = threading.Lock()
+
+    def _parser(self):
+
+        with self.parser_lock:
+            if self.parser is None:
+                self.parser = self.factory()
+            return self.parser
+
+    def __getattr__(self, method_name: str):
+
+        if method_name.startswith('_'):
+            raise AttributeError(method_name)
+
+        def query(*args, **kwargs):
+            key = call_key(self.name, method_name, args, kwargs)
+            if self.shared and not kwargs:
+                found, value = self.connection.shared_get(key, args)
+                if found:
+                    return value
+            return self.connection.call(
+                key,
+                lambda: getattr(self._parser(), method_name)(*args, **kwargs)
+            )
+        query.__name__ = method_name
+        return query